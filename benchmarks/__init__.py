@@ -0,0 +1,4 @@
+"""
+性能基准模块
+包含启动时间等可重复运行的性能测量脚本
+"""
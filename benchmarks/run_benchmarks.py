@@ -0,0 +1,394 @@
+"""
+性能基准套件
+覆盖数据库查询、时间冲突检查、课程表视图和各导出格式，结果保存为JSON，
+可以与保存的基线比较，中位数变慢超过阈值时报告回归并返回非零
+
+- database.*: CourseDatabase 的每个查询方法（取自 database.query_plan.QUERY_PLAN_CASES，
+  新增查询方法登记后自动纳入基准），使用不带结果缓存的连接
+- conflict.*: TimeConflictChecker.check_conflict / get_conflicts_for_course，
+  以及 5/20/50 门已选课程时的全部冲突计算（新建选课状态，与主窗口 get_all_conflicts 相同的路径）
+- views.*: WeekViewWidget.update_schedule_display、MonthViewWidget.update_calendar（offscreen Qt）
+- export.*: ScheduleExporter 的每种导出格式
+
+用法:
+    python -m benchmarks.run_benchmarks                              # 运行并写入 benchmarks/results/latest.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/baseline.json --threshold 0.2
+    python -m benchmarks.run_benchmarks -k export --db catalogs/合成10x.db
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from config import DATABASE_PATH
+
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, 'benchmarks', 'results', 'latest.json')
+DEFAULT_THRESHOLD = 0.2
+SELECTION_SIZES = (5, 20, 50)
+
+# 注册的基准: [(名称, 构造函数)]，构造函数接收 BenchmarkContext，返回被计时的无参函数，
+# 返回 None 表示当前环境不支持（例如缺少可选依赖）
+CASES = []
+
+
+def benchmark(name):
+    def decorator(factory):
+        CASES.append((name, factory))
+        return factory
+    return decorator
+
+
+class BenchmarkContext:
+    """各基准共享的数据库连接、示例选课和临时目录"""
+
+    def __init__(self, db_path, seed=0):
+        from database import CourseDatabase
+
+        self.db_path = db_path
+        self.db = CourseDatabase(db_path, enable_cache=False)
+        self.cached_db = CourseDatabase(db_path)
+        self.tmpdir = tempfile.mkdtemp(prefix='ucas_bench_')
+        self._app = None
+
+        scheduled = [course_id for course_id, in self.db._get_connection().execute(
+            f"SELECT DISTINCT course_id FROM {self.db.schema}.course_schedules ORDER BY course_id")]
+        names = {course_id: name for course_id, name, *_ in self.db.get_all_courses()}
+        rng = random.Random(seed)
+        sample = rng.sample(scheduled, min(max(SELECTION_SIZES), len(scheduled)))
+        self.selections = {size: [(course_id, names.get(course_id, str(course_id)))
+                                  for course_id in sample[:size]] for size in SELECTION_SIZES}
+
+    def selection(self, size):
+        return self.selections[size]
+
+    def schedules(self, size):
+        """size 门课程的全部时间安排（TimeConflictChecker 的输入格式）"""
+        return [schedule for course_id, _ in self.selection(size)
+                for schedule in self.db.get_course_schedules(course_id)]
+
+    def courses_data(self, size=20):
+        return self.db.get_selected_courses_with_schedules([course_id for course_id, _ in self.selection(size)])
+
+    def qt_app(self):
+        """offscreen QApplication，未安装 PyQt5 时返回 None"""
+        if self._app is None:
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+            try:
+                from PyQt5.QtWidgets import QApplication
+            except ImportError:
+                return None
+            self._app = QApplication.instance() or QApplication([])
+        return self._app
+
+    def close(self):
+        import shutil
+        self.db.close()
+        self.cached_db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+# ---- 数据库 ----
+
+def _register_database_cases():
+    from database.query_plan import QUERY_PLAN_CASES
+
+    for method, args in QUERY_PLAN_CASES:
+        label = ','.join(repr(arg) for arg in args)
+
+        def factory(ctx, method=method, args=args):
+            func = getattr(ctx.db, method)
+            if inspect.isgeneratorfunction(inspect.unwrap(func)):
+                return lambda: sum(1 for _ in func(*args))
+            return lambda: func(*args)
+
+        CASES.append((f"database.{method}({label})", factory))
+
+
+_register_database_cases()
+
+
+@benchmark('database.get_all_courses[cached]')
+def _cached_all_courses(ctx):
+    ctx.cached_db.get_all_courses()
+    return ctx.cached_db.get_all_courses
+
+
+# ---- 时间冲突 ----
+
+def _register_conflict_cases():
+    for size in SELECTION_SIZES:
+        def factory(ctx, size=size):
+            from planner import Selection, DatabaseCatalog
+
+            items = ctx.selection(size)
+
+            def run():
+                selection = Selection(DatabaseCatalog(ctx.db))
+                selection.replace(items)
+                return selection.conflict_pairs()
+            return run
+
+        CASES.append((f"conflict.get_all_conflicts[{size}]", factory))
+
+
+_register_conflict_cases()
+
+
+@benchmark('conflict.check_conflict')
+def _check_conflict(ctx):
+    from utils import TimeConflictChecker
+
+    pairs = [(a, b) for a in ctx.schedules(5) for b in ctx.schedules(20)]
+
+    def run():
+        for a, b in pairs:
+            TimeConflictChecker.check_conflict(a, b)
+    return run
+
+
+@benchmark('conflict.get_conflicts_for_course')
+def _conflicts_for_course(ctx):
+    from utils import TimeConflictChecker
+
+    course_id = ctx.selection(50)[-1][0]
+    new_schedules = ctx.db.get_course_schedules(course_id)
+    existing = ctx.schedules(50)
+    return lambda: TimeConflictChecker.get_conflicts_for_course(new_schedules, existing)
+
+
+# ---- 视图 ----
+
+@benchmark('views.week.update_schedule_display')
+def _week_view(ctx):
+    if ctx.qt_app() is None:
+        return None
+    from widgets import WeekViewWidget
+
+    view = WeekViewWidget()
+    view.set_database(ctx.cached_db)
+    view.selected_courses = ctx.selection(20)
+    view.current_week = 5  # 教学周，大多数课程在该周有课
+    ctx.week_view = view
+    return view.update_schedule_display
+
+
+@benchmark('views.month.update_calendar')
+def _month_view(ctx):
+    if ctx.qt_app() is None:
+        return None
+    from widgets import MonthViewWidget
+
+    view = MonthViewWidget()
+    view.set_database(ctx.cached_db)
+    start_date = ctx.cached_db.get_semester_start_date()
+    if start_date:
+        view.set_semester_start_date(start_date)
+    view.selected_courses = ctx.selection(20)
+    ctx.month_view = view
+    return view.update_calendar
+
+
+# ---- 导出 ----
+
+def _register_export_cases():
+    formats = [
+        ('csv', 'export_to_csv', {}),
+        ('xlsx', 'export_to_excel', {}),
+        ('pdf', 'export_to_pdf', {}),
+        ('json', 'export_to_json', {}),
+        ('html', 'export_to_html', {}),
+        ('ics', 'export_to_ics', {}),
+        ('weekly.csv', 'export_weekly_schedule', {'format': 'csv'}),
+        ('weekly.pdf', 'export_weekly_schedule', {'format': 'pdf', 'all_weeks': True}),
+    ]
+    for extension, method, kwargs in formats:
+        def factory(ctx, extension=extension, method=method, kwargs=kwargs):
+            from export.schedule_exporter import ScheduleExporter, REPORTLAB_AVAILABLE
+
+            if extension.endswith('pdf') and not REPORTLAB_AVAILABLE:
+                return None
+            exporter = ScheduleExporter()
+            courses_data = ctx.courses_data(20)
+            file_path = os.path.join(ctx.tmpdir, f"schedule.{extension}")
+            export = getattr(exporter, method)
+
+            def run():
+                # 每次传入课程数据列表，导出模型重新构建，不命中导出缓存
+                if not export(list(courses_data), file_path, **kwargs):
+                    raise RuntimeError(f"{method} 导出失败")
+            return run
+
+        CASES.append((f"export.{extension}", factory))
+
+
+_register_export_cases()
+
+
+# ---- 运行与比较 ----
+
+def measure(func, min_rounds=5, min_time=0.2, max_rounds=1000):
+    """预热一次后重复运行，直到达到最少轮数和最短总时间"""
+    func()
+    timings = []
+    total = 0.0
+    while len(timings) < max_rounds and (len(timings) < min_rounds or total < min_time):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return {
+        'rounds': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def run_benchmarks(db_path=DATABASE_PATH, pattern=None, min_time=0.2, seed=0):
+    """
+    运行匹配 pattern（名称子串）的基准
+
+    Returns:
+        dict: {'meta': {...}, 'results': {名称: 统计}, 'skipped': [名称]}
+    """
+    ctx = BenchmarkContext(db_path, seed)
+    results = {}
+    skipped = []
+    try:
+        for name, factory in CASES:
+            if pattern and pattern not in name:
+                continue
+            func = factory(ctx)
+            if func is None:
+                skipped.append(name)
+                continue
+            results[name] = measure(func, min_time=min_time)
+    finally:
+        ctx.close()
+
+    return {'meta': _environment(db_path), 'results': results, 'skipped': skipped}
+
+
+def _environment(db_path):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'db': os.path.basename(db_path),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    按中位数与基线比较
+
+    Returns:
+        list: (名称, 基线中位数, 当前中位数, 变化比例, 状态)，状态为 regression / improved / ok / new
+    """
+    rows = []
+    previous = baseline.get('results', {})
+    for name, current in results['results'].items():
+        before = previous.get(name)
+        if before is None:
+            rows.append((name, None, current['median'], None, 'new'))
+            continue
+        change = current['median'] / before['median'] - 1 if before['median'] > 0 else 0.0
+        if change > threshold:
+            status = 'regression'
+        elif change < -threshold:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((name, before['median'], current['median'], change, status))
+    return rows
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def write_results(results, file_path):
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="性能基准套件")
+    parser.add_argument('--db', default=DATABASE_PATH, help="课程数据库（可用合成课程库测试大规模）")
+    parser.add_argument('-k', dest='pattern', default=None, help="只运行名称包含该子串的基准")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="结果JSON路径")
+    parser.add_argument('--baseline', default=None, help="与该基线结果比较")
+    parser.add_argument('--save-baseline', default=None, metavar='PATH', help="同时把结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="中位数变慢超过该比例视为回归（默认0.2）")
+    parser.add_argument('--min-time', type=float, default=0.2, help="每个基准的最短计时总时长（秒）")
+    parser.add_argument('--list', action='store_true', help="只列出基准名称")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in CASES:
+            print(name)
+        return 0
+
+    results = run_benchmarks(args.db, args.pattern, args.min_time)
+    write_results(results, args.output)
+    if args.save_baseline:
+        write_results(results, args.save_baseline)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    rows = compare(results, baseline or {}, args.threshold)
+    width = max((len(name) for name, *_ in rows), default=10) + 2
+    print(f"{'基准':<{width}}{'基线':>12}{'中位数':>12}{'变化':>10}  状态")
+    for name, before, current, change, status in rows:
+        change_text = '-' if change is None else f"{change:+.1%}"
+        if baseline is None:
+            status = ''
+        print(f"{name:<{width}}{_format_time(before):>12}{_format_time(current):>12}{change_text:>10}  {status}")
+    for name in results['skipped']:
+        print(f"{name:<{width}}{'跳过（缺少可选依赖）':>12}")
+    print(f"\n结果: {args.output}")
+
+    regressions = [name for name, *_, status in rows if status == 'regression']
+    if baseline is not None and regressions:
+        print(f"✗ {len(regressions)} 个基准变慢超过 {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    if baseline is not None:
+        print(f"✓ 没有超过 {args.threshold:.0%} 的回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
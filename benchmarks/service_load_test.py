@@ -0,0 +1,167 @@
+"""
+选课规划服务压力测试
+模拟大量学生同时查询：每个并发客户端保持一条 keep-alive 连接，
+按比例混合发送搜索、课程详情、冲突检查和求解请求，统计吞吐量和延迟分位数
+
+用法:
+    python -m benchmarks.service_load_test                      # 自动在本机启动服务
+    python -m benchmarks.service_load_test --url http://127.0.0.1:8765 --clients 200 --requests 50
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit, quote
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from utils.async_http import AsyncHTTPClient
+
+SEARCH_KEYWORDS = ['数学', '物理', '程序', '设计', '分析', '英语', '系统', '理论', '实验', '方法']
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _client(base_url, requests, course_ids, latencies, errors, seed):
+    rng = random.Random(seed)
+    # 每个客户端一条 keep-alive 连接
+    client = AsyncHTTPClient(base_url, max_connections=1)
+    try:
+        for _ in range(requests):
+            roll = rng.random()
+            if roll < 0.4:
+                kind, method, path, payload = 'search', 'GET', \
+                    f"/api/search?q={quote(rng.choice(SEARCH_KEYWORDS))}&limit=20", None
+            elif roll < 0.6:
+                kind, method, path, payload = 'detail', 'GET', f"/api/courses/{rng.choice(course_ids)}", None
+            elif roll < 0.9:
+                kind, method, path, payload = 'check', 'POST', '/api/check', \
+                    {'courses': rng.sample(course_ids, rng.randint(4, 10))}
+            else:
+                kind, method, path, payload = 'solve', 'POST', '/api/solve', \
+                    {'required': rng.sample(course_ids, 2), 'candidates': rng.sample(course_ids, 20)}
+
+            start = time.perf_counter()
+            response = await client.request(method, path, payload=payload)
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append((kind, response.status))
+    finally:
+        await client.close()
+
+
+async def run_load(host, port, clients, requests):
+    """并发执行压力测试，返回统计结果"""
+    base_url = f"http://{host}:{port}"
+    probe = AsyncHTTPClient(base_url, max_connections=1)
+    try:
+        response = await probe.get('/api/search?limit=500')
+    finally:
+        await probe.close()
+    course_ids = [course['id'] for course in response.json()['courses']]
+
+    latencies = {}
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(base_url, requests, course_ids, latencies, errors, seed)
+                           for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        'clients': clients,
+        'requests': total,
+        'errors': len(errors),
+        'elapsed': elapsed,
+        'throughput': total / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {
+            kind: {
+                'count': len(values),
+                'p50': _percentile(values, 0.50) * 1000,
+                'p95': _percentile(values, 0.95) * 1000,
+                'p99': _percentile(values, 0.99) * 1000,
+            }
+            for kind, values in sorted(latencies.items())
+        },
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port, extra_args):
+    """在子进程中启动服务并等待其就绪"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'planner.service', '--port', str(port)] + extra_args,
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("服务启动失败")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("等待服务启动超时")
+
+
+def format_report(result):
+    lines = [
+        f"并发客户端: {result['clients']}, 请求: {result['requests']}, 错误: {result['errors']}",
+        f"耗时 {result['elapsed']:.2f}s, 吞吐量 {result['throughput']:.0f} 请求/秒",
+        f"  {'接口':<8}{'请求数':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for kind, stats in result['latency_ms'].items():
+        lines.append(f"  {kind:<8}{stats['count']:>8}{stats['p50']:>10.2f}"
+                     f"{stats['p95']:>10.2f}{stats['p99']:>10.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选课规划服务压力测试")
+    parser.add_argument('--url', default=None, help="已运行的服务地址（默认在本机启动一个）")
+    parser.add_argument('--clients', type=int, default=100, help="并发客户端数")
+    parser.add_argument('--requests', type=int, default=50, help="每个客户端的请求数")
+    parser.add_argument('--db', default=None, help="自动启动服务时使用的数据库")
+    parser.add_argument('--json', action='store_true', help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = '127.0.0.1', _free_port()
+        process = _start_server(port, ['--db', args.db] if args.db else [])
+
+    try:
+        result = asyncio.run(run_load(host, port, args.clients, args.requests))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(json.dumps(result, ensure_ascii=False, indent=2) if args.json else format_report(result))
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+启动时间基准
+在全新的Python进程中（offscreen平台）创建并显示主窗口，测量各阶段耗时，
+并确认窗口显示前没有导入 pandas / reportlab 等导出依赖
+
+用法:
+    python -m benchmarks.startup_benchmark [--runs N]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 窗口显示前不应导入的模块
+HEAVY_MODULES = ['pandas', 'reportlab', 'numpy']
+
+# 在子进程中执行的测量脚本
+_CHILD_SCRIPT = r'''
+import sys, time, json
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+t_qt = time.perf_counter()
+from ui import CourseSelectionMainWindow
+t_import = time.perf_counter()
+window = CourseSelectionMainWindow()
+t_init = time.perf_counter()
+window.show()
+app.processEvents()
+t_shown = time.perf_counter()
+heavy = {name: name in sys.modules for name in %(heavy)r}
+window.close()
+print(json.dumps({
+    'qapplication': t_qt - start,
+    'import_ui': t_import - t_qt,
+    'window_init': t_init - t_import,
+    'show': t_shown - t_init,
+    'total': t_shown - start,
+    'heavy_modules': heavy,
+}))
+'''
+
+
+def run_once():
+    """在新进程中测量一次启动"""
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    script = _CHILD_SCRIPT % {'heavy': HEAVY_MODULES}
+    output = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量主窗口启动时间")
+    parser.add_argument('--runs', type=int, default=5, help="重复次数（取中位数）")
+    args = parser.parse_args(argv)
+
+    results = [run_once() for _ in range(args.runs)]
+
+    print(f"启动时间（{args.runs} 次中位数）:")
+    for phase in ['qapplication', 'import_ui', 'window_init', 'show', 'total']:
+        median = statistics.median(r[phase] for r in results)
+        print(f"  {phase:<14}{median * 1000:>9.1f} ms")
+
+    loaded = sorted({name for r in results for name, present in r['heavy_modules'].items() if present})
+    if loaded:
+        print(f"✗ 窗口显示前导入了: {', '.join(loaded)}")
+        return 1
+    print("✓ 窗口显示前未导入导出依赖")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
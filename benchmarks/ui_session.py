@@ -0,0 +1,250 @@
+"""
+界面会话基准
+在 offscreen 平台上运行 CourseSelectionMainWindow，按脚本执行一次典型的选课会话：
+加载目录 -> 搜索 -> 添加10门课程 -> 周视图翻遍所有周次 -> 月视图前后翻月 -> 导出各格式，
+记录每一步的延迟、事件循环卡顿和 Qt 对象数
+
+- 延迟: 从触发操作到工作线程结果送达、事件（含重绘）处理完毕
+- 卡顿: 界面线程中 1ms 心跳定时器两次触发的间隔超过阈值的次数和最大值，归属于当时正在执行的步骤
+- 对象数: 主窗口下的 QObject 数和应用中的 QWidget 数，用于发现视图刷新时泄漏控件；
+  计数前先处理 deleteLater() 排队的 DeferredDelete 事件，已安排删除的控件不计入
+
+会话期间消息框自动确认，保存对话框返回临时目录中的文件名
+
+用法:
+    python -m benchmarks.ui_session [--runs 3] [--json session.json]
+    python -m benchmarks.ui_session --semester 合成10x        # catalogs/合成10x.db（见 database.synthetic_catalog）
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from contextlib import contextmanager
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from PyQt5.QtWidgets import QApplication, QMessageBox, QFileDialog
+from PyQt5.QtCore import QObject, QTimer, QEventLoop, QEvent, QCoreApplication
+
+SEARCH_KEYWORDS = ['数学', '物理', '']
+COURSES_TO_ADD = 10
+WEEKS = range(1, 21)
+MONTH_FLIPS = 5
+EXPORT_FORMATS = ['csv', 'xlsx', 'pdf', 'json', 'ics', 'html']
+DEFAULT_STALL_THRESHOLD = 0.05
+
+
+class StallMonitor(QObject):
+    """界面线程心跳：记录两次心跳间隔超过阈值的卡顿，归属于当前步骤"""
+
+    def __init__(self, threshold=DEFAULT_STALL_THRESHOLD, interval_ms=1):
+        super().__init__()
+        self.threshold = threshold
+        self.step = None
+        self.stalls = []  # (步骤, 时长)
+        self._last = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        if self._last is not None and now - self._last > self.threshold:
+            self.stalls.append((self.step, now - self._last))
+        self._last = now
+
+    def start(self):
+        self._last = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+
+@contextmanager
+def auto_dialogs(export_dir):
+    """会话期间消息框直接返回确认，保存对话框返回导出目录中的文件"""
+    originals = {name: getattr(QMessageBox, name) for name in ('information', 'warning', 'critical', 'question')}
+    original_save = QFileDialog.getSaveFileName
+    export = {'format': 'csv'}
+
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.warning = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.critical = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.Yes)
+    QFileDialog.getSaveFileName = staticmethod(
+        lambda *args, **kwargs: (os.path.join(export_dir, f"schedule.{export['format']}"), ''))
+    try:
+        yield export
+    finally:
+        for name, func in originals.items():
+            setattr(QMessageBox, name, func)
+        QFileDialog.getSaveFileName = original_save
+
+
+class SessionRunner:
+    """执行脚本化会话并收集每步的测量结果"""
+
+    def __init__(self, app, stall_threshold=DEFAULT_STALL_THRESHOLD, timeout=60.0):
+        self.app = app
+        self.timeout = timeout
+        self.monitor = StallMonitor(stall_threshold)
+        self.steps = []  # {'step', 'latency', 'objects', 'widgets'}
+        self.window = None
+
+    def pump(self, until=None):
+        """处理事件直到条件满足且工作线程没有未送达的结果，再处理一轮剩余事件（重绘）"""
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            self.app.processEvents(QEventLoop.AllEvents, 10)
+            idle = self.window is None or not self.window.db_worker.pending_count()
+            if idle and (until is None or until()):
+                break
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"步骤 {self.monitor.step} 超过 {self.timeout}s 未完成")
+            time.sleep(0.0005)
+        self.app.processEvents()
+
+    def step(self, name, action, until=None):
+        self.monitor.step = name
+        start = time.perf_counter()
+        result = action()
+        self.pump(until)
+        latency = time.perf_counter() - start
+        # processEvents 不处理 deleteLater() 的删除（只在事件循环返回时执行），计数前显式处理
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        self.steps.append({
+            'step': name,
+            'latency': latency,
+            'objects': len(self.window.findChildren(QObject)) if self.window is not None else 0,
+            'widgets': len(self.app.allWidgets()),
+        })
+        self.monitor.step = None
+        return result
+
+    def run(self, semester=None, export_dir=None):
+        from ui import CourseSelectionMainWindow
+
+        self.monitor.start()
+        with auto_dialogs(export_dir) as export:
+            def open_window():
+                self.window = CourseSelectionMainWindow()
+                self.window.show()
+
+            self.step('startup', open_window, until=lambda: self.window.course_table.rowCount() > 0
+                      and self.window.catalog_snapshot is not None)
+            window = self.window
+
+            if semester:
+                def semester_loaded():
+                    snapshot = window.catalog_snapshot
+                    return snapshot is not None and snapshot.semester == semester and window.course_table.rowCount() > 0
+                self.step('semester_change', lambda: window.semester_combo.setCurrentText(semester),
+                          until=semester_loaded)
+
+            for keyword in SEARCH_KEYWORDS:
+                def search(keyword=keyword):
+                    window.search_input.setText(keyword)
+                    window.search_courses()
+                self.step('search', search)
+
+            rows = window.course_table.rowCount()
+            for index in range(min(COURSES_TO_ADD, rows)):
+                row = index * max(1, rows // COURSES_TO_ADD)
+
+                def add(row=row):
+                    window.course_table.setCurrentCell(row, 0)
+                    window.add_course()
+                self.step('add_course', add)
+
+            self.step('open_week_view', lambda: window.schedule_tabs.setCurrentIndex(1))
+            for week in WEEKS:
+                self.step('week_change', lambda week=week: window.week_view.week_spinbox.setValue(week))
+
+            self.step('open_month_view', lambda: window.schedule_tabs.setCurrentIndex(0))
+            for _ in range(MONTH_FLIPS):
+                self.step('month_change', window.month_view.next_month)
+            for _ in range(MONTH_FLIPS):
+                self.step('month_change', window.month_view.prev_month)
+
+            for fmt in EXPORT_FORMATS:
+                def run_export(fmt=fmt):
+                    export['format'] = fmt
+                    window.export_schedule()
+                self.step(f'export.{fmt}', run_export)
+
+            self.step('close', window.close)
+        self.monitor.stop()
+        return self.summary()
+
+    def summary(self):
+        """按步骤名汇总: 次数、延迟中位数/最大值、卡顿次数/最大值、步骤结束时的对象数"""
+        stalls = {}
+        for step, duration in self.monitor.stalls:
+            stalls.setdefault(step, []).append(duration)
+
+        summary = {}
+        for record in self.steps:
+            entry = summary.setdefault(record['step'], {'count': 0, 'latencies': []})
+            entry['count'] += 1
+            entry['latencies'].append(record['latency'])
+            entry['objects'] = record['objects']
+            entry['widgets'] = record['widgets']
+        for name, entry in summary.items():
+            latencies = entry.pop('latencies')
+            step_stalls = stalls.get(name, [])
+            entry.update({
+                'latency_median': statistics.median(latencies),
+                'latency_max': max(latencies),
+                'latency_total': sum(latencies),
+                'stalls': len(step_stalls),
+                'stall_max': max(step_stalls, default=0.0),
+            })
+        return summary
+
+
+def run_session(semester=None, stall_threshold=DEFAULT_STALL_THRESHOLD):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory(prefix='ucas_session_') as export_dir:
+        runner = SessionRunner(app, stall_threshold)
+        summary = runner.run(semester, export_dir)
+        exported = sorted(os.listdir(export_dir))
+    return {'steps': summary, 'exported': exported, 'stall_threshold': stall_threshold}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="界面会话基准（offscreen）")
+    parser.add_argument('--runs', type=int, default=1, help="会话次数（取每步延迟中位数的中位数）")
+    parser.add_argument('--semester', default=None, help="先切换到该学期（可用合成课程库测大规模）")
+    parser.add_argument('--stall-ms', type=float, default=DEFAULT_STALL_THRESHOLD * 1000,
+                        help="卡顿阈值（毫秒）")
+    parser.add_argument('--json', default=None, help="把每次会话的结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    runs = [run_session(args.semester, args.stall_ms / 1000) for _ in range(args.runs)]
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(runs, f, ensure_ascii=False, indent=2)
+
+    last = runs[-1]['steps']
+    print(f"{'步骤':<18}{'次数':>6}{'中位数ms':>12}{'最大ms':>10}{'合计ms':>10}"
+          f"{'卡顿':>6}{'最长卡顿ms':>12}{'QObject':>9}{'QWidget':>9}")
+    for name in last:
+        median = statistics.median(run['steps'][name]['latency_median'] for run in runs)
+        entry = last[name]
+        print(f"{name:<18}{entry['count']:>6}{median * 1000:>12.1f}{entry['latency_max'] * 1000:>10.1f}"
+              f"{entry['latency_total'] * 1000:>10.1f}{entry['stalls']:>6}{entry['stall_max'] * 1000:>12.1f}"
+              f"{entry['objects']:>9}{entry['widgets']:>9}")
+    print(f"\n导出文件: {', '.join(runs[-1]['exported']) or '无'}（卡顿阈值 {args.stall_ms:.0f}ms）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,23 +17,50 @@ WINDOW_MIN_WIDTH = 1200
 WINDOW_MIN_HEIGHT = 800
 
 # 学期配置
-SEMESTER_START_DATE = "2025-09-01"  # 学期开始日期
+SEMESTER_START_DATE = "2025-09-01"  # 学期开始日期（默认学期）
 MAX_CREDITS = 30  # 建议最大学分
 
+# 学期课程库配置：每个学期一个独立的数据库文件，按需ATTACH
+DEFAULT_SEMESTER = "2025秋季"
+SEMESTER_CATALOGS = {
+    "2025秋季": {"db_path": DATABASE_PATH, "start_date": SEMESTER_START_DATE},
+}
+# 额外的学期库目录，文件名即学期名，例如 catalogs/2026春季.db；
+# 这些学期的开始日期记录在课程库中（python -m database.migrate_catalogs --start-date）
+SEMESTER_CATALOG_DIR = "catalogs"
+
 # 导出配置
 EXPORT_DIR = "exports"  # 默认导出目录
 SUPPORTED_EXPORT_FORMATS = {
     'csv': 'CSV文件 (*.csv)',
     'xlsx': 'Excel文件 (*.xlsx)', 
     'pdf': 'PDF文件 (*.pdf)',
-    'json': 'JSON文件 (*.json)'
+    'json': 'JSON文件 (*.json)',
+    'ics': 'iCalendar日历 (*.ics)',
+    'html': 'HTML网页 (*.html)'
 }
 
-# 时间节次映射
+# PDF中文字体：TTF/TTC字体路径，未设置时依次尝试 PDF_CJK_FONT_CANDIDATES，
+# 都不存在则使用reportlab内置的 STSong-Light（不嵌入字体）
+PDF_CJK_FONT_PATH = os.environ.get("UCAS_PDF_FONT")
+PDF_CJK_FONT_CANDIDATES = [
+    "C:/Windows/Fonts/simhei.ttf",
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simsun.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/arphic/uming.ttc",
+]
+
+# 时间节次映射（课程库中晚上的课程排到第12、13节）
 TIME_SLOTS = {
     1: "08:00-08:50", 2: "09:00-09:50", 3: "10:10-11:00", 4: "11:10-12:00",
     5: "14:00-14:50", 6: "15:00-15:50", 7: "16:10-17:00", 8: "17:10-18:00",
-    9: "19:00-19:50", 10: "20:00-20:50", 11: "21:00-21:50"
+    9: "19:00-19:50", 10: "20:00-20:50", 11: "21:00-21:50", 12: "22:00-22:50",
+    13: "23:00-23:50"
 }
 
 # 星期映射
@@ -46,6 +73,46 @@ WEEKDAYS = {
 LOG_LEVEL = "INFO"
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+# 获取所有可用学期
+def get_semester_catalogs():
+    """
+    返回 {学期: {"db_path": ..., "start_date": ...}}，包含目录中发现的学期库
+    （发现的学期库 start_date 为None，由 CourseDatabase.get_semester_start_date 从课程库元数据读取）
+    """
+    catalogs = {name: dict(info) for name, info in SEMESTER_CATALOGS.items()}
+    if os.path.isdir(SEMESTER_CATALOG_DIR):
+        for filename in sorted(os.listdir(SEMESTER_CATALOG_DIR)):
+            name, ext = os.path.splitext(filename)
+            if ext == '.db' and name not in catalogs:
+                catalogs[name] = {
+                    "db_path": os.path.join(SEMESTER_CATALOG_DIR, filename),
+                    "start_date": None
+                }
+    return catalogs
+
+# SQL追踪配置（调试用）：UCAS_SQL_TRACE=1 启用，退出时打印按操作汇总的统计表
+SQL_TRACE_ENABLED = os.environ.get("UCAS_SQL_TRACE", "") == "1"
+SQL_TRACE_LOG = os.environ.get("UCAS_SQL_TRACE_LOG")  # 可选：JSONL日志路径
+
+# 界面卡顿监视（可常开）：UCAS_STALL_WATCHDOG=1 启用，事件循环超过阈值未响应时记录界面线程调用栈
+STALL_WATCHDOG_ENABLED = os.environ.get("UCAS_STALL_WATCHDOG", "") == "1"
+STALL_WATCHDOG_THRESHOLD_MS = float(os.environ.get("UCAS_STALL_THRESHOLD_MS", "50"))
+STALL_WATCHDOG_LOG = os.environ.get("UCAS_STALL_LOG")  # 可选：JSONL日志路径
+
+# 余量监控配置：轮询选课系统的课程余量接口（GET <endpoint>/enrollment/<课程代码>）
+MONITOR_ENDPOINT = os.environ.get("UCAS_MONITOR_ENDPOINT", "http://127.0.0.1:8766")
+MONITOR_POLL_INTERVAL = 30.0  # 每门课程的轮询间隔（秒）
+MONITOR_CONCURRENCY = 16  # 同时在途的请求数上限
+MONITOR_RATE_LIMIT = 50.0  # 对接口的全局请求速率上限（次/秒）
+MONITOR_MAX_BACKOFF = 600.0  # 出错后退避的最长间隔（秒）
+MONITOR_EVENT_DB = "monitor_events.db"  # 变化事件存储
+MONITOR_EVENT_RETENTION_DAYS = 30  # 事件保留天数
+MONITOR_EVENT_PRUNE_INTERVAL = 3600.0  # 监控运行期间按保留天数清理事件存储的间隔（秒）
+NOTIFY_DEDUPE_WINDOW = 30.0  # 同一课程同一字段两次通知的最短间隔（秒）
+NOTIFY_BATCH_WINDOW = 2.0  # 变化事件合并为一条通知的等待时间（秒）
+NOTIFY_MAX_BATCH = 50  # 一条通知最多包含的变化数
+NOTIFY_RATE_LIMITS = {"tray": 0.2, "webhook": 5.0, "log": 50.0}  # 各通知渠道每秒最多发送的通知数
+
 # 创建导出目录
 def ensure_export_dir():
     """确保导出目录存在"""
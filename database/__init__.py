@@ -4,5 +4,9 @@
 """
 
 from .course_db import CourseDatabase
+from .query_cache import QueryCache
+from .query_trace import QueryTracer, traced_action, current_actions
+from .catalog_snapshot import CatalogSnapshot
 
-__all__ = ['CourseDatabase']
+__all__ = ['CourseDatabase', 'QueryCache', 'QueryTracer', 'traced_action', 'current_actions',
+           'CatalogSnapshot']
@@ -0,0 +1,54 @@
+"""
+课程目录快照
+把整个学期的课程及时间安排一次性读入内存，之后按课程ID选取导出数据时不再访问数据库。
+用于批量导出等需要对同一目录反复选取的场景
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """课程目录的内存快照"""
+
+    def __init__(self, courses, semester=None):
+        """
+        Args:
+            courses: 按目录顺序排列的课程数据（结构同 get_selected_courses_with_schedules 的元素）
+            semester: 快照所属学期
+        """
+        self.semester = semester
+        self._courses = list(courses)
+        self._positions = {course['id']: index for index, course in enumerate(self._courses)}
+
+    @classmethod
+    def from_database(cls, db, batch_size=1000):
+        """从数据库当前学期流式构建快照"""
+        snapshot = cls(db.iter_catalog_courses(batch_size=batch_size), semester=db.semester)
+        logger.info(f"Catalog snapshot loaded: {len(snapshot)} courses")
+        return snapshot
+
+    def __len__(self):
+        return len(self._courses)
+
+    def __contains__(self, course_id):
+        return course_id in self._positions
+
+    def __iter__(self):
+        return iter(self._courses)
+
+    def get(self, course_id):
+        """按ID获取课程数据，不存在时返回None"""
+        position = self._positions.get(course_id)
+        return self._courses[position] if position is not None else None
+
+    def select(self, course_ids):
+        """按目录顺序返回选中的课程数据，忽略目录中不存在的ID"""
+        positions = sorted({self._positions[course_id] for course_id in course_ids
+                            if course_id in self._positions})
+        return [self._courses[position] for position in positions]
+
+    def missing(self, course_ids):
+        """返回目录中不存在的课程ID"""
+        return [course_id for course_id in course_ids if course_id not in self._positions]
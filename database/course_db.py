@@ -3,56 +3,326 @@
 处理与课程数据相关的所有数据库操作
 """
 
+import os
+import hashlib
 import sqlite3
 import logging
+from contextlib import nullcontext
+
+from config import get_semester_catalogs
+from .query_cache import QueryCache, cached_query
 
 logger = logging.getLogger(__name__)
 
+# 学期库ATTACH后使用的schema别名（同一时间只挂载一个学期库）
+SEMESTER_SCHEMA = "sem"
+
+# 热点查询的覆盖索引：索引包含查询选取的全部列，命中后无需回表
+# 访问路径由 database/query_plan.py 检查，修改查询时请同步运行该检查
+COVERING_INDEXES = {
+    # get_all_courses / search_courses: 按课程名有序扫描
+    'idx_courses_name_cover': 'courses(course_name, id, credits, hours, course_code)',
+    # get_course_schedules / get_selected_courses_with_schedules: 按course_id查找
+    'idx_course_schedules_cover': 'course_schedules(course_id, day_of_week, time_slots, location, weeks, semester)',
+}
+
+# 课程库结构迁移，版本号记录在 PRAGMA user_version 中；{schema} 为目标schema
+CATALOG_MIGRATIONS = {
+    # 1: 覆盖索引
+    1: [f"CREATE INDEX IF NOT EXISTS {{schema}}.{name} ON {definition}"
+        for name, definition in COVERING_INDEXES.items()],
+    # 2: idx_courses_name 是 idx_courses_name_cover 的前缀，存在时查询规划器会选它做非覆盖扫描
+    2: ["DROP INDEX IF EXISTS {schema}.idx_courses_name"],
+}
+CATALOG_SCHEMA_VERSION = max(CATALOG_MIGRATIONS)
+
+
+# 课程库元数据表（键值对），如学期开始日期 start_date；不属于结构迁移，由维护工具按需创建
+CATALOG_META_TABLE = "catalog_meta"
+
+
+def read_catalog_meta(conn, key, schema="main"):
+    """读取课程库元数据，没有元数据表或该键时返回None"""
+    try:
+        row = conn.execute(f"SELECT value FROM {schema}.{CATALOG_META_TABLE} WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def write_catalog_meta(conn, key, value, schema="main"):
+    """写入课程库元数据（维护工具使用，CourseDatabase 不写入课程库）"""
+    with conn:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {schema}.{CATALOG_META_TABLE} "
+                     f"(key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(f"INSERT OR REPLACE INTO {schema}.{CATALOG_META_TABLE} (key, value) VALUES (?, ?)",
+                     (key, value))
+
+
+def get_catalog_version(conn, schema="main"):
+    """读取课程库结构版本（只读）"""
+    return conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+
+
+def migrate_catalog(conn, schema="main"):
+    """
+    一次性迁移：依次执行高于当前版本的迁移、更新统计信息并记录结构版本
+    已是最新版本时不做任何写入。打开数据库时不会自动调用，
+    由 python -m database.migrate_catalogs 或生成课程库的工具显式执行
+
+    Returns:
+        bool: 是否执行了迁移
+    """
+    version = get_catalog_version(conn, schema)
+    if version >= CATALOG_SCHEMA_VERSION:
+        return False
+    with conn:
+        for target in sorted(CATALOG_MIGRATIONS):
+            if target > version:
+                for statement in CATALOG_MIGRATIONS[target]:
+                    conn.execute(statement.format(schema=schema))
+        conn.execute(f"ANALYZE {schema}")
+        conn.execute(f"PRAGMA {schema}.user_version = {CATALOG_SCHEMA_VERSION}")
+    return True
+
 
 class CourseDatabase:
-    """课程数据库操作类"""
+    """课程数据库操作类
     
-    def __init__(self, db_path="ucas_courses_new.db"):
+    每个学期的课程数据存放在独立的数据库文件中。切换学期时按需ATTACH
+    对应文件，所有查询只访问当前学期的表和索引，历史学期不影响查询开销。
+    """
+    
+    def __init__(self, db_path="ucas_courses_new.db", semester=None, enable_cache=True):
         self.db_path = db_path
+        self.semester = None
+        self.schema = "main"  # 当前学期数据所在的schema
+        self._conn = None
+        self._attached_path = None
+        # 读结果缓存，数据库内容变化时自动失效
+        self.cache = QueryCache() if enable_cache else None
+        # SQL追踪器（可选），见 enable_tracing
+        self.tracer = None
+        
+        if semester:
+            self.set_semester(semester)
+    
+    def _get_connection(self):
+        """获取（惰性创建）数据库连接，ATTACH的学期库依附于该连接"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            if self.tracer is not None:
+                self._conn.set_trace_callback(self.tracer.on_statement)
+            self._check_catalog_version("main", self.db_path)
+        return self._conn
+    
+    def _check_catalog_version(self, schema, path):
+        """打开课程库时只检查结构版本，不写入（课程库可能只读或受版本控制）"""
+        try:
+            version = get_catalog_version(self._conn, schema)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read catalog version of {path}: {e}")
+            return
+        if version < CATALOG_SCHEMA_VERSION:
+            logger.warning(f"Catalog {path} is at schema version {version} (current {CATALOG_SCHEMA_VERSION}), "
+                           f"covering indexes may be missing; run python -m database.migrate_catalogs")
+    
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self.schema = "main"
+            self.semester = None
+            self._attached_path = None
+        if self.cache is not None:
+            self.cache.invalidate()
     
+    def get_data_version(self):
+        """
+        获取当前数据版本
+        
+        由各schema的 PRAGMA data_version（其他连接提交后变化）
+        和数据库文件mtime（文件被替换时变化）组成。
+        """
+        conn = self._get_connection()
+        version = [conn.execute("PRAGMA main.data_version").fetchone()[0]]
+        paths = [self.db_path]
+        if self.schema == SEMESTER_SCHEMA:
+            version.append(conn.execute(f"PRAGMA {SEMESTER_SCHEMA}.data_version").fetchone()[0])
+            paths.append(self._attached_path)
+        for path in paths:
+            try:
+                version.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                version.append(None)
+        return tuple(version)
+    
+    def get_cache_stats(self):
+        """获取查询缓存统计（命中/未命中等），未启用缓存时返回None"""
+        return self.cache.get_stats() if self.cache is not None else None
+    
+    def invalidate_cache(self):
+        """手动清空查询缓存"""
+        if self.cache is not None:
+            self.cache.invalidate()
+    
+    def enable_tracing(self, tracer):
+        """启用SQL追踪，统计每个操作执行的语句、行数和耗时"""
+        self.tracer = tracer
+        if self._conn is not None:
+            self._conn.set_trace_callback(tracer.on_statement)
+    
+    def disable_tracing(self):
+        """关闭SQL追踪"""
+        self.tracer = None
+        if self._conn is not None:
+            self._conn.set_trace_callback(None)
+    
+    def trace_action(self, name):
+        """标记一个界面操作，其间执行的SQL归属于该操作；未启用追踪时不做任何事"""
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.action(name)
+    
+    def get_available_semesters(self):
+        """获取所有可用学期"""
+        return list(get_semester_catalogs().keys())
+    
+    def get_semester_start_date(self, semester=None):
+        """
+        获取学期开始日期（"YYYY-MM-DD"）
+        
+        SEMESTER_CATALOGS 中配置的日期优先，否则读取学期库元数据中记录的日期
+        （catalogs/ 目录中发现的学期库用 python -m database.migrate_catalogs --start-date 记录）。
+        都没有时返回None，调用方不能用其他学期的日期代替
+        """
+        catalogs = get_semester_catalogs()
+        semester = semester or self.semester
+        if semester is not None:
+            catalog = catalogs.get(semester)
+            if not catalog:
+                return None
+        else:
+            # 未选择学期时查询的就是 db_path 本身
+            catalog = next((info for info in catalogs.values()
+                            if os.path.abspath(info["db_path"]) == os.path.abspath(self.db_path)),
+                           {"db_path": self.db_path})
+        if catalog.get("start_date"):
+            return catalog["start_date"]
+        
+        if semester == self.semester:
+            return read_catalog_meta(self._get_connection(), "start_date", self.schema)
+        conn = sqlite3.connect(f"file:{os.path.abspath(catalog['db_path'])}?mode=ro", uri=True)
+        try:
+            return read_catalog_meta(conn, "start_date")
+        finally:
+            conn.close()
+    
+    def set_semester(self, semester):
+        """切换当前学期，按需ATTACH该学期的数据库文件"""
+        catalogs = get_semester_catalogs()
+        if semester not in catalogs:
+            raise ValueError(f"未知学期: {semester}")
+        
+        path = catalogs[semester]["db_path"]
+        conn = self._get_connection()
+        
+        # 卸载之前挂载的学期库
+        if self.schema == SEMESTER_SCHEMA:
+            conn.execute(f"DETACH DATABASE {SEMESTER_SCHEMA}")
+            self.schema = "main"
+            self._attached_path = None
+        
+        if os.path.abspath(path) != os.path.abspath(self.db_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"学期数据库不存在: {path}")
+            conn.execute(f"ATTACH DATABASE ? AS {SEMESTER_SCHEMA}", (path,))
+            self.schema = SEMESTER_SCHEMA
+            self._attached_path = path
+            self._check_catalog_version(SEMESTER_SCHEMA, path)
+        
+        self.semester = semester
+        if self.cache is not None:
+            self.cache.invalidate()
+        logger.info(f"Switched to semester {semester} ({path})")
+    
+    @cached_query
     def get_all_courses(self):
         """获取所有课程 - 修改后的结构：去除teacher列"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
-        query = '''
+        query = f'''
             SELECT DISTINCT c.id, c.course_name, c.credits, c.hours, c.course_code
-            FROM courses c
+            FROM {self.schema}.courses c
             ORDER BY c.course_name
         '''
         cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return cursor.fetchall()
     
+    @cached_query
+    def get_courses_by_ids(self, course_ids):
+        """
+        一次查询批量获取课程基本信息，目录中不存在的ID不返回
+        
+        Returns:
+            list: [(id, course_name, credits, hours, course_code)]，顺序不保证
+        """
+        if not course_ids:
+            return []
+        
+        cursor = self._get_connection().cursor()
+        placeholders = ','.join(['?' for _ in course_ids])
+        cursor.execute(f'''
+            SELECT id, course_name, credits, hours, course_code
+            FROM {self.schema}.courses
+            WHERE id IN ({placeholders})
+        ''', list(course_ids))
+        return cursor.fetchall()
+    
+    @cached_query
+    def get_catalog_fingerprint(self):
+        """
+        课程目录指纹（课程ID与课程代码的哈希）
+        
+        用于确认选课方案中的课程ID与当前目录一致，不同机器上的同一目录指纹相同。
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute(f'''
+            SELECT id, course_code FROM {self.schema}.courses
+            ORDER BY course_name, id
+        ''')
+        
+        digest = hashlib.sha1()
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for course_id, course_code in rows:
+                digest.update(f"{course_id}:{course_code or ''}\n".encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    @cached_query
     def get_course_schedules(self, course_id):
         """获取特定课程的时间安排"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
-        query = '''
+        query = f'''
             SELECT day_of_week, time_slots, location, weeks, semester
-            FROM course_schedules
+            FROM {self.schema}.course_schedules
             WHERE course_id = ?
         '''
         cursor.execute(query, (course_id,))
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return cursor.fetchall()
     
+    @cached_query
     def search_courses(self, keyword="", department=""):
         """搜索课程 - 移除teacher参数"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
-        query = '''
+        query = f'''
             SELECT DISTINCT c.id, c.course_name, c.credits, c.hours, c.course_code
-            FROM courses c
+            FROM {self.schema}.courses c
             WHERE 1=1
         '''
         params = []
@@ -68,54 +338,134 @@ class CourseDatabase:
         query += ' ORDER BY c.course_name'
         
         cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return cursor.fetchall()
     
+    @cached_query
     def get_statistics(self):
         """获取数据库统计信息"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
         stats = {}
         
         # 课程总数
-        cursor.execute('SELECT COUNT(*) FROM courses')
+        cursor.execute(f'SELECT COUNT(*) FROM {self.schema}.courses')
         stats['total_courses'] = cursor.fetchone()[0]
         
         # 学时数量
-        cursor.execute('SELECT COUNT(DISTINCT hours) FROM courses WHERE hours IS NOT NULL AND hours != ""')
+        cursor.execute(f'SELECT COUNT(DISTINCT hours) FROM {self.schema}.courses WHERE hours IS NOT NULL AND hours != ""')
         stats['hours'] = cursor.fetchone()[0]
         
         # 时间安排数量
-        cursor.execute('SELECT COUNT(*) FROM course_schedules')
+        cursor.execute(f'SELECT COUNT(*) FROM {self.schema}.course_schedules')
         stats['schedules'] = cursor.fetchone()[0]
         
-        conn.close()
         return stats
     
+    def iter_catalog_rows(self, batch_size=1000):
+        """
+        流式读取整个课程目录（每个时间安排一行），用于大批量导出
+        
+        按 fetchmany 分批从游标读取，内存占用与目录大小无关。结果不进入查询缓存。
+        
+        Yields:
+            tuple: (course_code, course_name, credits, hours,
+                    day_of_week, time_slots, location, weeks, semester)
+        """
+        yield from self._iter_catalog_query(
+            'c.course_code, c.course_name, c.credits, c.hours, '
+            'cs.day_of_week, cs.time_slots, cs.location, cs.weeks, cs.semester',
+            batch_size
+        )
+    
+    def iter_catalog_courses(self, batch_size=1000):
+        """
+        流式读取整个课程目录，按课程分组
+        
+        Yields:
+            dict: 与 get_selected_courses_with_schedules 的元素结构相同的课程数据
+        """
+        rows = self._iter_catalog_query(
+            'c.id, c.course_name, c.credits, c.hours, c.course_code, '
+            'cs.day_of_week, cs.time_slots, cs.location, cs.weeks, cs.semester',
+            batch_size
+        )
+        
+        course = None
+        for course_id, course_name, credits, hours, course_code, day_of_week, time_slots, location, weeks, semester in rows:
+            if course is None or course['id'] != course_id:
+                if course is not None:
+                    yield course
+                course = {
+                    'id': course_id,
+                    'name': course_name,
+                    'credits': credits,
+                    'hours': hours,
+                    'code': course_code,
+                    'schedules': []
+                }
+            
+            if day_of_week is not None:  # 有时间安排
+                course['schedules'].append({
+                    'day_of_week': day_of_week,
+                    'time_slots': time_slots,
+                    'location': location,
+                    'weeks': weeks,
+                    'semester': semester
+                })
+        
+        if course is not None:
+            yield course
+    
+    def _iter_catalog_query(self, columns, batch_size):
+        """按课程名顺序流式读取课程与时间安排的连接结果"""
+        # 使用独立游标，迭代期间仍可执行其他查询
+        cursor = self._get_connection().cursor()
+        
+        query = f'''
+            SELECT {columns}
+            FROM {self.schema}.courses c
+            LEFT JOIN {self.schema}.course_schedules cs ON c.id = cs.course_id
+            ORDER BY c.course_name, c.id, cs.day_of_week, cs.time_slots
+        '''
+        
+        try:
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+    
+    @cached_query
     def get_selected_courses_with_schedules(self, selected_course_ids):
         """获取已选课程及其时间安排，用于导出功能"""
         if not selected_course_ids:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._get_connection().cursor()
         
         # 构建查询语句
         placeholders = ','.join(['?' for _ in selected_course_ids])
         query = f'''
             SELECT c.id, c.course_name, c.credits, c.hours, c.course_code,
                    cs.day_of_week, cs.time_slots, cs.location, cs.weeks, cs.semester
-            FROM courses c
-            LEFT JOIN course_schedules cs ON c.id = cs.course_id
+            FROM {self.schema}.courses c
+            LEFT JOIN {self.schema}.course_schedules cs ON c.id = cs.course_id
             WHERE c.id IN ({placeholders})
-            ORDER BY c.course_name, cs.day_of_week, cs.time_slots
         '''
         
         cursor.execute(query, selected_course_ids)
         results = cursor.fetchall()
-        conn.close()
+        
+        # 结果集很小，在Python中排序以避免SQLite为ORDER BY建立临时B树
+        # （与 ORDER BY c.course_name, cs.day_of_week, cs.time_slots 等价，NULL排在最前）
+        results.sort(key=lambda row: (
+            (row[1] is not None, row[1] or ''),
+            (row[5] is not None, row[5] or ''),
+            (row[6] is not None, row[6] or '')
+        ))
         
         # 组织数据结构
         courses_data = {}
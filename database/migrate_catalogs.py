@@ -0,0 +1,94 @@
+"""
+课程库一次性迁移
+把课程库升级到 CATALOG_SCHEMA_VERSION（创建覆盖索引等）。CourseDatabase 打开课程库时
+只读取结构版本，不再写入，新导入或从旧版本拷贝来的课程库需要执行一次本命令。
+--start-date 同时在课程库元数据中记录学期开始日期（catalogs/ 目录中发现的学期库没有配置日期，
+月视图和日历导出需要它）
+
+用法:
+    python -m database.migrate_catalogs            # 主课程库和所有已配置的学期库
+    python -m database.migrate_catalogs a.db b.db  # 指定课程库
+    python -m database.migrate_catalogs --start-date 2026-02-23 catalogs/2026春季.db
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+import logging
+from datetime import date
+
+from config import get_semester_catalogs
+from .course_db import CATALOG_SCHEMA_VERSION, get_catalog_version, migrate_catalog, write_catalog_meta
+
+logger = logging.getLogger(__name__)
+
+
+def default_catalog_paths():
+    """所有已配置学期的课程库路径（去重，保持配置顺序）"""
+    paths = []
+    for catalog in get_semester_catalogs().values():
+        path = catalog['db_path']
+        if os.path.abspath(path) not in {os.path.abspath(p) for p in paths}:
+            paths.append(path)
+    return paths
+
+
+def migrate_path(path, start_date=None):
+    """
+    迁移单个课程库，可同时记录学期开始日期
+
+    Returns:
+        tuple: (迁移前版本, 是否执行了迁移)
+    """
+    conn = sqlite3.connect(path)
+    try:
+        version = get_catalog_version(conn)
+        migrated = migrate_catalog(conn)
+        if start_date:
+            write_catalog_meta(conn, "start_date", start_date)
+        return version, migrated
+    finally:
+        conn.close()
+
+
+def _iso_date(value):
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="迁移课程库到最新结构版本")
+    parser.add_argument('paths', nargs='*', help="课程库路径（默认为主课程库和所有已配置的学期库）")
+    parser.add_argument('--start-date', type=_iso_date, default=None,
+                        help="在课程库中记录学期开始日期（YYYY-MM-DD，第1周内任意一天），需要指定课程库")
+    args = parser.parse_args(argv)
+    if args.start_date and not args.paths:
+        parser.error("--start-date 需要指定课程库")
+    paths = args.paths or default_catalog_paths()
+
+    failed = 0
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"✗ {path}: 文件不存在")
+            failed += 1
+            continue
+        try:
+            version, migrated = migrate_path(path, args.start_date)
+        except sqlite3.Error as e:
+            print(f"✗ {path}: {e}")
+            failed += 1
+            continue
+        if migrated:
+            print(f"✓ {path}: 版本 {version} -> {CATALOG_SCHEMA_VERSION}")
+        else:
+            print(f"- {path}: 已是版本 {version}")
+        if args.start_date:
+            print(f"  学期开始日期: {args.start_date}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+查询结果缓存
+按 (查询, 参数) 缓存 CourseDatabase 的读结果，
+通过 PRAGMA data_version 与数据库文件mtime判断数据是否变化
+"""
+
+import sys
+import time
+import functools
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+# 估算长结果的内存时抽样的元素数
+SIZE_SAMPLE = 32
+
+
+def _estimate_size(value):
+    """
+    粗略估算缓存值占用的内存（字节）
+
+    短序列逐项测量；长序列均匀抽取 SIZE_SAMPLE 项测量后按长度折算，
+    行长度不一（如课程名长短不同）时也能得到接近的估计，开销与结果行数无关
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        count = len(value)
+        if count <= SIZE_SAMPLE:
+            size += sum(_estimate_size(item) for item in value)
+        else:
+            step = count / SIZE_SAMPLE
+            sample = sum(_estimate_size(value[int(i * step)]) for i in range(SIZE_SAMPLE))
+            size += sample * count // SIZE_SAMPLE
+    elif isinstance(value, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    return size
+
+
+def _immutable(value):
+    """
+    把查询结果中的列表转换为元组，写入缓存时调用一次
+
+    缓存命中时直接返回同一个对象，不再复制。字典（统计信息、课程数据）保留为字典以便
+    JSON导出，其中的列表同样转换为元组；调用方不得修改返回的字典
+    """
+    if isinstance(value, list):
+        return tuple(_immutable(item) for item in value)
+    if isinstance(value, dict):
+        return {k: _immutable(v) for k, v in value.items()}
+    return value
+
+
+def _freeze(value):
+    """把参数转换为可哈希的形式"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class QueryCache:
+    """带内存上限的LRU查询缓存"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, validate_interval=0.5):
+        """
+        Args:
+            max_bytes: 缓存内容的估算内存上限
+            validate_interval: 两次检查数据版本之间的最短间隔（秒），
+                间隔内的重复读取只需一次字典查找
+        """
+        self.max_bytes = max_bytes
+        self.validate_interval = validate_interval
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._total_bytes = 0
+        self._version = None
+        self._validated_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def validate(self, version_func):
+        """检查数据版本，变化时清空缓存"""
+        now = time.monotonic()
+        if now - self._validated_at < self.validate_interval:
+            return
+        self._validated_at = now
+
+        version = version_func()
+        if version != self._version:
+            if self._entries:
+                logger.debug(f"Data version changed {self._version} -> {version}, cache cleared")
+            self.clear()
+            self._version = version
+
+    def get(self, key):
+        """返回 (是否命中, 缓存值)，缓存值是共享的只读结果"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, key, value):
+        """
+        写入缓存，超出内存上限时淘汰最久未使用的条目
+
+        Returns:
+            转换为只读形式（列表转为元组）的值，调用方应返回它，使未命中与命中时的结果类型一致
+        """
+        value = _immutable(value)
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return value
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._total_bytes -= old[1]
+
+        self._entries[key] = (value, size)
+        self._total_bytes += size
+
+        while self._total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        """清空缓存"""
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def invalidate(self):
+        """强制下次读取时重新检查数据版本"""
+        self.clear()
+        self._version = None
+        self._validated_at = 0.0
+
+    def get_stats(self):
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+def cached_query(method):
+    """
+    CourseDatabase 读方法的缓存装饰器
+
+    缓存键为 (学期schema, 方法名, 参数)。启用缓存时结果中的列表转换为元组，命中时直接返回
+    缓存中的同一个对象，不做复制，调用方不得修改返回值。启用SQL追踪时同时记录
+    缓存命中、返回行数和查询耗时。
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.cache
+        tracer = self.tracer
+
+        if cache is not None:
+            cache.validate(self.get_data_version)
+            key = (self.schema, self.semester, method.__name__, _freeze(args), _freeze(kwargs))
+            hit, value = cache.get(key)
+            if hit:
+                if tracer is not None:
+                    tracer.record_cache_hit()
+                return value
+
+        if tracer is None:
+            value = method(self, *args, **kwargs)
+        else:
+            start = time.perf_counter()
+            value = method(self, *args, **kwargs)
+            rows = len(value) if isinstance(value, list) else 1
+            tracer.record_query(rows, time.perf_counter() - start)
+
+        if cache is not None:
+            value = cache.put(key, value)
+        return value
+
+    return wrapper
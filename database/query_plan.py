@@ -0,0 +1,207 @@
+"""
+查询计划回归检查
+对 CourseDatabase 中的每条查询运行 EXPLAIN QUERY PLAN，只接受按索引查找（SEARCH），
+以及必须读取整张表、在 COVERING_SCANS 中登记过的查询的覆盖索引扫描；其他扫描和临时B树
+（排序/去重）都报错，防止访问路径悄悄退化。课程库尚未迁移时检查迁移后的临时副本。
+tests/test_query_plan.py 在测试中执行同样的检查
+
+用法:
+    python -m database.query_plan [数据库路径]
+"""
+
+import os
+import re
+import sys
+import shutil
+import sqlite3
+import inspect
+import logging
+import tempfile
+from contextlib import contextmanager
+
+from .course_db import CourseDatabase, CATALOG_SCHEMA_VERSION, get_catalog_version, migrate_catalog
+
+logger = logging.getLogger(__name__)
+
+# 每个查询方法的示例参数；新增查询方法时必须在此登记
+QUERY_PLAN_CASES = [
+    ('get_all_courses', ()),
+    ('get_course_schedules', (1,)),
+    ('search_courses', ('数学', '')),
+    ('search_courses', ('', '40')),
+    ('search_courses', ('数学', '40')),
+    ('get_statistics', ()),
+    ('get_selected_courses_with_schedules', ([1, 2, 3],)),
+    ('iter_catalog_rows', ()),
+    ('iter_catalog_courses', ()),
+    ('get_courses_by_ids', ([1, 2, 3],)),
+    ('get_catalog_fingerprint', ()),
+    ('get_semester_start_date', ()),
+]
+
+# 必须读取整张表的查询：{方法名: (允许扫描的覆盖索引, 原因)}。这些查询只能按登记的覆盖索引扫描
+# （不回表、不排序），其他查询只允许 SEARCH。不要为了让检查通过而登记新的查询
+COVERING_SCANS = {
+    'get_all_courses': ({'idx_courses_name_cover'}, "结果就是整个课程目录（按课程名排序）"),
+    'iter_catalog_rows': ({'idx_courses_name_cover'}, "流式导出整个课程目录"),
+    'iter_catalog_courses': ({'idx_courses_name_cover'}, "构建整个目录的内存快照"),
+    'get_catalog_fingerprint': ({'idx_courses_name_cover'}, "对目录中每门课程的ID和代码求哈希"),
+    'search_courses': ({'idx_courses_name_cover'}, "LIKE '%关键词%' 是子串匹配，任何B树索引都无法查找"),
+    'get_statistics': ({'idx_courses_hours', 'idx_course_schedules_course_id'},
+                       "COUNT(*) / COUNT(DISTINCT) 需要数出整张表"),
+}
+
+_COVERING_SCAN = re.compile(r'^SCAN \S+ USING COVERING INDEX (\w+)')
+
+# 不执行SQL的公开方法
+NON_QUERY_METHODS = {
+    'close', 'set_semester', 'get_available_semesters',
+    'get_data_version', 'get_cache_stats', 'invalidate_cache',
+    'enable_tracing', 'disable_tracing', 'trace_action',
+}
+
+
+def explain_query_plan(conn, sql):
+    """返回查询计划的detail列表"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def find_plan_problems(plan, allowed_scans=()):
+    """
+    从查询计划中找出不允许的扫描和临时B树
+
+    Args:
+        allowed_scans: 该查询允许扫描的覆盖索引名
+    """
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN'):
+            if 'CONSTANT ROW' in detail:
+                continue
+            match = _COVERING_SCAN.match(detail)
+            if match and match.group(1) in allowed_scans:
+                continue
+            if 'USING' not in detail:
+                problems.append(f"全表扫描: {detail}")
+            else:
+                problems.append(f"未登记的索引扫描: {detail}")
+        elif 'TEMP B-TREE' in detail:
+            problems.append(f"临时B树: {detail}")
+    return problems
+
+
+def collect_queries(db):
+    """执行所有登记的查询方法，通过trace回调收集实际执行的SELECT语句"""
+    statements = []
+    current = {'method': None}
+
+    def trace(statement):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((current['method'], statement))
+
+    conn = db._get_connection()
+    conn.set_trace_callback(trace)
+    try:
+        for method, args in QUERY_PLAN_CASES:
+            current['method'] = method
+            result = getattr(db, method)(*args)
+            if inspect.isgenerator(result):
+                # 生成器方法需要迭代才会执行查询
+                for _ in result:
+                    pass
+    finally:
+        conn.set_trace_callback(None)
+
+    return statements
+
+
+def find_unregistered_methods():
+    """找出未在 QUERY_PLAN_CASES 中登记的公开方法"""
+    registered = {name for name, _ in QUERY_PLAN_CASES} | NON_QUERY_METHODS
+    public_methods = {
+        name for name in dir(CourseDatabase)
+        if not name.startswith('_') and callable(getattr(CourseDatabase, name))
+    }
+    return sorted(public_methods - registered)
+
+
+def check_query_plans(db):
+    """
+    检查所有查询的访问路径
+
+    Returns:
+        list: (方法名, SQL, 问题列表) 的列表，为空表示全部通过
+    """
+    failures = []
+
+    for name in find_unregistered_methods():
+        failures.append((name, '', ["未登记到 QUERY_PLAN_CASES"]))
+
+    conn = db._get_connection()
+    seen = set()
+    for method, sql in collect_queries(db):
+        if sql in seen:
+            continue
+        seen.add(sql)
+        allowed_scans = COVERING_SCANS[method][0] if method in COVERING_SCANS else ()
+        problems = find_plan_problems(explain_query_plan(conn, sql), allowed_scans)
+        if problems:
+            failures.append((method, ' '.join(sql.split()), problems))
+
+    return failures
+
+
+@contextmanager
+def migrated_catalog(db_path):
+    """
+    按最新结构版本检查课程库：已是最新版本时直接使用原文件，
+    否则在临时目录中复制一份并执行迁移（不修改原文件）
+
+    Yields:
+        str: 可供检查的课程库路径
+    """
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        version = get_catalog_version(conn)
+    finally:
+        conn.close()
+    if version >= CATALOG_SCHEMA_VERSION:
+        yield db_path
+        return
+
+    with tempfile.TemporaryDirectory(prefix='ucas_query_plan_') as directory:
+        copy_path = os.path.join(directory, os.path.basename(db_path))
+        shutil.copyfile(db_path, copy_path)
+        conn = sqlite3.connect(copy_path)
+        try:
+            migrate_catalog(conn)
+        finally:
+            conn.close()
+        logger.info(f"{db_path} is at schema version {version}, checking a migrated copy")
+        yield copy_path
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db_path = argv[0] if argv else "ucas_courses_new.db"
+
+    with migrated_catalog(db_path) as checked_path:
+        db = CourseDatabase(checked_path, enable_cache=False)
+        try:
+            failures = check_query_plans(db)
+        finally:
+            db.close()
+
+    if not failures:
+        print(f"✓ 所有查询计划检查通过 ({len(QUERY_PLAN_CASES)} 个用例)")
+        return 0
+
+    for method, sql, problems in failures:
+        print(f"✗ {method}: {sql}")
+        for problem in problems:
+            print(f"    {problem}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
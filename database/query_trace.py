@@ -0,0 +1,210 @@
+"""
+SQL调用追踪
+通过 sqlite3 的 set_trace_callback 统计每个界面操作（添加课程、搜索、
+切换周次、导出等）触发的SQL语句数、返回行数和耗时，用于定位N+1查询
+"""
+
+import re
+import json
+import time
+import inspect
+import functools
+import threading
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+IDLE_ACTION = "(idle)"
+
+# 各线程正在执行的界面操作（外层在前），卡顿监视器据此报告触发卡顿的操作；
+# 只包含正在执行操作的线程，由各线程自己增删（其他线程只读取），因此不用 threading.local
+_active_actions = {}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def normalize_statement(statement):
+    """把SQL中的字面量替换为?，使同一查询的多次执行可以归并统计"""
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    return ' '.join(statement.split())
+
+
+class _ActionStats:
+    """单个操作名的累计统计"""
+
+    def __init__(self):
+        self.calls = 0
+        self.statements = 0
+        self.rows = 0
+        self.sql_time = 0.0
+        self.wall_time = 0.0
+        self.cache_hits = 0
+        self.statement_counts = Counter()
+
+    def to_dict(self, top=5):
+        return {
+            'calls': self.calls,
+            'statements': self.statements,
+            'rows': self.rows,
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'wall_ms': round(self.wall_time * 1000, 3),
+            'cache_hits': self.cache_hits,
+            'top_statements': self.statement_counts.most_common(top),
+        }
+
+
+class QueryTracer:
+    """
+    SQL追踪器
+
+    语句、行数和耗时归属于最外层的操作，即触发它们的界面动作；
+    操作之外执行的语句归入 "(idle)"。
+    """
+
+    def __init__(self, log_path=None):
+        """
+        Args:
+            log_path: JSONL日志路径，每完成一次最外层操作追加一行；为None时不写日志
+        """
+        self.log_path = log_path
+        self.actions = {}
+        self._stack = []
+        self._current = None  # 当前最外层操作的本次统计
+
+    def _stats_for(self, name):
+        stats = self.actions.get(name)
+        if stats is None:
+            stats = self.actions[name] = _ActionStats()
+        return stats
+
+    def _targets(self):
+        """当前语句需要累加到的统计对象（累计统计 + 本次操作统计）"""
+        if not self._stack:
+            return (self._stats_for(IDLE_ACTION),)
+        return (self._stats_for(self._stack[0]), self._current)
+
+    @contextmanager
+    def action(self, name):
+        """标记一个界面操作，嵌套调用时归属于最外层操作"""
+        outermost = not self._stack
+        if outermost:
+            self._current = _ActionStats()
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            if outermost:
+                elapsed = time.perf_counter() - start
+                stats = self._stats_for(name)
+                stats.calls += 1
+                stats.wall_time += elapsed
+                self._current.calls = 1
+                self._current.wall_time = elapsed
+                self._write_log(name, self._current)
+                self._current = None
+
+    def on_statement(self, statement):
+        """sqlite3 trace回调：记录每条执行的语句"""
+        normalized = normalize_statement(statement)
+        for stats in self._targets():
+            stats.statements += 1
+            stats.statement_counts[normalized] += 1
+
+    def record_query(self, rows, elapsed):
+        """记录一次查询方法调用返回的行数和耗时"""
+        for stats in self._targets():
+            stats.rows += rows
+            stats.sql_time += elapsed
+
+    def record_cache_hit(self):
+        """记录一次查询缓存命中"""
+        for stats in self._targets():
+            stats.cache_hits += 1
+
+    def _write_log(self, name, stats):
+        if not self.log_path:
+            return
+        record = {'action': name, 'time': time.time()}
+        record.update(stats.to_dict(top=3))
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to write SQL trace log: {e}")
+
+    def reset(self):
+        """清空累计统计"""
+        self.actions.clear()
+
+    def get_summary(self):
+        """按操作名返回累计统计"""
+        return {name: stats.to_dict() for name, stats in self.actions.items()}
+
+    def format_summary(self, top=3):
+        """格式化为文本表格"""
+        header = f"{'操作':<20}{'次数':>6}{'语句':>8}{'语句/次':>9}{'行数':>9}{'SQL ms':>10}{'总 ms':>10}{'缓存命中':>9}"
+        lines = [header, '-' * len(header)]
+        ordered = sorted(self.actions.items(), key=lambda item: item[1].statements, reverse=True)
+        for name, stats in ordered:
+            per_call = stats.statements / stats.calls if stats.calls else float(stats.statements)
+            lines.append(
+                f"{name:<20}{stats.calls:>6}{stats.statements:>8}{per_call:>9.1f}{stats.rows:>9}"
+                f"{stats.sql_time * 1000:>10.1f}{stats.wall_time * 1000:>10.1f}{stats.cache_hits:>9}"
+            )
+            for statement, count in stats.statement_counts.most_common(top):
+                lines.append(f"    {count:>6} × {statement[:100]}")
+        return '\n'.join(lines)
+
+    def print_summary(self):
+        """打印统计表"""
+        print(self.format_summary())
+
+
+def traced_action(name):
+    """
+    方法装饰器：把方法执行期间的SQL归属到名为name的操作
+
+    用于持有 self.db 的界面类。被装饰方法常直接连接到Qt信号，
+    多出的信号参数（如clicked的checked）会被丢弃，与PyQt的调用约定一致。
+    未启用追踪时也记录当前线程正在执行的操作（见 current_actions），供卡顿监视器使用。
+    """
+    def decorator(method):
+        parameters = list(inspect.signature(method).parameters.values())[1:]
+        if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            max_args = None
+        else:
+            max_args = sum(1 for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            thread_id = threading.get_ident()
+            actions = _active_actions.setdefault(thread_id, [])
+            actions.append(name)
+            try:
+                db = getattr(self, 'db', None)
+                if db is None or db.tracer is None:
+                    return method(self, *args, **kwargs)
+                with db.tracer.action(name):
+                    return method(self, *args, **kwargs)
+            finally:
+                actions.pop()
+                if not actions:
+                    # 最外层操作结束时删除该线程的条目，已结束的线程（如数据库工作线程）不会留下空列表
+                    del _active_actions[thread_id]
+
+        return wrapper
+
+    return decorator
+
+
+def current_actions(thread_id=None):
+    """线程正在执行的 traced_action 操作名（外层在前），默认为当前线程；可在其他线程中调用"""
+    return list(_active_actions.get(thread_id if thread_id is not None else threading.get_ident(), ()))
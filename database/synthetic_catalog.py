@@ -0,0 +1,348 @@
+"""
+合成课程目录生成器
+按真实课程库的分布生成任意规模的课程数据库，用于 10×、100× 规模下的基准和压力测试：
+- 表结构与 ucas_courses_new.db 相同（courses / course_schedules 及其索引）
+- 学分与学时（联合分布）、每门课的时间安排条数、星期、节次（"1、2"）、周次（"2、3、…"）、
+  上课地点和课程代码前缀都从真实课程库抽样；真实库不存在时使用内置的近似分布
+- 课程名由真实课程名加前缀、后缀或教学班号组合，课程代码形如 "180080070100M1001H"，
+  分班课程带 "-01" 后缀
+- 相同的规模和种子生成完全相同的数据库
+
+用法:
+    python -m database.synthetic_catalog --scale 10 -o catalogs/合成10x.db
+    python -m database.synthetic_catalog --courses 220000 --seed 7 -o /tmp/catalog_100x.db --compare
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import logging
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH, SEMESTER_START_DATE
+from database.course_db import migrate_catalog, write_catalog_meta
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE courses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_code TEXT,
+        course_name TEXT,
+        credits TEXT,
+        hours TEXT
+    );
+    CREATE TABLE course_schedules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER,
+        day_of_week TEXT,
+        time_slots TEXT,
+        location TEXT,
+        weeks TEXT,
+        semester TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (course_id) REFERENCES courses (id)
+    );
+'''
+
+# 合成课程库默认记录的学期开始日期
+DEFAULT_START_DATE = SEMESTER_START_DATE
+
+# 数据写入后再建索引，比逐行维护索引快得多
+_INDEXES = '''
+    CREATE INDEX idx_course_schedules_course_id ON course_schedules(course_id);
+    CREATE INDEX idx_courses_code ON courses(course_code);
+    CREATE INDEX idx_courses_hours ON courses(hours);
+'''
+
+# 真实课程库不可用时的近似分布: [(取值, 权重)]
+_BUILTIN_PROFILE = {
+    'credits_hours': [(('2.00', '40'), 560), (('1.00', '20'), 150), (('3.00', '60'), 400),
+                      (('2.50', '50'), 240), (('1.00', '30'), 250), (('2.00', '32'), 90),
+                      (('0.50', '10'), 80), (('2.00', '36'), 110), (('3.00', '50'), 60),
+                      (('1.00', '32'), 170), (('0.50', '16'), 90), (('1.50', '30'), 6)],
+    'schedule_counts': [(0, 2), (1, 1622), (2, 554), (3, 7), (4, 1), (6, 2)],
+    'days': [('1', 479), ('2', 582), ('3', 533), ('4', 566), ('5', 402), ('6', 142), ('7', 71)],
+    'time_slots': [('5、6、7', 716), ('10、11、12', 365), ('3、4', 333), ('1、2', 288), ('5、6', 180),
+                   ('1、2、3', 134), ('2、3、4', 122), ('7、8', 110), ('11、12、13', 104),
+                   ('1、2、3、4', 103), ('5、6、7、8', 90), ('10、11', 79), ('10、11、12、13', 50)],
+    'weeks': [('2、3、4、5、6、7、8、9、10、11、12、13、14、15、16', 286),
+              ('2、3、4、5、6、7、8、9、10、11、12、13、14、15、16、17', 285),
+              ('2、3、4、5、6、7、8、9、10、11、12、13、14、15、16、17、18、19、20', 179),
+              ('2、3、4、5、6、7、8、9、10、11、12、13、14、15、16、17、18', 132),
+              ('2、3、4、5、6、7、8、9、10、11、12、13、14、15', 109),
+              ('2、3、4、5、6、7、8、9、10、11、12', 107), ('2、3、4、5、6、7、8、9、10、11', 90),
+              ('2、4、5、6、7、8、9、10、11、12', 83), ('5、6、7、8、9、10、11、12、13、14、15、16', 40),
+              ('2、3、4、5、6、7、8、9', 60)],
+    'locations': [(f'教一楼{floor}{room:02d}', 20) for floor in range(1, 5) for room in range(1, 15)]
+                 + [(f'教二楼{floor}{room:02d}', 20) for floor in range(1, 3) for room in range(1, 20)]
+                 + [(f'教学楼S{floor}{room:02d}', 10) for floor in range(1, 4) for room in range(1, 10)]
+                 + [('学园一254(机房)', 8), ('教学楼阶一5', 22), ('教学楼阶二1', 15)],
+    'code_prefixes': [('180089', 260), ('180083', 116), ('180084', 114), ('180096', 100),
+                      ('180213', 96), ('18017B', 93), ('280223', 88), ('280227', 86),
+                      ('180093', 83), ('180090', 76), ('180080', 60), ('180086', 50)],
+    'disciplines': [('070100', 80), ('081200', 70), ('080900', 60), ('071000', 50), ('070200', 50),
+                    ('081000', 45), ('070300', 40), ('083000', 35), ('050200', 30), ('120100', 25)],
+    'levels': [('P', 1218), ('M', 824), ('D', 147)],
+    'names': ['数值分析', '最优化计算方法', '高等量子力学', '机器学习', '模式识别', '算法设计与分析',
+              '数据挖掘', '固体物理', '分子生物学', '有机化学', '自然辩证法概论', '科技政策与管理',
+              '英语写作', '统计学习', '地球化学', '大气物理学', '微电子系统封装', '计算机网络',
+              '分布式系统', '信号处理', '生态学研究方法', '材料表征技术', '环境科学概论', '代数I'],
+}
+
+_NAME_PREFIXES = ['', '', '', '', '高等', '现代', '应用', '计算', '高级', '前沿']
+_NAME_SUFFIXES = ['', '', '', '', '专题', '研讨', '实验', '（英文授课）', 'II', '进展']
+_SECTION_SUFFIX = re.compile(r'[-－].*班.*$')
+
+
+def _split(pairs):
+    values = [value for value, _ in pairs]
+    cumulative = []
+    total = 0
+    for _, weight in pairs:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+
+class CatalogProfile:
+    """各字段的经验分布，来自真实课程库或内置近似值"""
+
+    FIELDS = ('credits_hours', 'schedule_counts', 'days', 'time_slots', 'weeks', 'locations',
+              'code_prefixes', 'disciplines', 'levels')
+
+    def __init__(self, distributions, names, source):
+        self.distributions = {field: _split(distributions[field]) for field in self.FIELDS}
+        self.names = names
+        self.source = source
+
+    @classmethod
+    def builtin(cls):
+        return cls(_BUILTIN_PROFILE, list(_BUILTIN_PROFILE['names']), 'builtin')
+
+    @classmethod
+    def from_database(cls, db_path=DATABASE_PATH):
+        """从真实课程库统计分布；文件不存在或为空时返回内置分布"""
+        if not os.path.exists(db_path):
+            logger.warning(f"Catalog {db_path} not found, using builtin distributions")
+            return cls.builtin()
+
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            courses = conn.execute("SELECT id, course_code, course_name, credits, hours FROM courses").fetchall()
+            schedules = conn.execute(
+                "SELECT course_id, day_of_week, time_slots, location, weeks FROM course_schedules"
+            ).fetchall()
+        finally:
+            conn.close()
+        if not courses:
+            return cls.builtin()
+
+        per_course = Counter(course_id for course_id, *_ in schedules)
+        codes = [code for _, code, _, _, _ in courses if code and len(code) >= 13]
+        distributions = {
+            'credits_hours': Counter((credits, hours) for _, _, _, credits, hours in courses),
+            'schedule_counts': Counter(per_course.get(course_id, 0) for course_id, *_ in courses),
+            'days': Counter(day for _, day, _, _, _ in schedules if day),
+            'time_slots': Counter(slots for _, _, slots, _, _ in schedules if slots),
+            'weeks': Counter(weeks for _, _, _, _, weeks in schedules if weeks),
+            'locations': Counter(location for _, _, _, location, _ in schedules if location),
+            'code_prefixes': Counter(code[:6] for code in codes),
+            'disciplines': Counter(code[6:12] for code in codes),
+            'levels': Counter(code[12] for code in codes if code[12] in 'PMD'),
+        }
+        names = sorted({_SECTION_SUFFIX.sub('', name) for _, _, name, _, _ in courses if name})
+        return cls({field: counter.most_common() for field, counter in distributions.items()},
+                   names, db_path)
+
+    @property
+    def course_count(self):
+        """分布来源中的课程数"""
+        return self.distributions['schedule_counts'][1][-1]
+
+    def sample(self, rng, field, k=1):
+        values, cumulative = self.distributions[field]
+        return rng.choices(values, cum_weights=cumulative, k=k)
+
+
+def _course_name(rng, profile, used_names):
+    base = rng.choice(profile.names)
+    prefix = rng.choice(_NAME_PREFIXES)
+    if base.startswith(tuple(_NAME_PREFIXES[4:])):
+        prefix = ''
+    name = f"{prefix}{base}{rng.choice(_NAME_SUFFIXES)}"
+    # 大规模时名称难免重复，与真实目录一样用教学班区分
+    count = used_names[name] = used_names.get(name, 0) + 1
+    return name if count == 1 else f"{name}-{count:02d}班"
+
+
+def generate_rows(count, seed=0, profile=None, semester='2025秋季'):
+    """
+    生成 count 门课程的行数据
+
+    Returns:
+        (courses, schedules): courses 为 (id, 代码, 名称, 学分, 学时)，
+        schedules 为 (course_id, 星期, 节次, 地点, 周次, 学期)
+    """
+    rng = random.Random(seed)
+    profile = profile or CatalogProfile.from_database()
+    credits_hours = profile.sample(rng, 'credits_hours', count)
+    schedule_counts = profile.sample(rng, 'schedule_counts', count)
+
+    courses = []
+    schedules = []
+    used_names = {}
+    serials = Counter()
+    course_id = 0
+    while len(courses) < count:
+        # 约一成课程分多个教学班，各班代码相同前缀、带 "-NN" 后缀，名称相同
+        sections = rng.choice((2, 2, 3, 4, 6)) if rng.random() < 0.1 else 1
+        sections = min(sections, count - len(courses))
+        prefix = profile.sample(rng, 'code_prefixes')[0] + profile.sample(rng, 'disciplines')[0]
+        level = profile.sample(rng, 'levels')[0]
+        category = rng.choice('1234569XB')
+        key = (prefix, level, category)
+        serials[key] += 1
+        suffix = rng.choices(('H', 'Y', 'Z', ''), weights=(80, 10, 5, 5))[0]
+        code = f"{prefix}{level}{category}{serials[key]:03d}{suffix}"
+        name = _course_name(rng, profile, used_names)
+        weeks = profile.sample(rng, 'weeks')[0]
+
+        for section in range(1, sections + 1):
+            credits, hours = credits_hours[len(courses)]
+            n_schedules = schedule_counts[len(courses)]
+            course_id += 1
+            courses.append((course_id, code if sections == 1 else f"{code}-{section:02d}",
+                            name, credits, hours))
+            location = profile.sample(rng, 'locations')[0]
+            days = set()
+            for _ in range(n_schedules):
+                day = profile.sample(rng, 'days')[0]
+                # 同一门课的多次上课尽量安排在不同的星期
+                for _ in range(3):
+                    if day not in days:
+                        break
+                    day = profile.sample(rng, 'days')[0]
+                days.add(day)
+                schedules.append((course_id, day, profile.sample(rng, 'time_slots')[0], location,
+                                  weeks, semester))
+    return courses, schedules
+
+
+def generate_catalog(db_path, count, seed=0, semester=None, profile=None, overwrite=False,
+                     start_date=DEFAULT_START_DATE):
+    """
+    生成合成课程库
+
+    Args:
+        db_path: 输出路径；放在 catalogs/ 下时，文件名即学期名，会出现在学期列表中
+        count: 课程数
+        semester: course_schedules.semester 的值，默认为文件名
+        start_date: 记录在课程库元数据中的学期开始日期（catalogs/ 中的学期库没有配置日期）
+
+    Returns:
+        dict: 课程数、时间安排数和耗时
+    """
+    if os.path.exists(db_path):
+        if not overwrite:
+            raise FileExistsError(f"文件已存在: {db_path}")
+        os.remove(db_path)
+    semester = semester or os.path.splitext(os.path.basename(db_path))[0]
+
+    start = time.perf_counter()
+    courses, schedules = generate_rows(count, seed, profile, semester)
+    generate_seconds = time.perf_counter() - start
+
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(_SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT INTO courses (id, course_code, course_name, credits, hours) VALUES (?, ?, ?, ?, ?)",
+                courses)
+            conn.executemany(
+                "INSERT INTO course_schedules (course_id, day_of_week, time_slots, location, weeks, semester) "
+                "VALUES (?, ?, ?, ?, ?, ?)", schedules)
+        conn.executescript(_INDEXES)
+        # 覆盖索引、ANALYZE 和结构版本与真实课程库的迁移一致
+        migrate_catalog(conn)
+        if start_date:
+            write_catalog_meta(conn, "start_date", start_date)
+    finally:
+        conn.close()
+
+    result = {
+        'courses': len(courses),
+        'schedules': len(schedules),
+        'generate_seconds': generate_seconds,
+        'total_seconds': time.perf_counter() - start,
+    }
+    logger.info(f"Generated {result['courses']} courses / {result['schedules']} schedules "
+                f"into {db_path} in {result['total_seconds']:.2f}s")
+    return result
+
+
+def summarize(db_path, top=5):
+    """主要分布的摘要 {字段: [(取值, 比例)]}，用于与真实课程库对比"""
+    profile = CatalogProfile.from_database(db_path)
+    summary = {}
+    for field in ('credits_hours', 'schedule_counts', 'days', 'time_slots', 'levels'):
+        values, cumulative = profile.distributions[field]
+        weights = [cumulative[0]] + [b - a for a, b in zip(cumulative, cumulative[1:])]
+        total = cumulative[-1]
+        ranked = sorted(zip(values, weights), key=lambda item: -item[1])[:top]
+        summary[field] = [(value, weight / total) for value, weight in ranked]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按真实分布生成合成课程库")
+    parser.add_argument('-o', '--output', required=True, help="输出数据库路径")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--courses', type=int, default=None, help="课程数")
+    size.add_argument('--scale', type=float, default=10, help="相对真实课程库的倍数（默认10）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--semester', default=None, help="学期名（默认为输出文件名）")
+    parser.add_argument('--source', default=DATABASE_PATH, help="提供分布的真实课程库")
+    parser.add_argument('--start-date', default=DEFAULT_START_DATE,
+                        help=f"记录在课程库中的学期开始日期（默认 {DEFAULT_START_DATE}）")
+    parser.add_argument('--force', action='store_true', help="覆盖已存在的输出文件")
+    parser.add_argument('--compare', action='store_true', help="输出与真实课程库的分布对比")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    profile = CatalogProfile.from_database(args.source)
+    count = args.courses if args.courses is not None else int(profile.course_count * args.scale)
+
+    try:
+        result = generate_catalog(args.output, count, args.seed, args.semester, profile, args.force,
+                                  args.start_date)
+    except FileExistsError as e:
+        parser.error(f"{e}（使用 --force 覆盖）")
+    print(f"生成 {result['courses']} 门课程、{result['schedules']} 条时间安排: {args.output} "
+          f"({result['total_seconds']:.2f}s，分布来源 {profile.source})")
+
+    if args.compare:
+        real, synthetic = summarize(args.source), summarize(args.output)
+        for field in real:
+            print(f"\n{field}")
+            print(f"  {'真实':<32}{'合成'}")
+            for (real_value, real_share), (value, share) in zip(real[field], synthetic[field]):
+                left = f"{real_value} {real_share:.1%}"
+                print(f"  {left:<32}{value} {share:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
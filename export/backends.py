@@ -0,0 +1,113 @@
+"""
+导出后端注册表
+pandas、reportlab 等重量级依赖在第一次导出时才导入，
+可用性通过 importlib.util.find_spec 探测，不会触发导入
+"""
+
+import importlib.util
+import logging
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+
+class LazyBackend:
+    """按需加载的导出后端"""
+
+    def __init__(self, name, modules, loader):
+        """
+        Args:
+            name: 后端名称
+            modules: 用于探测可用性的顶层模块名列表
+            loader: 无参函数，执行实际导入并返回后端对象
+        """
+        self.name = name
+        self.modules = list(modules)
+        self.loader = loader
+        self._available = None
+        self._backend = None
+
+    def is_available(self):
+        """探测依赖是否已安装（只查找模块规格，不导入）"""
+        if self._available is None:
+            self._available = all(importlib.util.find_spec(module) is not None
+                                  for module in self.modules)
+        return self._available
+
+    def is_loaded(self):
+        return self._backend is not None
+
+    def load(self):
+        """导入后端，结果在进程内缓存"""
+        if self._backend is None:
+            if not self.is_available():
+                raise ImportError(f"{self.name} is not installed")
+            self._backend = self.loader()
+            logger.debug(f"Export backend loaded: {self.name}")
+        return self._backend
+
+
+class BackendRegistry:
+    """导出后端注册表"""
+
+    def __init__(self):
+        self._backends = {}
+
+    def register(self, name, modules, loader):
+        """注册后端"""
+        self._backends[name] = LazyBackend(name, modules, loader)
+
+    def is_available(self, name):
+        backend = self._backends.get(name)
+        return backend is not None and backend.is_available()
+
+    def is_loaded(self, name):
+        backend = self._backends.get(name)
+        return backend is not None and backend.is_loaded()
+
+    def get(self, name):
+        """获取（必要时导入）后端，依赖缺失时抛出ImportError"""
+        backend = self._backends.get(name)
+        if backend is None:
+            raise KeyError(f"Unknown export backend: {name}")
+        return backend.load()
+
+    def names(self):
+        return list(self._backends)
+
+
+def _load_pandas():
+    import pandas as pd
+    return pd
+
+
+def _load_reportlab():
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import (SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer,
+                                    PageBreak)
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    return SimpleNamespace(
+        A4=A4,
+        landscape=landscape,
+        SimpleDocTemplate=SimpleDocTemplate,
+        Table=Table,
+        TableStyle=TableStyle,
+        Paragraph=Paragraph,
+        Spacer=Spacer,
+        PageBreak=PageBreak,
+        getSampleStyleSheet=getSampleStyleSheet,
+        ParagraphStyle=ParagraphStyle,
+        colors=colors,
+        pdfmetrics=pdfmetrics,
+        TTFont=TTFont,
+        UnicodeCIDFont=UnicodeCIDFont,
+    )
+
+
+backends = BackendRegistry()
+backends.register('pandas', ['pandas'], _load_pandas)
+backends.register('reportlab', ['reportlab'], _load_reportlab)
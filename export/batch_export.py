@@ -0,0 +1,313 @@
+"""
+批量导出
+为整个年级的选课方案一次性导出课程表。方案分发到进程池执行，
+每个工作进程只加载一次课程目录快照和导出后端，之后的方案都直接复用。
+输出到目录，或打包为单个zip
+
+用法:
+    python -m export.batch_export plans.json -o out_dir [-f csv,xlsx,pdf,ics,json] [--workers N]
+    python -m export.batch_export plans.json -o cohort.zip
+    python -m export.batch_export plans.json -o site/ -f html   # 带索引页的静态站点
+
+方案文件格式（JSON）:
+    {"张三": [12, 57, 301], "李四": [8, 57]}
+    或 [{"name": "张三", "course_ids": [12, 57, 301]}, ...]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .schedule_exporter import ScheduleExporter, REPORTLAB_AVAILABLE
+from . import pdf_renderer
+from . import html_exporter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH
+from database import CourseDatabase, CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+# 格式 -> (扩展名, ScheduleExporter方法名)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'export_to_csv'),
+    'xlsx': ('.xlsx', 'export_to_excel'),
+    'pdf': ('.pdf', 'export_to_pdf'),
+    'ics': ('.ics', 'export_to_ics'),
+    'json': ('.json', 'export_to_json'),
+    'html': ('.html', 'export_to_html'),
+}
+
+_ILLEGAL_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def load_plans(file_path):
+    """
+    读取方案文件
+
+    Returns:
+        list: [(方案名, [课程ID, ...])]
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        items = data.items()
+    else:
+        items = ((plan['name'], plan['course_ids']) for plan in data)
+    return [(str(name), [int(course_id) for course_id in course_ids]) for name, course_ids in items]
+
+
+def safe_filenames(names):
+    """把方案名转换为互不重复的文件名（不含扩展名）"""
+    used = set()
+    result = []
+    for name in names:
+        base = _ILLEGAL_FILENAME_CHARS.sub('_', name).strip('._') or 'plan'
+        candidate, n = base, 2
+        while candidate.lower() in used:
+            candidate = f"{base}_{n}"
+            n += 1
+        used.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+# ---- 工作进程 ----
+
+_worker_state = None
+
+
+def _init_worker(db_path, semester, formats):
+    """工作进程初始化：加载目录快照，预热导出后端"""
+    global _worker_state
+    db = CourseDatabase(db_path, semester=semester, enable_cache=False)
+    try:
+        snapshot = CatalogSnapshot.from_database(db)
+        semester_start_date = db.get_semester_start_date()
+    finally:
+        db.close()
+
+    if 'pdf' in formats and REPORTLAB_AVAILABLE:
+        # 字体注册和样式构建在进程内只做一次
+        pdf_renderer.get_pdf_styles()
+
+    _worker_state = {
+        'snapshot': snapshot,
+        'exporter': ScheduleExporter(),
+        'semester_start_date': semester_start_date,
+    }
+
+
+def _export_plan(plan_name, course_ids, output_stem, formats):
+    """在工作进程中导出一个方案的所有格式"""
+    state = _worker_state
+    snapshot = state['snapshot']
+    exporter = state['exporter']
+
+    # 所有格式共用一个导出模型，课程列表和网格只计算一次
+    model = exporter.as_export_model(snapshot.select(course_ids))
+    result = {
+        'name': plan_name,
+        'files': [],
+        'timings': {},
+        'failed': [],
+        'missing': snapshot.missing(course_ids),
+    }
+
+    for fmt in formats:
+        extension, method_name = EXPORT_FORMATS[fmt]
+        file_path = output_stem + extension
+        kwargs = {}
+        if fmt == 'ics':
+            kwargs = {'semester_start_date': state['semester_start_date'], 'calendar_name': plan_name}
+        elif fmt == 'html':
+            kwargs = {'title': plan_name}
+
+        start = time.perf_counter()
+        success = getattr(exporter, method_name)(model, file_path, **kwargs)
+        result['timings'][fmt] = time.perf_counter() - start
+        if success:
+            result['files'].append(file_path)
+        else:
+            result['failed'].append(fmt)
+
+    return result
+
+
+# ---- 主进程 ----
+
+class BatchExportReport:
+    """批量导出结果汇总"""
+
+    def __init__(self, formats):
+        self.formats = list(formats)
+        self.plans = 0
+        self.files = 0
+        self.failures = []  # (方案名, 格式)
+        self.missing = {}  # 方案名 -> 不存在的课程ID
+        self.format_time = {fmt: 0.0 for fmt in formats}
+        self.format_count = {fmt: 0 for fmt in formats}
+        self.wall_time = 0.0
+
+    def add(self, result):
+        self.plans += 1
+        self.files += len(result['files'])
+        for fmt, seconds in result['timings'].items():
+            self.format_time[fmt] += seconds
+            self.format_count[fmt] += 1
+        self.failures.extend((result['name'], fmt) for fmt in result['failed'])
+        if result['missing']:
+            self.missing[result['name']] = result['missing']
+
+    def format_summary(self):
+        """格式化为文本报告"""
+        rate = self.plans / self.wall_time if self.wall_time > 0 else float('inf')
+        lines = [
+            f"批量导出完成: {self.plans} 个方案, {self.files} 个文件, "
+            f"耗时 {self.wall_time:.2f}s ({rate:.1f} 方案/秒)",
+            f"  {'格式':<8}{'文件数':>8}{'累计耗时 s':>12}{'平均 ms':>10}{'文件/秒':>10}",
+        ]
+        for fmt in self.formats:
+            count = self.format_count[fmt]
+            seconds = self.format_time[fmt]
+            average = seconds / count * 1000 if count else 0.0
+            per_second = count / seconds if seconds > 0 else 0.0
+            lines.append(f"  {fmt:<8}{count:>8}{seconds:>12.3f}{average:>10.1f}{per_second:>10.1f}")
+        if self.failures:
+            lines.append(f"  失败: {len(self.failures)} 个文件")
+        if self.missing:
+            lines.append(f"  {len(self.missing)} 个方案包含目录中不存在的课程ID")
+        return '\n'.join(lines)
+
+
+def export_batch(plans, output, formats=('csv',), db_path=DATABASE_PATH, semester=None,
+                 workers=None, progress=None):
+    """
+    批量导出多个方案
+
+    Args:
+        plans: [(方案名, [课程ID, ...])]
+        output: 输出目录，或以 .zip 结尾的压缩包路径
+        formats: 导出格式，见 EXPORT_FORMATS
+        workers: 工作进程数，默认为CPU核数；为1时在当前进程中执行
+        progress: 每完成一个方案调用 progress(已完成数, 总数, 方案名)
+
+    Returns:
+        BatchExportReport
+    """
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"不支持的导出格式: {', '.join(unknown)}")
+    if 'ics' in formats:
+        # 日历按学期开始日期排课，不能用其他学期的日期代替
+        db = CourseDatabase(db_path, semester=semester, enable_cache=False)
+        try:
+            semester_start_date = db.get_semester_start_date()
+        finally:
+            db.close()
+        if not semester_start_date:
+            raise ValueError(f"学期 {semester or db_path} 没有记录开始日期，无法导出 ics"
+                             f"（python -m database.migrate_catalogs --start-date YYYY-MM-DD 课程库）")
+
+    to_zip = output.lower().endswith('.zip')
+    if to_zip:
+        output_dir = tempfile.mkdtemp(prefix='ucas_batch_export_')
+    else:
+        output_dir = output
+        os.makedirs(output_dir, exist_ok=True)
+
+    report = BatchExportReport(formats)
+    html_pages = []  # (方案名, 文件名)，用于生成索引页
+    stems = [os.path.join(output_dir, name) for name in safe_filenames(name for name, _ in plans)]
+    jobs = [(name, course_ids, stem, formats) for (name, course_ids), stem in zip(plans, stems)]
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    start = time.perf_counter()
+    archive = zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) if to_zip else None
+    try:
+        def collect(result):
+            report.add(result)
+            html_pages.extend((result['name'], os.path.basename(file_path))
+                              for file_path in result['files'] if file_path.endswith('.html'))
+            if archive is not None:
+                # 压缩包只在主进程中写入，工作进程的临时文件写入后即删除
+                for file_path in result['files']:
+                    archive.write(file_path, os.path.basename(file_path))
+                    os.remove(file_path)
+            if progress:
+                progress(report.plans, len(jobs), result['name'])
+
+        if workers == 1:
+            _init_worker(db_path, semester, formats)
+            for job in jobs:
+                collect(_export_plan(*job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(db_path, semester, formats)) as pool:
+                futures = [pool.submit(_export_plan, *job) for job in jobs]
+                for future in as_completed(futures):
+                    collect(future.result())
+
+        if html_pages:
+            # 索引页按方案的原始顺序排列
+            order = {name: index for index, (name, _) in enumerate(plans)}
+            html_pages.sort(key=lambda page: order.get(page[0], 0))
+            index_path = html_exporter.write_index(output_dir, html_pages, title="课程表索引")
+            if archive is not None:
+                archive.write(index_path, 'index.html')
+    finally:
+        if archive is not None:
+            archive.close()
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    report.wall_time = time.perf_counter() - start
+    logger.info(f"Batch export finished: {report.plans} plans, {report.files} files "
+                f"in {report.wall_time:.2f}s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导出选课方案的课程表")
+    parser.add_argument('plans', help="方案文件（JSON）")
+    parser.add_argument('-o', '--output', required=True, help="输出目录，或 .zip 文件")
+    parser.add_argument('-f', '--formats', default='csv',
+                        help=f"导出格式，逗号分隔（可选: {', '.join(EXPORT_FORMATS)}）")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--db', default=DATABASE_PATH, help="课程数据库路径")
+    parser.add_argument('--semester', default=None, help="学期（默认使用配置中的默认学期）")
+    parser.add_argument('--quiet', action='store_true', help="不显示进度")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    plans = load_plans(args.plans)
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+
+    def show_progress(done, total, name):
+        sys.stdout.write(f"\r[{done}/{total}] {name[:40]:<40}")
+        sys.stdout.flush()
+        if done == total:
+            sys.stdout.write('\n')
+
+    try:
+        report = export_batch(plans, args.output, formats, db_path=args.db, semester=args.semester,
+                              workers=args.workers, progress=None if args.quiet else show_progress)
+    except ValueError as e:
+        parser.error(str(e))
+    print(report.format_summary())
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+导出模型
+与格式无关的中间结果：课程数据、课程列表行、周课程表网格、每个教学周的网格和占用表。
+同一选课结果导出为多种格式时，这些数据只计算一次；
+模型按（选中课程ID, 课程目录版本）的指纹缓存
+"""
+
+import os
+import sys
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner.schedule import SLOT_COUNT, parse_slots, schedule_weeks
+
+logger = logging.getLogger(__name__)
+
+
+def selection_fingerprint(course_ids, catalog_version):
+    """选中课程ID（与顺序无关）和目录版本的指纹"""
+    source = f"{sorted(set(course_ids))!r}|{catalog_version!r}"
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+class ExportModel:
+    """
+    一次导出所需的全部数据，各部分在第一次访问时构建
+
+    Attributes:
+        courses: 课程数据（结构同 get_selected_courses_with_schedules）
+        fingerprint: 缓存指纹，直接由课程数据构建时为None
+    """
+
+    def __init__(self, courses, exporter, fingerprint=None):
+        self.courses = courses
+        self.fingerprint = fingerprint
+        self._exporter = exporter
+        self._rows = None
+        self._grid = None
+        self._teaching_weeks = None
+        self._week_grids = {}
+        self._occupancy = None
+
+    @property
+    def rows(self):
+        """课程列表行（列见 ScheduleExporter.CSV_HEADER）"""
+        if self._rows is None:
+            self._rows = list(self._exporter.iter_course_rows(self.courses))
+        return self._rows
+
+    @property
+    def grid(self):
+        """全学期周课程表网格"""
+        if self._grid is None:
+            self._grid = self._exporter.build_schedule_grid(self.courses)
+        return self._grid
+
+    @property
+    def teaching_weeks(self):
+        """涉及的教学周（升序）"""
+        if self._teaching_weeks is None:
+            self._teaching_weeks = self._exporter.get_teaching_weeks(self.courses)
+        return self._teaching_weeks
+
+    @property
+    def occupancy(self):
+        """
+        （周次, 星期, 节次）占用表，每条时间安排一项:
+        (课程下标, 星期, 起始节次, 结束节次, 上课周次列表, 地点)
+
+        任意一周的课程表都可以由它直接筛选得到，不需要逐周重建网格。
+        """
+        if self._occupancy is None:
+            occupancy = []
+            for index, course in enumerate(self.courses):
+                for schedule in course['schedules']:
+                    try:
+                        day = int(schedule['day_of_week'])
+                    except (TypeError, ValueError):
+                        continue
+                    slots = [slot for slot in parse_slots(schedule['time_slots']) if slot <= SLOT_COUNT]
+                    if not 1 <= day <= 7 or not slots:
+                        continue
+                    weeks = schedule_weeks(schedule['weeks'])
+                    occupancy.append((index, day, slots[0], slots[-1], weeks, schedule['location'] or ''))
+            self._occupancy = occupancy
+        return self._occupancy
+
+    def week_grid(self, week):
+        """某个教学周的课程表网格"""
+        grid = self._week_grids.get(week)
+        if grid is None:
+            grid = self._week_grids[week] = self._exporter.build_schedule_grid(self.courses, week=week)
+        return grid
+
+    def iter_week_grids(self):
+        """依次返回 (教学周, 网格)"""
+        for week in self.teaching_weeks:
+            yield week, self.week_grid(week)
+
+
+class ExportModelCache:
+    """按选课指纹缓存导出模型（LRU）"""
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_model(self, db, course_ids, exporter):
+        """
+        获取选中课程的导出模型，目录版本未变时直接复用
+
+        目录版本由数据库路径、学期和 CourseDatabase.get_data_version() 组成，
+        切换学期或数据库被修改后旧模型自然失效。
+        """
+        catalog_version = (db.db_path, db.semester, db.get_data_version())
+        key = selection_fingerprint(course_ids, catalog_version)
+
+        with self._lock:
+            model = self._entries.get(key)
+            if model is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        model = ExportModel(db.get_selected_courses_with_schedules(list(course_ids)), exporter,
+                            fingerprint=key)
+
+        with self._lock:
+            self._entries[key] = model
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(f"Export model built for {len(model.courses)} courses ({key[:12]})")
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
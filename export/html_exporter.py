@@ -0,0 +1,244 @@
+"""
+静态HTML课程表
+每个选课结果生成一个自包含的HTML页面（无外部依赖），课程数据和占用表以JSON嵌入，
+页面脚本按所选教学周从占用表筛选并绘制周课程表，整个学期只需一个页面。
+多个选课结果可以生成带索引页的静态站点，直接发布到静态服务器
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner.schedule import SLOT_COUNT
+
+logger = logging.getLogger(__name__)
+
+_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { font-family: "Microsoft YaHei", "PingFang SC", sans-serif; margin: 24px; color: #212529; background: #f8f9fa; }
+h1 { font-size: 22px; margin: 0 0 4px; }
+.subtitle { color: #6c757d; margin-bottom: 16px; }
+.toolbar { margin-bottom: 12px; display: flex; gap: 8px; align-items: center; }
+.toolbar button, .toolbar select { padding: 4px 10px; font-size: 14px; }
+table { border-collapse: collapse; background: white; width: 100%; table-layout: fixed; }
+th, td { border: 1px solid #dee2e6; padding: 4px; font-size: 12px; text-align: center; vertical-align: middle; }
+th { background: #6c757d; color: white; }
+td.time { background: #e9ecef; width: 90px; }
+td.course { background: #d4edda; color: #155724; }
+td.conflict { background: #f8d7da; color: #721c24; }
+td div + div { border-top: 1px dashed #adb5bd; margin-top: 2px; padding-top: 2px; }
+.location { color: #6c757d; }
+.list { margin-top: 24px; }
+.list td { text-align: left; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div class="subtitle">__SUBTITLE__</div>
+<div class="toolbar">
+<button id="prev">&lt; 上一周</button>
+<select id="week"></select>
+<button id="next">下一周 &gt;</button>
+</div>
+<table id="grid"></table>
+<table class="list">
+<tr><th>课程代码</th><th>课程名称</th><th>学分</th><th>学时</th><th>星期</th><th>时间</th><th>地点</th><th>周次</th></tr>
+__COURSE_ROWS__
+</table>
+<script>
+const DATA = __DATA__;
+const SLOT_COUNT = DATA.timeSlots.length;
+const weekSelect = document.getElementById('week');
+function addOption(value, label) {
+  const option = document.createElement('option');
+  option.value = value;
+  option.textContent = label;
+  weekSelect.appendChild(option);
+}
+addOption(0, '全学期');
+DATA.weeks.forEach(function (week) { addOption(week, '第' + week + '周'); });
+
+function render(week) {
+  const cells = [];
+  for (let day = 0; day < 7; day++) {
+    cells.push([]);
+    for (let slot = 0; slot < SLOT_COUNT; slot++) cells[day].push([]);
+  }
+  DATA.occupancy.forEach(function (block) {
+    const course = block[0], day = block[1], first = block[2], last = block[3], weeks = block[4];
+    if (week && weeks.indexOf(week) < 0) return;
+    for (let slot = first; slot <= last; slot++) {
+      if (cells[day - 1][slot - 1].indexOf(course) < 0) cells[day - 1][slot - 1].push(course);
+    }
+  });
+
+  const table = document.getElementById('grid');
+  table.innerHTML = '';
+  const header = table.insertRow();
+  ['时间'].concat(DATA.weekdays).forEach(function (label) {
+    const th = document.createElement('th');
+    th.textContent = label;
+    header.appendChild(th);
+  });
+
+  const covered = {};
+  for (let slot = 0; slot < SLOT_COUNT; slot++) {
+    const row = table.insertRow();
+    const time = row.insertCell();
+    time.className = 'time';
+    time.textContent = '第' + (slot + 1) + '节 ' + DATA.timeSlots[slot];
+    for (let day = 0; day < 7; day++) {
+      if (covered[day + ':' + slot]) continue;
+      const courses = cells[day][slot];
+      const cell = row.insertCell();
+      if (!courses.length) continue;
+      // 同一组课程的连续节次合并为一个单元格
+      const key = courses.join(',');
+      let span = 1;
+      while (slot + span < SLOT_COUNT && cells[day][slot + span].join(',') === key) {
+        covered[day + ':' + (slot + span)] = true;
+        span++;
+      }
+      cell.rowSpan = span;
+      cell.className = courses.length > 1 ? 'conflict' : 'course';
+      courses.forEach(function (index) {
+        const entry = document.createElement('div');
+        entry.textContent = DATA.courses[index][0];
+        if (DATA.courses[index][1]) {
+          const location = document.createElement('span');
+          location.className = 'location';
+          location.textContent = ' @' + DATA.courses[index][1];
+          entry.appendChild(location);
+        }
+        cell.appendChild(entry);
+      });
+    }
+  }
+}
+
+function step(delta) {
+  const index = Math.min(Math.max(weekSelect.selectedIndex + delta, 0), weekSelect.options.length - 1);
+  weekSelect.selectedIndex = index;
+  render(Number(weekSelect.value));
+}
+weekSelect.addEventListener('change', function () { render(Number(weekSelect.value)); });
+document.getElementById('prev').addEventListener('click', function () { step(-1); });
+document.getElementById('next').addEventListener('click', function () { step(1); });
+render(0);
+</script>
+</body>
+</html>
+'''
+
+_INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: "Microsoft YaHei", "PingFang SC", sans-serif; margin: 24px; }
+li { margin: 4px 0; }
+a { color: #0366d6; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<ul>
+__ITEMS__
+</ul>
+</body>
+</html>
+'''
+
+
+def _embed_json(data):
+    """嵌入<script>的JSON，避免 </script> 提前结束脚本"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+_PLACEHOLDER = re.compile(r'__(TITLE|SUBTITLE|COURSE_ROWS|DATA|ITEMS)__')
+
+
+def _fill_template(template, values):
+    """
+    一次替换模板中的全部占位符
+
+    逐个 str.replace 时，先填入的内容（课程名等）如果包含后面的占位符（如 "__DATA__"）会被再次替换；
+    单次扫描只匹配模板本身的占位符
+    """
+    return _PLACEHOLDER.sub(lambda match: values[match.group(1)], template)
+
+
+def build_page_data(model, time_slots, weekdays):
+    """
+    页面嵌入的数据
+
+    occupancy 中每项为 [条目下标, 星期, 起始节次, 结束节次, [周次...]]，
+    courses 中每个条目为 [课程名, 地点]（同一课程在不同地点上课时分为多个条目）
+    """
+    entries = {}
+    courses = []
+    occupancy = []
+    for course_index, day, first, last, weeks, location in model.occupancy:
+        key = (course_index, location)
+        if key not in entries:
+            entries[key] = len(courses)
+            courses.append([model.courses[course_index]['name'], location])
+        occupancy.append([entries[key], day, first, last, weeks])
+
+    return {
+        'courses': courses,
+        'occupancy': occupancy,
+        'weeks': model.teaching_weeks,
+        'timeSlots': [time_slots.get(slot, '') for slot in range(1, SLOT_COUNT + 1)],
+        'weekdays': [weekdays[day] for day in range(1, 8)],
+    }
+
+
+def render_page(model, rows, time_slots, weekdays, title="课程表", subtitle=""):
+    """
+    渲染单个选课结果的HTML页面
+
+    Args:
+        model: ExportModel
+        rows: 课程列表行（前8列：代码、名称、学分、学时、星期、时间、地点、周次）
+    """
+    course_rows = '\n'.join(
+        '<tr>' + ''.join(f'<td>{html.escape(str(value if value is not None else ""))}</td>'
+                         for value in row[:8]) + '</tr>'
+        for row in rows
+    )
+    return _fill_template(_PAGE_TEMPLATE, {
+        'TITLE': html.escape(title),
+        'SUBTITLE': html.escape(subtitle),
+        'COURSE_ROWS': course_rows,
+        'DATA': _embed_json(build_page_data(model, time_slots, weekdays)),
+    })
+
+
+def write_index(output_dir, pages, title="课程表"):
+    """
+    生成索引页
+
+    Args:
+        pages: [(显示名, 相对文件名)]
+    """
+    items = '\n'.join(
+        f'<li><a href="{html.escape(file_name, quote=True)}">{html.escape(name)}</a></li>'
+        for name, file_name in pages
+    )
+    path = os.path.join(output_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_fill_template(_INDEX_TEMPLATE, {'TITLE': html.escape(title), 'ITEMS': items}))
+    logger.info(f"Wrote HTML index with {len(pages)} pages to {path}")
+    return path
@@ -0,0 +1,213 @@
+"""
+iCalendar (.ics) 生成
+每条时间安排按周次压缩为少量重复事件：连续的教学周合并为一个
+RRULE:FREQ=WEEKLY 系列，中间的少量空缺周用 EXDATE 排除，
+单双周课程使用 INTERVAL=2。生成耗时与时间安排条数成线性关系
+"""
+
+import hashlib
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+PRODID = "-//UCAS Course Selector//Schedule Export//ZH"
+UID_DOMAIN = "ucas-course-selector"
+
+# 两段连续周次之间的空缺不超过该周数时合并为一个系列并用EXDATE排除，否则拆成两个系列
+MAX_EXDATE_GAP = 4
+
+# 固定UTC+8、无夏令时的时区定义
+_VTIMEZONE = {
+    "Asia/Shanghai": [
+        "BEGIN:VTIMEZONE",
+        "TZID:Asia/Shanghai",
+        "BEGIN:STANDARD",
+        "DTSTART:19700101T000000",
+        "TZOFFSETFROM:+0800",
+        "TZOFFSETTO:+0800",
+        "TZNAME:CST",
+        "END:STANDARD",
+        "END:VTIMEZONE",
+    ],
+}
+
+
+def compress_weeks(weeks, max_gap=MAX_EXDATE_GAP):
+    """
+    把周次列表压缩为重复系列
+
+    Returns:
+        list: [(起始周, 次数COUNT, 间隔INTERVAL, 排除的周次列表)]
+    """
+    weeks = sorted(set(weeks))
+    if not weeks:
+        return []
+
+    # 单双周：所有相邻周次都相差2
+    if len(weeks) >= 3 and all(b - a == 2 for a, b in zip(weeks, weeks[1:])):
+        return [(weeks[0], len(weeks), 2, [])]
+
+    series = []
+    start = prev = weeks[0]
+    excluded = []
+    for week in weeks[1:]:
+        if week - prev - 1 <= max_gap:
+            excluded.extend(range(prev + 1, week))
+        else:
+            series.append((start, prev - start + 1, 1, excluded))
+            start = week
+            excluded = []
+        prev = week
+    series.append((start, prev - start + 1, 1, excluded))
+    return series
+
+
+def escape_text(value):
+    """转义TEXT类型属性值（RFC 5545 3.3.11）"""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_line(line):
+    """按75字节折行（RFC 5545 3.1），不拆开UTF-8多字节字符"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+
+    parts = []
+    current = ''
+    current_bytes = 0
+    limit = 75
+    for char in line:
+        char_bytes = len(char.encode('utf-8'))
+        if current_bytes + char_bytes > limit:
+            parts.append(current)
+            current = ''
+            current_bytes = 0
+            limit = 74  # 续行以一个空格开头
+        current += char
+        current_bytes += char_bytes
+    parts.append(current)
+    return '\r\n '.join(parts)
+
+
+def parse_slot_time(label):
+    """'08:00-08:50' -> ((8, 0), (8, 50))"""
+    start, end = label.split('-')
+    start_h, start_m = start.split(':')
+    end_h, end_m = end.split(':')
+    return (int(start_h), int(start_m)), (int(end_h), int(end_m))
+
+
+def week_one_monday(semester_start_date):
+    """学期第一周的周一（学期开始日期可以是该周任意一天）"""
+    if isinstance(semester_start_date, str):
+        semester_start_date = date.fromisoformat(semester_start_date)
+    return semester_start_date - timedelta(days=semester_start_date.weekday())
+
+
+class ICalendarBuilder:
+    """
+    逐条添加时间安排并写出 .ics
+
+    用法:
+        builder = ICalendarBuilder("2025-09-01", TIME_SLOTS)
+        builder.add_schedule(name, day, slots, weeks, location=..., uid_seed=...)
+        builder.write(path)
+    """
+
+    def __init__(self, semester_start_date, time_slots, tzid="Asia/Shanghai", calendar_name="课程表"):
+        self.monday = week_one_monday(semester_start_date)
+        self.slot_times = {slot: parse_slot_time(label) for slot, label in time_slots.items()}
+        self.tzid = tzid
+        self.calendar_name = calendar_name
+        self.dtstamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        self.lines = []
+        self.event_count = 0
+        # 无法放进日历的时间安排 [(名称, 星期, 节次列表)]：节次没有配置上课时间或星期无效
+        self.unplaced = []
+
+    def _local(self, week, day, hour_minute):
+        day_date = self.monday + timedelta(weeks=week - 1, days=day - 1)
+        hour, minute = hour_minute
+        return f"{day_date:%Y%m%d}T{hour:02d}{minute:02d}00"
+
+    def add_schedule(self, summary, day, slots, weeks, location='', description='', uid_seed=''):
+        """
+        添加一条时间安排
+
+        Args:
+            day: 星期（1-7）
+            slots: 节次列表，取首节开始时间和末节结束时间
+            weeks: 上课周次列表
+
+        Returns:
+            int: 生成的VEVENT数量；节次没有配置上课时间时不生成（不截断为已知节次），
+            记录到 unplaced 并返回0
+        """
+        slots = list(slots)
+        if not slots or not weeks:
+            return 0
+        missing = [slot for slot in slots if slot not in self.slot_times]
+        if missing or not 1 <= day <= 7:
+            logger.warning(f"Cannot place schedule in calendar: {summary} day={day} slots={slots} "
+                           f"(no time configured for slots {missing})")
+            self.unplaced.append((summary, day, slots))
+            return 0
+        start_time = self.slot_times[min(slots)][0]
+        end_time = self.slot_times[max(slots)][1]
+
+        added = 0
+        for first_week, count, interval, excluded in compress_weeks(weeks):
+            uid_source = f"{uid_seed}|{day}|{min(slots)}|{first_week}"
+            uid = hashlib.sha1(uid_source.encode('utf-8')).hexdigest()[:20]
+            tz = f";TZID={self.tzid}"
+
+            event = [
+                "BEGIN:VEVENT",
+                f"UID:{uid}@{UID_DOMAIN}",
+                f"DTSTAMP:{self.dtstamp}",
+                f"DTSTART{tz}:{self._local(first_week, day, start_time)}",
+                f"DTEND{tz}:{self._local(first_week, day, end_time)}",
+                f"SUMMARY:{escape_text(summary)}",
+            ]
+            if count > 1:
+                rule = f"RRULE:FREQ=WEEKLY;COUNT={count}"
+                if interval > 1:
+                    rule += f";INTERVAL={interval}"
+                event.append(rule)
+            if excluded:
+                event.append(f"EXDATE{tz}:" + ','.join(
+                    self._local(week, day, start_time) for week in excluded))
+            if location:
+                event.append(f"LOCATION:{escape_text(location)}")
+            if description:
+                event.append(f"DESCRIPTION:{escape_text(description)}")
+            event.append("END:VEVENT")
+
+            self.lines.extend(event)
+            added += 1
+
+        self.event_count += added
+        return added
+
+    def iter_lines(self):
+        """完整日历的各行（已折行）"""
+        yield "BEGIN:VCALENDAR"
+        yield "VERSION:2.0"
+        yield f"PRODID:{PRODID}"
+        yield "CALSCALE:GREGORIAN"
+        yield fold_line(f"X-WR-CALNAME:{escape_text(self.calendar_name)}")
+        yield f"X-WR-TIMEZONE:{self.tzid}"
+        yield from _VTIMEZONE.get(self.tzid, [])
+        for line in self.lines:
+            yield fold_line(line)
+        yield "END:VCALENDAR"
+
+    def write(self, file_path):
+        """写出 .ics 文件（CRLF换行）"""
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            for line in self.iter_lines():
+                f.write(line)
+                f.write('\r\n')
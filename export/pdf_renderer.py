@@ -0,0 +1,232 @@
+"""
+PDF渲染
+中文字体每个进程只注册一次，段落样式和表格样式预先构建后复用，
+批量导出大量课程表时不会重复注册字体或重建样式。
+多页文档（每个教学周一页）只调用一次 build，单遍排版
+"""
+
+import os
+import sys
+import threading
+import logging
+from xml.sax.saxutils import escape
+
+from .backends import backends
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import PDF_CJK_FONT_PATH, PDF_CJK_FONT_CANDIDATES, WEEKDAYS
+from planner.schedule import SLOT_COUNT
+
+logger = logging.getLogger(__name__)
+
+# 注册TTF字体时使用的字体名
+CJK_FONT_NAME = 'UCAS-CJK'
+# 找不到TTF字体时使用reportlab内置的CID字体（阅读器自带，不嵌入）
+CID_FALLBACK_FONT = 'STSong-Light'
+
+# 周课程表列宽（pt）：时间列 + 7天，合计为横向A4去掉页边距后的宽度
+GRID_COLUMN_WIDTHS = [70] + [100] * 7
+# 课程列表列宽：代码、名称、学分、学时、星期、时间、地点、周次
+LIST_COLUMN_WIDTHS = [80, 120, 30, 30, 35, 45, 90, 90]
+PAGE_MARGIN = 36
+
+_lock = threading.Lock()
+_font_name = None
+_styles = None
+
+
+def _font_candidates():
+    if PDF_CJK_FONT_PATH:
+        yield PDF_CJK_FONT_PATH
+    yield from PDF_CJK_FONT_CANDIDATES
+
+
+def register_cjk_font():
+    """注册中文字体并返回字体名，每个进程只注册一次"""
+    global _font_name
+    if _font_name is not None:
+        return _font_name
+
+    with _lock:
+        if _font_name is None:
+            rl = backends.get('reportlab')
+            for path in _font_candidates():
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    rl.pdfmetrics.registerFont(rl.TTFont(CJK_FONT_NAME, path, subfontIndex=0))
+                except Exception as e:
+                    logger.warning(f"Failed to register PDF font {path}: {e}")
+                    continue
+                logger.info(f"Registered PDF CJK font: {path}")
+                _font_name = CJK_FONT_NAME
+                break
+            else:
+                rl.pdfmetrics.registerFont(rl.UnicodeCIDFont(CID_FALLBACK_FONT))
+                logger.info(f"No CJK TTF font found, using built-in {CID_FALLBACK_FONT}")
+                _font_name = CID_FALLBACK_FONT
+    return _font_name
+
+
+class PdfStyles:
+    """预先构建的段落样式和表格样式"""
+
+    def __init__(self, rl, font_name):
+        self.font_name = font_name
+        colors = rl.colors
+
+        self.title = rl.ParagraphStyle(
+            'ScheduleTitle', fontName=font_name, fontSize=18, leading=22,
+            alignment=1, spaceAfter=6
+        )
+        self.subtitle = rl.ParagraphStyle(
+            'ScheduleSubtitle', fontName=font_name, fontSize=11, leading=14,
+            alignment=1, spaceAfter=8, textColor=colors.HexColor('#555555')
+        )
+        self.header = rl.ParagraphStyle(
+            'ScheduleHeader', fontName=font_name, fontSize=9, leading=11,
+            alignment=1, textColor=colors.white
+        )
+        self.cell = rl.ParagraphStyle(
+            'ScheduleCell', fontName=font_name, fontSize=7, leading=8.5, alignment=1
+        )
+        self.time_cell = rl.ParagraphStyle(
+            'ScheduleTimeCell', fontName=font_name, fontSize=7, leading=8.5, alignment=1,
+            textColor=colors.HexColor('#333333')
+        )
+
+        self.grid_table = rl.TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font_name),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a6fa5')),
+            ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#eef2f7')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#999999')),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ])
+        # 有课的单元格的底色，渲染时按单元格追加
+        self.occupied_color = colors.HexColor('#dbe8f6')
+
+        self.list_table = rl.TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font_name),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ])
+
+
+def get_pdf_styles():
+    """获取（首次调用时构建）共享的PDF样式"""
+    global _styles
+    if _styles is not None:
+        return _styles
+
+    font_name = register_cjk_font()
+    with _lock:
+        if _styles is None:
+            _styles = PdfStyles(backends.get('reportlab'), font_name)
+    return _styles
+
+
+def _paragraph(rl, text, style):
+    return rl.Paragraph(escape(str(text)), style)
+
+
+def _grid_cell_lines(entries):
+    """一个网格单元格的文本：每门课占一行，地点另起一行"""
+    lines = []
+    for entry in entries:
+        lines.append(escape(entry['name']))
+        if entry['location']:
+            lines.append(f"@{escape(entry['location'])}")
+    return '<br/>'.join(lines)
+
+
+def _build_grid_table(rl, styles, schedule_grid, time_labels):
+    """把7×SLOT_COUNT网格转换为Table，同一门课的连续节次合并为一个单元格"""
+    header = [_paragraph(rl, '时间', styles.header)]
+    header += [_paragraph(rl, WEEKDAYS[day], styles.header) for day in range(1, 8)]
+    rows = [header]
+    for slot in range(1, SLOT_COUNT + 1):
+        rows.append([rl.Paragraph(f"第{slot}节<br/>{time_labels.get(slot, '')}", styles.time_cell)]
+                    + [''] * 7)
+
+    commands = []
+    for day in range(1, 8):
+        column = schedule_grid[day]
+        slot = 1
+        while slot <= SLOT_COUNT:
+            entries = column[slot]
+            if not entries:
+                slot += 1
+                continue
+            end = slot
+            while end < SLOT_COUNT and column[end + 1] == entries:
+                end += 1
+            rows[slot][day] = rl.Paragraph(_grid_cell_lines(entries), styles.cell)
+            commands.append(('BACKGROUND', (day, slot), (day, end), styles.occupied_color))
+            if end > slot:
+                commands.append(('SPAN', (day, slot), (day, end)))
+            slot = end + 1
+
+    table = rl.Table(rows, colWidths=GRID_COLUMN_WIDTHS, repeatRows=1)
+    table.setStyle(styles.grid_table)
+    if commands:
+        table.setStyle(rl.TableStyle(commands))
+    return table
+
+
+def render_weekly_pdf(file_path, sections, time_labels, title="课程表"):
+    """
+    渲染周课程表PDF（横向A4）
+
+    Args:
+        sections: [(小标题, 课程表网格)]，每个网格一页，网格格式见 ScheduleExporter.build_schedule_grid
+        time_labels: {节次: "08:00-08:50"}
+    """
+    rl = backends.get('reportlab')
+    styles = get_pdf_styles()
+
+    elements = []
+    for index, (subtitle, schedule_grid) in enumerate(sections):
+        if index:
+            elements.append(rl.PageBreak())
+        elements.append(_paragraph(rl, title, styles.title))
+        if subtitle:
+            elements.append(_paragraph(rl, subtitle, styles.subtitle))
+        elements.append(_build_grid_table(rl, styles, schedule_grid, time_labels))
+
+    doc = rl.SimpleDocTemplate(
+        file_path, pagesize=rl.landscape(rl.A4), title=title,
+        leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN
+    )
+    doc.build(elements)
+
+
+def render_course_list_pdf(file_path, header, rows, title="课程表"):
+    """渲染课程列表PDF（纵向A4），名称、地点、周次等长文本自动换行"""
+    rl = backends.get('reportlab')
+    styles = get_pdf_styles()
+
+    table_data = [list(header)]
+    for row in rows:
+        table_data.append([_paragraph(rl, value if value is not None else '', styles.cell)
+                           for value in row])
+
+    table = rl.Table(table_data, colWidths=LIST_COLUMN_WIDTHS, repeatRows=1)
+    table.setStyle(styles.list_table)
+
+    doc = rl.SimpleDocTemplate(
+        file_path, pagesize=rl.A4, title=title,
+        leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN
+    )
+    doc.build([_paragraph(rl, title, styles.title), rl.Spacer(1, 12), table])
@@ -0,0 +1,218 @@
+"""
+选课方案格式
+紧凑、带版本号的方案文件：只保存已选课程ID、课程目录指纹和自定义课程，
+用于分享和恢复选课方案。导入时用一次批量查询校验课程ID。
+安装了 orjson 时使用其进行编解码
+
+格式（版本2）:
+    {"v":2,"sem":"2025秋季","cat":"<目录指纹>","ids":[12,-1,57,301],"custom":[{...}]}
+    ids 为按选课顺序排列的已选课程：非负数是数据库课程ID，负数是自定义课程ID
+    （planner.custom_course_id，第 i 个自定义课程为 -(i+1)，对应 custom 中的下标 i）
+
+版本1的 ids 只有数据库课程ID，已选自定义课程的下标单独记录在 csel 中；读取时排在数据库课程之后
+"""
+
+import os
+import sys
+import json
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import WEEKDAYS
+from planner import custom_course_id, custom_course_index
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+PLAN_FORMAT_VERSION = 2
+PLAN_FILE_SUFFIX = '.plan.json'
+
+# 自定义课程时间安排中可由 weekday_num 推出的字段
+_DERIVED_SCHEDULE_KEYS = ('weekday',)
+
+
+class PlanFormatError(ValueError):
+    """方案文件无法解析或版本不受支持"""
+
+
+def _dumps(data):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(payload):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8')
+    return json.loads(payload)
+
+
+def _is_empty(value):
+    if value is None or value is False:
+        return True
+    return isinstance(value, (str, list, dict)) and not value
+
+
+def _compact(value):
+    """去掉空值字段（空字符串、None、False、空列表）"""
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items() if not _is_empty(item)}
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
+def _compact_custom_course(course):
+    course = _compact(course)
+    schedules = []
+    for schedule in course.get('schedules', []):
+        if 'weekday_num' in schedule:
+            schedule = {key: item for key, item in schedule.items() if key not in _DERIVED_SCHEDULE_KEYS}
+        schedules.append(schedule)
+    if schedules:
+        course['schedules'] = schedules
+    return course
+
+
+def _expand_custom_course(course):
+    """恢复压缩时省略的字段，使结构与自定义课程对话框的输出一致"""
+    course = dict(course)
+    course.setdefault('code', '')
+    course.setdefault('hours', '')
+    schedules = []
+    for schedule in course.get('schedules', []):
+        schedule = dict(schedule)
+        if 'weekday' not in schedule and 'weekday_num' in schedule:
+            schedule['weekday'] = WEEKDAYS.get(schedule['weekday_num'], '')
+        schedule.setdefault('location', '')
+        schedule.setdefault('weeks', '')
+        schedules.append(schedule)
+    course['schedules'] = schedules
+    return course
+
+
+def dumps_plan(selected_ids, custom_courses=(), semester=None, catalog_fingerprint=None):
+    """
+    序列化选课方案
+
+    Args:
+        selected_ids: 已选课程ID（按选课顺序，自定义课程为 custom_course_id(下标)，即 Selection 中的ID）
+        custom_courses: 自定义课程（自定义课程对话框的输出）
+        semester: 方案所属学期
+        catalog_fingerprint: CourseDatabase.get_catalog_fingerprint() 的值
+
+    Returns:
+        bytes: UTF-8编码的紧凑JSON
+    """
+    plan = {'v': PLAN_FORMAT_VERSION}
+    if semester:
+        plan['sem'] = semester
+    if catalog_fingerprint:
+        plan['cat'] = catalog_fingerprint
+    plan['ids'] = [int(course_id) for course_id in selected_ids]
+    if custom_courses:
+        plan['custom'] = [_compact_custom_course(course) for course in custom_courses]
+    return _dumps(plan)
+
+
+def loads_plan(payload):
+    """
+    解析方案内容
+
+    Returns:
+        dict: {'version', 'semester', 'catalog', 'selected_ids'（按选课顺序，同 dumps_plan）,
+               'course_ids'（其中的数据库课程ID）, 'custom_courses'}
+    """
+    try:
+        data = _loads(payload)
+    except ValueError as e:
+        raise PlanFormatError(f"方案文件不是有效的JSON: {e}") from e
+
+    if not isinstance(data, dict) or 'v' not in data:
+        raise PlanFormatError("不是选课方案文件")
+    version = data['v']
+    if not isinstance(version, int) or version > PLAN_FORMAT_VERSION:
+        raise PlanFormatError(f"不支持的方案版本: {version}（当前程序支持到 {PLAN_FORMAT_VERSION}）")
+
+    try:
+        selected_ids = [int(course_id) for course_id in data.get('ids', [])]
+        custom_courses = [_expand_custom_course(course) for course in data.get('custom', [])]
+        if version < 2:
+            # 版本1: ids 只有数据库课程，已选自定义课程的下标在 csel 中
+            selected_ids = [course_id for course_id in selected_ids if course_id >= 0]
+            selected_ids.extend(custom_course_id(int(index)) for index in data.get('csel', []))
+    except (TypeError, ValueError, AttributeError) as e:
+        raise PlanFormatError(f"方案内容无效: {e}") from e
+
+    # 指向不存在的自定义课程的ID无法恢复
+    selected_ids = [course_id for course_id in selected_ids
+                    if course_id >= 0 or 0 <= custom_course_index(course_id) < len(custom_courses)]
+
+    return {
+        'version': version,
+        'semester': data.get('sem'),
+        'catalog': data.get('cat'),
+        'selected_ids': selected_ids,
+        'course_ids': [course_id for course_id in selected_ids if course_id >= 0],
+        'custom_courses': custom_courses,
+    }
+
+
+def save_plan(file_path, selected_ids, custom_courses=(), semester=None, catalog_fingerprint=None):
+    """写出方案文件，返回字节数"""
+    payload = dumps_plan(selected_ids, custom_courses, semester, catalog_fingerprint)
+    with open(file_path, 'wb') as f:
+        f.write(payload)
+    logger.info(f"Saved plan with {len(selected_ids)} courses to {file_path} ({len(payload)} bytes)")
+    return len(payload)
+
+
+def load_plan(file_path):
+    """读取方案文件"""
+    with open(file_path, 'rb') as f:
+        return loads_plan(f.read())
+
+
+def restore_plan(db, plan):
+    """
+    按当前课程目录校验方案，只执行一次批量查询
+
+    Returns:
+        dict: {
+            'selected_courses': [(课程ID, 课程名)]（保持方案中的选课顺序，自定义课程ID为负数）,
+            'custom_courses': 自定义课程,
+            'missing_ids': 目录中不存在的课程ID,
+            'catalog_matches': 目录指纹是否一致（方案未记录指纹时为None）,
+        }
+    """
+    selected_ids = list(dict.fromkeys(plan['selected_ids']))
+    course_ids = [course_id for course_id in selected_ids if course_id >= 0]
+    names = {row[0]: row[1] for row in db.get_courses_by_ids(course_ids)}
+
+    catalog_matches = None
+    if plan.get('catalog'):
+        catalog_matches = plan['catalog'] == db.get_catalog_fingerprint()
+
+    custom_courses = plan['custom_courses']
+    selected_courses = []
+    for course_id in selected_ids:
+        if course_id < 0:
+            selected_courses.append((course_id, custom_courses[custom_course_index(course_id)].get('name', '')))
+        elif course_id in names:
+            selected_courses.append((course_id, names[course_id]))
+
+    return {
+        'selected_courses': selected_courses,
+        'custom_courses': plan['custom_courses'],
+        'missing_ids': [course_id for course_id in course_ids if course_id not in names],
+        'catalog_matches': catalog_matches,
+    }
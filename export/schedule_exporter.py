@@ -5,30 +5,33 @@
 
 import csv
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 import logging
 
+from .backends import backends
+from .xlsx_writer import XlsxWriter, STYLE_HEADER, STYLE_WRAP
+from . import pdf_renderer
+from . import html_exporter
+from .ical import ICalendarBuilder
+from .export_model import ExportModel, ExportModelCache
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner.schedule import SLOT_COUNT, parse_slots, schedule_weeks
+from config import SEMESTER_START_DATE, TIME_SLOTS
+
 logger = logging.getLogger(__name__)
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    logger.warning("pandas not available, Excel export will be disabled")
+# pandas / reportlab 在第一次导出时才导入，这里只探测是否安装
+# Excel导出默认使用内置的流式XLSX写入器，pandas仅作为可选引擎
+PANDAS_AVAILABLE = backends.is_available('pandas')
 
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+REPORTLAB_AVAILABLE = backends.is_available('reportlab')
+if not REPORTLAB_AVAILABLE:
     logger.warning("reportlab not available, PDF export will be disabled")
 
 
@@ -36,68 +39,207 @@ class ScheduleExporter:
     """课程表导出器"""
     
     def __init__(self):
-        self.time_slots = {
-            1: "08:00-08:50", 2: "09:00-09:50", 3: "10:10-11:00", 4: "11:10-12:00",
-            5: "14:00-14:50", 6: "15:00-15:50", 7: "16:10-17:00", 8: "17:10-18:00",
-            9: "19:00-19:50", 10: "20:00-20:50", 11: "21:00-21:50"
-        }
+        self.time_slots = TIME_SLOTS
         
         self.weekdays = {
             1: "周一", 2: "周二", 3: "周三", 4: "周四",
             5: "周五", 6: "周六", 7: "周日"
         }
+        
+        # 选课结果 -> 导出模型，多格式导出时课程数据和网格只计算一次
+        self.model_cache = ExportModelCache()
+    
+    # CSV列标题
+    CSV_HEADER = ['课程代码', '课程名称', '学分', '学时', '星期', '时间', '地点', '周次', '学期']
+    
+    def format_weekday(self, day_of_week):
+        """格式化星期（数据库中的星期为文本，如 "2"）"""
+        try:
+            return self.weekdays.get(int(day_of_week), f"第{day_of_week}天")
+        except (TypeError, ValueError):
+            return f"第{day_of_week}天"
+    
+    def get_export_model(self, db, course_ids):
+        """获取选中课程的导出模型（按选课和目录版本缓存）"""
+        return self.model_cache.get_model(db, course_ids, self)
+    
+    def as_export_model(self, courses_data):
+        """导出方法既接受课程数据列表，也接受 ExportModel"""
+        if isinstance(courses_data, ExportModel):
+            return courses_data
+        return ExportModel(courses_data, self)
+    
+    def iter_course_rows(self, courses_data):
+        """把已选课程数据展开为CSV行（每个时间安排一行）"""
+        for course in courses_data:
+            if course['schedules']:
+                for schedule in course['schedules']:
+                    yield [
+                        course['code'],
+                        course['name'],
+                        course['credits'],
+                        course['hours'],
+                        self.format_weekday(schedule['day_of_week']),
+                        schedule['time_slots'],
+                        schedule['location'] or '',
+                        schedule['weeks'] or '',
+                        schedule['semester'] or ''
+                    ]
+            else:
+                # 没有时间安排的课程
+                yield [
+                    course['code'],
+                    course['name'],
+                    course['credits'],
+                    course['hours'],
+                    '', '', '', '', ''
+                ]
+    
+    def iter_catalog_csv_rows(self, catalog_rows):
+        """把数据库游标的原始行（见 CourseDatabase.iter_catalog_rows）转换为CSV行"""
+        for code, name, credits, hours, day_of_week, time_slots, location, weeks, semester in catalog_rows:
+            if day_of_week is None:
+                yield [code, name, credits, hours, '', '', '', '', '']
+            else:
+                yield [
+                    code, name, credits, hours,
+                    self.format_weekday(day_of_week),
+                    time_slots,
+                    location or '',
+                    weeks or '',
+                    semester or ''
+                ]
+    
+    def export_rows_to_csv(self, rows, file_path, header=None):
+        """
+        流式写入CSV：逐行消费迭代器并增量写出，内存占用与行数无关
+        
+        Returns:
+            int: 写入的数据行数
+        """
+        start = time.perf_counter()
+        count = 0
+        
+        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header or self.CSV_HEADER)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"Wrote {count} CSV rows to {file_path} in {elapsed:.3f}s ({rate:.0f} rows/sec)")
+        return count
     
     def export_to_csv(self, courses_data, file_path):
         """导出为CSV格式"""
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
+            self.export_rows_to_csv(self.as_export_model(courses_data).rows, file_path)
+            logger.info(f"Successfully exported to CSV: {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export to CSV: {e}")
+            return False
+    
+    def export_catalog_to_csv(self, db, file_path, batch_size=1000):
+        """
+        导出整个课程目录为CSV
+        
+        直接从数据库游标分批读取（fetchmany）并流式写出，不在内存中物化整个目录。
+        """
+        try:
+            rows = self.iter_catalog_csv_rows(db.iter_catalog_rows(batch_size=batch_size))
+            self.export_rows_to_csv(rows, file_path)
+            logger.info(f"Successfully exported catalog to CSV: {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export catalog to CSV: {e}")
+            return False
+    
+    # Excel列宽（与 CSV_HEADER 对应）
+    EXCEL_COLUMN_WIDTHS = [22, 30, 6, 6, 6, 12, 24, 40, 10]
+    
+    def export_rows_to_excel(self, rows, file_path, sheet_name='课程目录', header=None):
+        """
+        流式写入单工作表XLSX，逐行写入压缩流，内存占用与行数无关
+        
+        Returns:
+            int: 写入的数据行数
+        """
+        start = time.perf_counter()
+        
+        with XlsxWriter(file_path) as workbook:
+            with workbook.sheet(sheet_name, self.EXCEL_COLUMN_WIDTHS) as sheet:
+                sheet.write_row(header or self.CSV_HEADER, style=STYLE_HEADER)
+                sheet.write_rows(rows)
+                count = sheet.row_count - 1
+        
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"Wrote {count} Excel rows to {file_path} in {elapsed:.3f}s ({rate:.0f} rows/sec)")
+        return count
+    
+    def export_catalog_to_excel(self, db, file_path, batch_size=1000):
+        """导出整个课程目录为Excel（从数据库游标流式写出）"""
+        try:
+            rows = self.iter_catalog_csv_rows(db.iter_catalog_rows(batch_size=batch_size))
+            self.export_rows_to_excel(rows, file_path)
+            logger.info(f"Successfully exported catalog to Excel: {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export catalog to Excel: {e}")
+            return False
+    
+    def export_to_excel(self, courses_data, file_path, engine='native'):
+        """
+        导出为Excel格式
+        
+        默认使用内置的流式写入器，生成三类工作表：课程列表、周课程表、每个教学周一张课程表。
+        engine='pandas' 时使用pandas（需要安装pandas和openpyxl），只生成课程列表。
+        """
+        if engine == 'pandas':
+            return self._export_excel_pandas(courses_data, file_path)
+        
+        try:
+            model = self.as_export_model(courses_data)
+            with XlsxWriter(file_path) as workbook:
+                with workbook.sheet('课程列表', self.EXCEL_COLUMN_WIDTHS) as sheet:
+                    sheet.write_row(self.CSV_HEADER, style=STYLE_HEADER)
+                    sheet.write_rows(model.rows)
                 
-                # 写入标题
-                writer.writerow(['课程代码', '课程名称', '学分', '学时', '星期', '时间', '地点', '周次', '学期'])
+                self._write_grid_sheet(workbook, '周课程表', model.grid)
                 
-                # 写入数据
-                for course in courses_data:
-                    if course['schedules']:
-                        for schedule in course['schedules']:
-                            writer.writerow([
-                                course['code'],
-                                course['name'],
-                                course['credits'],
-                                course['hours'],
-                                self.weekdays.get(schedule['day_of_week'], f"第{schedule['day_of_week']}天"),
-                                schedule['time_slots'],
-                                schedule['location'] or '',
-                                schedule['weeks'] or '',
-                                schedule['semester'] or ''
-                            ])
-                    else:
-                        # 没有时间安排的课程
-                        writer.writerow([
-                            course['code'],
-                            course['name'],
-                            course['credits'],
-                            course['hours'],
-                            '', '', '', '', ''
-                        ])
+                for week, grid in model.iter_week_grids():
+                    self._write_grid_sheet(workbook, f'第{week}周', grid)
             
-            logger.info(f"Successfully exported to CSV: {file_path}")
+            logger.info(f"Successfully exported to Excel: {file_path}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to export to CSV: {e}")
+            logger.error(f"Failed to export to Excel: {e}")
             return False
     
-    def export_to_excel(self, courses_data, file_path):
-        """导出为Excel格式"""
+    def _write_grid_sheet(self, workbook, sheet_name, schedule_grid):
+        """把7×SLOT_COUNT课程表网格写成一个工作表"""
+        with workbook.sheet(sheet_name, [14] + [24] * 7) as sheet:
+            sheet.write_row(self.GRID_HEADER, style=STYLE_HEADER)
+            for row in self.iter_grid_rows(schedule_grid):
+                sheet.write_row(row, style=STYLE_WRAP)
+    
+    def _export_excel_pandas(self, courses_data, file_path):
+        """使用pandas导出Excel（可选引擎）"""
         if not PANDAS_AVAILABLE:
-            logger.error("pandas is required for Excel export")
+            logger.error("pandas is required for the pandas Excel engine")
             return False
         
         try:
             # 准备数据
             rows = []
-            for course in courses_data:
+            for course in self.as_export_model(courses_data).courses:
                 if course['schedules']:
                     for schedule in course['schedules']:
                         rows.append({
@@ -105,7 +247,7 @@ class ScheduleExporter:
                             '课程名称': course['name'],
                             '学分': course['credits'],
                             '学时': course['hours'],
-                            '星期': self.weekdays.get(schedule['day_of_week'], f"第{schedule['day_of_week']}天"),
+                            '星期': self.format_weekday(schedule['day_of_week']),
                             '时间': schedule['time_slots'],
                             '地点': schedule['location'] or '',
                             '周次': schedule['weeks'] or '',
@@ -125,6 +267,7 @@ class ScheduleExporter:
                     })
             
             # 创建DataFrame并导出
+            pd = backends.get('pandas')
             df = pd.DataFrame(rows)
             df.to_excel(file_path, index=False, sheet_name='课程表')
             
@@ -142,65 +285,9 @@ class ScheduleExporter:
             return False
         
         try:
-            doc = SimpleDocTemplate(file_path, pagesize=A4)
-            elements = []
-            
-            # 样式
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                spaceAfter=30,
-                alignment=1  # 居中
-            )
-            
-            # 标题
-            title = Paragraph("课程表", title_style)
-            elements.append(title)
-            elements.append(Spacer(1, 20))
-            
-            # 准备表格数据
-            table_data = [['课程代码', '课程名称', '学分', '学时', '星期', '时间', '地点', '周次']]
-            
-            for course in courses_data:
-                if course['schedules']:
-                    for schedule in course['schedules']:
-                        table_data.append([
-                            course['code'] or '',
-                            course['name'],
-                            str(course['credits']) if course['credits'] else '',
-                            course['hours'] or '',
-                            self.weekdays.get(schedule['day_of_week'], f"第{schedule['day_of_week']}天"),
-                            schedule['time_slots'] or '',
-                            schedule['location'] or '',
-                            schedule['weeks'] or ''
-                        ])
-                else:
-                    table_data.append([
-                        course['code'] or '',
-                        course['name'],
-                        str(course['credits']) if course['credits'] else '',
-                        course['hours'] or '',
-                        '', '', '', ''
-                    ])
-            
-            # 创建表格
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
-            doc.build(elements)
+            # PDF课程列表不包含学期列
+            rows = (row[:8] for row in self.as_export_model(courses_data).rows)
+            pdf_renderer.render_course_list_pdf(file_path, self.CSV_HEADER[:8], rows)
             
             logger.info(f"Successfully exported to PDF: {file_path}")
             return True
@@ -209,51 +296,86 @@ class ScheduleExporter:
             logger.error(f"Failed to export to PDF: {e}")
             return False
     
-    def export_weekly_schedule(self, courses_data, file_path, format='csv'):
-        """导出周课程表格式"""
-        try:
-            # 创建7x11的课程表格式（周一到周日，1-11节课）
-            schedule_grid = {}
+    # 周课程表标题行
+    GRID_HEADER = ['时间'] + ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+    
+    def build_schedule_grid(self, courses_data, week=None):
+        """
+        构建7×SLOT_COUNT的课程表网格（周一到周日，第1节到第SLOT_COUNT节）
+        
+        Args:
+            week: 教学周，给定时只包含该周上课的时间安排
+            
+        Returns:
+            dict: {星期: {节次: [{'name', 'location', 'weeks'}, ...]}}
+        """
+        schedule_grid = {day: {slot: [] for slot in range(1, SLOT_COUNT + 1)} for day in range(1, 8)}
+        
+        for course in courses_data:
+            for schedule in course['schedules']:
+                try:
+                    day = int(schedule['day_of_week'])
+                except (TypeError, ValueError):
+                    continue
+                if day not in schedule_grid:
+                    continue
+                if week is not None and week not in schedule_weeks(schedule['weeks']):
+                    continue
+                
+                entry = {
+                    'name': course['name'],
+                    'location': schedule['location'] or '',
+                    'weeks': schedule['weeks'] or ''
+                }
+                for slot in parse_slots(schedule['time_slots']):
+                    if slot <= SLOT_COUNT:
+                        schedule_grid[day][slot].append(entry)
+        
+        return schedule_grid
+    
+    def get_teaching_weeks(self, courses_data):
+        """获取已选课程涉及的所有教学周（升序）"""
+        weeks = set()
+        for course in courses_data:
+            for schedule in course['schedules']:
+                weeks.update(schedule_weeks(schedule['weeks']))
+        return sorted(weeks)
+    
+    def iter_grid_rows(self, schedule_grid):
+        """把课程表网格展开为行：[时间, 周一, ..., 周日]"""
+        for time_slot in range(1, SLOT_COUNT + 1):
+            row = [self.time_slots.get(time_slot, f"第{time_slot}节")]
+            
             for day in range(1, 8):
-                schedule_grid[day] = {}
-                for time_slot in range(1, 12):
-                    schedule_grid[day][time_slot] = []
+                course_info = []
+                for course in schedule_grid[day][time_slot]:
+                    info = course['name']
+                    if course['location']:
+                        info += f"@{course['location']}"
+                    course_info.append(info)
+                row.append(' | '.join(course_info))
             
-            # 填充课程数据
-            for course in courses_data:
-                for schedule in course['schedules']:
-                    day = schedule['day_of_week']
-                    time_slots_str = schedule['time_slots']
-                    
-                    # 解析时间段
-                    if time_slots_str:
-                        import re
-                        numbers = re.findall(r'\d+', time_slots_str)
-                        if len(numbers) >= 2:
-                            start = int(numbers[0])
-                            end = int(numbers[-1])
-                            for slot in range(start, end + 1):
-                                if 1 <= slot <= 11:
-                                    schedule_grid[day][slot].append({
-                                        'name': course['name'],
-                                        'location': schedule['location'] or '',
-                                        'weeks': schedule['weeks'] or ''
-                                    })
-                        elif len(numbers) == 1:
-                            slot = int(numbers[0])
-                            if 1 <= slot <= 11:
-                                schedule_grid[day][slot].append({
-                                    'name': course['name'],
-                                    'location': schedule['location'] or '',
-                                    'weeks': schedule['weeks'] or ''
-                                })
+            yield row
+    
+    def export_weekly_schedule(self, courses_data, file_path, format='csv', all_weeks=False):
+        """
+        导出周课程表格式
+        
+        Args:
+            format: 'csv'、'excel' 或 'pdf'
+            all_weeks: 仅PDF有效，为True时在总表之后为每个教学周各输出一页
+        """
+        try:
+            model = self.as_export_model(courses_data)
             
             if format.lower() == 'csv':
-                return self._export_weekly_csv(schedule_grid, file_path)
-            elif format.lower() == 'excel' and PANDAS_AVAILABLE:
-                return self._export_weekly_excel(schedule_grid, file_path)
+                return self._export_weekly_csv(model.grid, file_path)
+            elif format.lower() == 'excel':
+                return self._export_weekly_excel(model.grid, file_path)
+            elif format.lower() == 'pdf':
+                return self._export_weekly_pdf(model, file_path, all_weeks)
             else:
-                logger.error(f"Unsupported format or missing dependencies: {format}")
+                logger.error(f"Unsupported format: {format}")
                 return False
                 
         except Exception as e:
@@ -264,66 +386,115 @@ class ScheduleExporter:
         """导出周课程表为CSV"""
         with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
-            
-            # 写入标题行
-            header = ['时间'] + [self.weekdays[day] for day in range(1, 8)]
-            writer.writerow(header)
-            
-            # 写入每个时间段
-            for time_slot in range(1, 12):
-                row = [self.time_slots.get(time_slot, f"第{time_slot}节")]
-                
-                for day in range(1, 8):
-                    courses = schedule_grid[day][time_slot]
-                    if courses:
-                        course_info = []
-                        for course in courses:
-                            info = course['name']
-                            if course['location']:
-                                info += f"@{course['location']}"
-                            course_info.append(info)
-                        row.append(' | '.join(course_info))
-                    else:
-                        row.append('')
-                
-                writer.writerow(row)
+            writer.writerow(self.GRID_HEADER)
+            writer.writerows(self.iter_grid_rows(schedule_grid))
         
         return True
     
     def _export_weekly_excel(self, schedule_grid, file_path):
         """导出周课程表为Excel"""
-        # 准备数据
-        data = []
-        for time_slot in range(1, 12):
-            row = {'时间': self.time_slots.get(time_slot, f"第{time_slot}节")}
-            
-            for day in range(1, 8):
-                courses = schedule_grid[day][time_slot]
-                if courses:
-                    course_info = []
-                    for course in courses:
-                        info = course['name']
-                        if course['location']:
-                            info += f"@{course['location']}"
-                        course_info.append(info)
-                    row[self.weekdays[day]] = ' | '.join(course_info)
-                else:
-                    row[self.weekdays[day]] = ''
-            
-            data.append(row)
+        with XlsxWriter(file_path) as workbook:
+            self._write_grid_sheet(workbook, '周课程表', schedule_grid)
+        
+        return True
+    
+    def _export_weekly_pdf(self, model, file_path, all_weeks=False):
+        """导出周课程表为PDF，所有页面在一次排版中生成"""
+        if not REPORTLAB_AVAILABLE:
+            logger.error("reportlab is required for PDF export")
+            return False
         
-        # 创建DataFrame并导出
-        df = pd.DataFrame(data)
-        df.to_excel(file_path, index=False, sheet_name='周课程表')
+        sections = [('全学期', model.grid)]
+        if all_weeks:
+            sections.extend((f'第{week}周', grid) for week, grid in model.iter_week_grids())
         
+        pdf_renderer.render_weekly_pdf(file_path, sections, self.time_slots)
+        logger.info(f"Successfully exported weekly schedule to PDF: {file_path} ({len(sections)} pages)")
         return True
     
+    def export_to_ics(self, courses_data, file_path, semester_start_date=SEMESTER_START_DATE, calendar_name="课程表"):
+        """
+        导出为iCalendar格式，可导入手机日历
+        
+        Args:
+            semester_start_date: 学期开始日期（"YYYY-MM-DD"，第1周内任意一天），默认为默认学期的日期；
+                                 传入None（学期开始日期未知）时拒绝导出，不用其他学期的日期代替
+        """
+        if not semester_start_date:
+            logger.error(f"Refusing to export {file_path}: semester start date is unknown")
+            return False
+        try:
+            builder = ICalendarBuilder(semester_start_date, self.time_slots, calendar_name=calendar_name)
+            
+            schedule_count = 0
+            for course in self.as_export_model(courses_data).courses:
+                for schedule in course['schedules']:
+                    try:
+                        day = int(schedule['day_of_week'])
+                    except (TypeError, ValueError):
+                        continue
+                    
+                    description = f"课程代码: {course['code'] or ''}\n学分: {course['credits'] or ''}\n" \
+                                  f"节次: {schedule['time_slots'] or ''}\n周次: {schedule['weeks'] or ''}"
+                    builder.add_schedule(
+                        course['name'], day,
+                        parse_slots(schedule['time_slots']),
+                        schedule_weeks(schedule['weeks']),
+                        location=schedule['location'] or '',
+                        description=description,
+                        uid_seed=f"{course['id']}|{course['code']}"
+                    )
+                    schedule_count += 1
+            
+            builder.write(file_path)
+            if builder.unplaced:
+                logger.warning(f"{len(builder.unplaced)} schedules could not be placed in {file_path}, "
+                               f"check TIME_SLOTS in config.py")
+            logger.info(f"Successfully exported to iCalendar: {file_path} "
+                        f"({schedule_count} schedules -> {builder.event_count} events)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export to iCalendar: {e}")
+            return False
+    
+    def export_to_html(self, courses_data, file_path, title="课程表", subtitle=None):
+        """
+        导出为自包含的静态HTML页面
+        
+        页面嵌入课程数据和（周次, 星期, 节次）占用表，由页面脚本切换教学周，
+        整个学期只生成一个页面。
+        """
+        try:
+            model = self.as_export_model(courses_data)
+            if subtitle is None:
+                total_credits = 0.0
+                for course in model.courses:
+                    try:
+                        total_credits += float(course['credits'] or 0)
+                    except (TypeError, ValueError):
+                        pass
+                subtitle = f"{len(model.courses)} 门课程，共 {total_credits:g} 学分 · " \
+                           f"生成于 {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+            
+            page = html_exporter.render_page(model, model.rows, self.time_slots, self.weekdays,
+                                             title=title, subtitle=subtitle)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(page)
+            
+            logger.info(f"Successfully exported to HTML: {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to export to HTML: {e}")
+            return False
+    
     def export_to_json(self, courses_data, file_path):
         """导出为JSON格式"""
         try:
             export_data = {
                 'export_time': datetime.now().isoformat(),
-                'courses': courses_data
+                'courses': self.as_export_model(courses_data).courses
             }
             
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,242 @@
+"""
+流式XLSX写入器
+不依赖pandas/openpyxl，直接生成 zip + SpreadsheetML。
+工作表逐行写入压缩流，内存占用与行数无关，支持多个工作表
+"""
+
+import re
+import zipfile
+import logging
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+# XML 1.0 不允许的控制字符
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# 工作表名不允许的字符
+_ILLEGAL_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+# 单元格样式（对应 styles.xml 中 cellXfs 的下标）
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+STYLE_WRAP = 2
+
+_FLUSH_ROWS = 256
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1">'
+    '<alignment wrapText="1" vertical="top"/></xf>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+def column_letter(index):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref, value, style):
+    style_attr = f' s="{style}"' if style else ''
+    if value is None or value == '':
+        return f'<c r="{ref}"{style_attr}/>' if style else ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"{style_attr}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class SheetWriter:
+    """单个工作表的流式写入器，由 XlsxWriter.sheet() 创建"""
+
+    def __init__(self, stream, workbook, column_widths=None):
+        self._stream = stream
+        self._workbook = workbook
+        self._buffer = []
+        self._closed = False
+        self.row_count = 0
+
+        head = _SHEET_HEAD
+        if column_widths:
+            cols = ''.join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{width}" customWidth="1"/>'
+                for i, width in enumerate(column_widths) if width
+            )
+            head += f'<cols>{cols}</cols>'
+        self._stream.write((head + '<sheetData>').encode('utf-8'))
+
+    def write_row(self, values, style=STYLE_DEFAULT, height=None):
+        """写入一行"""
+        self.row_count += 1
+        row_number = self.row_count
+        cells = ''.join(
+            _cell_xml(f'{column_letter(col)}{row_number}', value, style)
+            for col, value in enumerate(values)
+        )
+        height_attr = f' ht="{height}" customHeight="1"' if height else ''
+        self._buffer.append(f'<row r="{row_number}"{height_attr}>{cells}</row>')
+        if len(self._buffer) >= _FLUSH_ROWS:
+            self._flush()
+
+    def write_rows(self, rows, style=STYLE_DEFAULT):
+        """写入多行（可以是任意迭代器）"""
+        for values in rows:
+            self.write_row(values, style)
+
+    def _flush(self):
+        if self._buffer:
+            self._stream.write(''.join(self._buffer).encode('utf-8'))
+            self._buffer.clear()
+
+    def close(self):
+        """结束工作表"""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        self._stream.write(b'</sheetData></worksheet>')
+        self._stream.close()
+        if self._workbook._open_sheet is self:
+            self._workbook._open_sheet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class XlsxWriter:
+    """
+    流式XLSX工作簿写入器
+
+    用法:
+        with XlsxWriter(path) as workbook:
+            with workbook.sheet('课程列表') as sheet:
+                sheet.write_row(header, style=STYLE_HEADER)
+                sheet.write_rows(rows)
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._zip = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED)
+        self._sheet_names = []
+        self._open_sheet = None
+
+    def _unique_sheet_name(self, name):
+        name = _ILLEGAL_SHEET_CHARS.sub('_', str(name)).strip("'")[:31] or 'Sheet'
+        candidate, n = name, 2
+        lowered = {existing.lower() for existing in self._sheet_names}
+        while candidate.lower() in lowered:
+            suffix = f' ({n})'
+            candidate = name[:31 - len(suffix)] + suffix
+            n += 1
+        return candidate
+
+    def sheet(self, name, column_widths=None):
+        """新建工作表并返回其写入器（同一时间只能写一个工作表）"""
+        if self._open_sheet is not None:
+            self._open_sheet.close()
+        self._sheet_names.append(self._unique_sheet_name(name))
+        index = len(self._sheet_names)
+        stream = self._zip.open(f'xl/worksheets/sheet{index}.xml', 'w')
+        self._open_sheet = SheetWriter(stream, self, column_widths)
+        return self._open_sheet
+
+    def close(self):
+        """写入工作簿元数据并关闭文件"""
+        if self._zip is None:
+            return
+        if self._open_sheet is not None:
+            self._open_sheet.close()
+        if not self._sheet_names:
+            # 合法的工作簿至少需要一个工作表
+            self.sheet('Sheet1').close()
+
+        sheets = self._sheet_names
+        content_types = _CONTENT_TYPES_HEAD + ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(sheets) + 1)
+        ) + '</Types>'
+        workbook = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, name in enumerate(sheets, 1))
+            + '</sheets></workbook>'
+        )
+        workbook_rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(
+                f'<Relationship Id="rId{i}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{i}.xml"/>'
+                for i in range(1, len(sheets) + 1)
+            )
+            + f'<Relationship Id="rId{len(sheets) + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+            '</Relationships>'
+        )
+
+        self._zip.writestr('[Content_Types].xml', content_types)
+        self._zip.writestr('_rels/.rels', _ROOT_RELS)
+        self._zip.writestr('xl/workbook.xml', workbook)
+        self._zip.writestr('xl/_rels/workbook.xml.rels', workbook_rels)
+        self._zip.writestr('xl/styles.xml', _STYLES)
+        self._zip.close()
+        self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -4,8 +4,12 @@ UCAS课程选择模拟器
 重构后的模块化版本
 """
 
+import time
+_BOOT_TIME = time.perf_counter()
+
 import sys
 import os
+import argparse
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 import logging
@@ -22,25 +26,53 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def parse_args(argv):
+    """解析命令行参数，未识别的参数留给Qt"""
+    parser = argparse.ArgumentParser(description="UCAS课程选择模拟器")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="打印启动各阶段的耗时")
+    parser.add_argument('--stall-watchdog', type=float, nargs='?', const=50, default=None,
+                        metavar='MS', help="事件循环超过MS毫秒（默认50）未响应时记录界面线程调用栈")
+    return parser.parse_known_args(argv[1:])
+
+
 def main():
     """主函数"""
+    args, qt_args = parse_args(sys.argv)
+    
+    profiler = None
+    if args.profile_startup:
+        from utils.startup_profiler import StartupProfiler
+        profiler = StartupProfiler(start_time=_BOOT_TIME)
+        profiler.mark("import_qt")
+    
     try:
+        # 高DPI属性必须在创建QApplication之前设置
+        if hasattr(Qt, 'AA_EnableHighDpiScaling'):
+            QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+        if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
+            QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+        
         # 创建QApplication
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1] + qt_args)
         app.setApplicationName("UCAS课程选择模拟器")
         app.setApplicationVersion("2.0.0")
-        
-        # 设置高DPI支持
-        if hasattr(Qt, 'AA_EnableHighDpiScaling'):
-            app.setAttribute(Qt.AA_EnableHighDpiScaling, True)
-        if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
-            app.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+        if profiler:
+            profiler.mark("create_qapplication")
         
         # 导入并创建主窗口
         from ui import CourseSelectionMainWindow
+        if profiler:
+            profiler.mark("import_ui")
         
-        window = CourseSelectionMainWindow()
+        # 窗口外壳立即显示，课程目录在后台加载，其余视图首次切换时才创建
+        window = CourseSelectionMainWindow(startup_profiler=profiler,
+                                           stall_threshold_ms=args.stall_watchdog)
+        if profiler:
+            profiler.mark("build_window")
         window.show()
+        if profiler:
+            profiler.mark("show_window")
         
         logger.info("Application started successfully")
         
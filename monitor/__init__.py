@@ -0,0 +1,14 @@
+"""
+余量监控模块
+轮询选课系统的课程余量接口，检测变化并生成事件，合并后推送通知
+"""
+
+from .engine import MonitorEngine, ChangeEvent, TokenBucket, detect_changes
+from .stub_server import EnrollmentStub
+from .event_store import EventStore
+from .notifications import (NotificationPipeline, LogFileSink, WebhookSink, TraySink,
+                            CallbackSink)
+
+__all__ = ['MonitorEngine', 'ChangeEvent', 'TokenBucket', 'detect_changes', 'EnrollmentStub',
+           'EventStore', 'NotificationPipeline', 'LogFileSink', 'WebhookSink', 'TraySink',
+           'CallbackSink']
@@ -0,0 +1,35 @@
+"""
+余量监控命令行
+
+用法:
+    python -m monitor stub [--port 8766] [--courses 3000]      # 本地余量接口模拟服务器
+    python -m monitor watch --from-db 3000 [--store DB]        # 运行监控引擎
+    python -m monitor events [--benchmark N]                   # 事件存储基准
+    python -m monitor notify [--events N]                      # 通知流水线突发基准
+"""
+
+import sys
+
+from .engine import main as watch_main
+from .stub_server import main as stub_main
+from .event_store import main as events_main
+from .notifications import main as notify_main
+
+COMMANDS = {
+    'watch': watch_main,
+    'stub': stub_main,
+    'events': events_main,
+    'notify': notify_main,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(__doc__.strip())
+        return 2
+    return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,463 @@
+"""
+课程余量监控引擎
+在一个 asyncio 事件循环中轮询选课系统的余量接口（GET <endpoint>/enrollment/<课程代码>），
+发现已选人数、容量、教室或开课状态变化时生成 ChangeEvent 并通知监听者。
+
+为了在单进程中监控数千门课程而不压垮接口：
+- 所有课程按到期时间放在一个堆中调度，首次轮询在一个间隔内均匀错开，每次间隔带随机抖动
+- 同时在途的请求数由信号量限制，整体请求速率由令牌桶限制
+- 使用 ETag / Last-Modified 条件请求，未变化的课程只返回 304
+- 出错或被限流（429/503）时按指数退避并加随机抖动，遵守 Retry-After
+
+用法:
+    python -m monitor watch --watch 180080025200M3001H,180080070100M1001H
+    python -m monitor watch --from-db 3000 --duration 60
+"""
+
+import os
+import sys
+import time
+import heapq
+import random
+import sqlite3
+import asyncio
+import argparse
+import logging
+from urllib.parse import quote
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (MONITOR_ENDPOINT, MONITOR_POLL_INTERVAL, MONITOR_CONCURRENCY,
+                    MONITOR_RATE_LIMIT, MONITOR_MAX_BACKOFF, MONITOR_EVENT_PRUNE_INTERVAL)
+from utils.async_http import AsyncHTTPClient
+
+logger = logging.getLogger(__name__)
+
+# 参与变化检测的字段
+TRACKED_FIELDS = ('enrolled', 'capacity', 'room', 'status')
+
+# 接口不再返回课程时记录的状态
+STATUS_NOT_FOUND = 'not_found'
+
+# 成功轮询后的间隔抖动比例
+POLL_JITTER = 0.1
+
+
+class ChangeEvent:
+    """一门课程某个字段的变化"""
+
+    __slots__ = ('course_code', 'field', 'old', 'new', 'timestamp')
+
+    def __init__(self, course_code, field, old, new, timestamp=None):
+        self.course_code = course_code
+        self.field = field
+        self.old = old
+        self.new = new
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_dict(self):
+        return {
+            'course_code': self.course_code,
+            'field': self.field,
+            'old': self.old,
+            'new': self.new,
+            'timestamp': self.timestamp,
+        }
+
+    def __repr__(self):
+        return f"ChangeEvent({self.course_code} {self.field}: {self.old!r} -> {self.new!r})"
+
+
+class TokenBucket:
+    """令牌桶：平均速率 rate 次/秒，允许 burst 次突发"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _WatchState:
+    """
+    一次 watch 的轮询状态
+
+    generation 在每次 watch 时递增，堆中的调度项和在途的轮询都带着它；
+    unwatch 后再次 watch 同一课程时，旧的调度项和轮询结果因代数不同被丢弃，不会形成两条轮询链
+    """
+
+    __slots__ = ('code', 'generation', 'etag', 'last_modified', 'snapshot', 'failures')
+
+    def __init__(self, code, generation):
+        self.code = code
+        self.generation = generation
+        self.etag = None
+        self.last_modified = None
+        self.snapshot = None
+        self.failures = 0
+
+
+def detect_changes(course_code, old, new, fields=TRACKED_FIELDS, timestamp=None):
+    """比较两次快照，返回变化的字段（首次获取时 old 为None，不产生事件）"""
+    if old is None:
+        return []
+    return [ChangeEvent(course_code, field, old.get(field), new.get(field), timestamp)
+            for field in fields if old.get(field) != new.get(field)]
+
+
+class MonitorEngine:
+    """
+    课程余量轮询引擎
+
+    Args:
+        endpoint: 余量接口地址
+        watchlist: 初始监控的课程代码
+        poll_interval: 每门课程的轮询间隔（秒）
+        concurrency: 同时在途的请求数上限
+        rate_limit: 全局请求速率上限（次/秒），0 表示不限
+        max_backoff: 出错退避的最长间隔（秒）
+        client: 自定义HTTP客户端（需提供 async get(path, headers) 和 close()）
+    """
+
+    def __init__(self, endpoint=MONITOR_ENDPOINT, watchlist=(), poll_interval=MONITOR_POLL_INTERVAL,
+                 concurrency=MONITOR_CONCURRENCY, rate_limit=MONITOR_RATE_LIMIT,
+                 max_backoff=MONITOR_MAX_BACKOFF, fields=TRACKED_FIELDS, client=None, seed=None):
+        self.endpoint = endpoint
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+        self.fields = tuple(fields)
+        self.client = client or AsyncHTTPClient(endpoint, max_connections=concurrency)
+        self.rate_limiter = TokenBucket(rate_limit)
+        self._random = random.Random(seed)
+        self._states = {}
+        self._heap = []
+        self._sequence = 0
+        self._generation = 0
+        self._listeners = []
+        self._wakeup = None
+        self._stopping = False
+        self.stats = {
+            'requests': 0, 'updated': 0, 'not_modified': 0, 'changes': 0,
+            'errors': 0, 'throttled': 0, 'max_in_flight': 0,
+        }
+        self._in_flight = 0
+        for code in watchlist:
+            self.watch(code)
+
+    # ---- 监控列表 ----
+
+    def watch(self, course_code, delay=None):
+        """加入监控；delay 为首次轮询的延迟，默认在一个轮询间隔内随机错开"""
+        if course_code in self._states:
+            return
+        self._generation += 1
+        state = self._states[course_code] = _WatchState(course_code, self._generation)
+        if delay is None:
+            delay = self._random.uniform(0, self.poll_interval)
+        self._schedule(state, time.monotonic() + delay)
+
+    def unwatch(self, course_code):
+        """移出监控；堆中的调度项留到出堆时按代数丢弃"""
+        self._states.pop(course_code, None)
+
+    def _current(self, course_code, generation):
+        """课程仍以同一次 watch 被监控时返回其状态，否则返回None"""
+        state = self._states.get(course_code)
+        if state is None or state.generation != generation:
+            return None
+        return state
+
+    @property
+    def watchlist(self):
+        return list(self._states)
+
+    def snapshot(self, course_code):
+        """最近一次获取的课程余量数据"""
+        state = self._states.get(course_code)
+        return state.snapshot if state else None
+
+    def add_listener(self, callback):
+        """注册变化监听者 callback(event)，可以是普通函数或协程函数"""
+        self._listeners.append(callback)
+
+    # ---- 调度 ----
+
+    def _schedule(self, state, due):
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, state.code, state.generation))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_interval(self):
+        return self.poll_interval * self._random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    def _backoff_interval(self, failures, retry_after=None):
+        """指数退避加全抖动，不短于轮询间隔，也不短于服务器给出的 Retry-After"""
+        ceiling = min(self.max_backoff, self.poll_interval * (2 ** failures))
+        interval = self._random.uniform(self.poll_interval, max(self.poll_interval, ceiling))
+        if retry_after is not None:
+            interval = max(interval, retry_after)
+        return interval
+
+    async def _emit(self, events):
+        self.stats['changes'] += len(events)
+        for event in events:
+            for callback in self._listeners:
+                try:
+                    result = callback(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Change listener failed for {event}: {e}")
+
+    async def poll_once(self, course_code):
+        """
+        轮询一门课程
+
+        Returns:
+            float: 距下次轮询的间隔（秒）
+        """
+        state = self._states.get(course_code)
+        if state is None:
+            return None
+        return await self._poll(state)
+
+    async def _poll(self, state):
+        """轮询一次 watch 的课程，结果只写入这次 watch 的状态"""
+        course_code = state.code
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        await self.rate_limiter.acquire()
+        self.stats['requests'] += 1
+        try:
+            response = await self.client.get(f"/enrollment/{quote(course_code)}", headers)
+        except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+            self.stats['errors'] += 1
+            state.failures += 1
+            logger.debug(f"Poll {course_code} failed: {e}")
+            return self._backoff_interval(state.failures)
+
+        if response.status == 304:
+            self.stats['not_modified'] += 1
+            state.failures = 0
+            return self._next_interval()
+
+        if response.status in (429, 503):
+            self.stats['throttled'] += 1
+            state.failures += 1
+            try:
+                retry_after = float(response.headers.get('retry-after', ''))
+            except ValueError:
+                retry_after = None
+            return self._backoff_interval(state.failures, retry_after)
+
+        if response.status == 404:
+            state.failures = 0
+            new = dict(state.snapshot or {}, status=STATUS_NOT_FOUND)
+        elif response.status == 200:
+            state.failures = 0
+            try:
+                data = response.json() or {}
+            except ValueError:
+                self.stats['errors'] += 1
+                state.failures += 1
+                return self._backoff_interval(state.failures)
+            new = {field: data.get(field) for field in self.fields}
+            state.etag = response.headers.get('etag')
+            state.last_modified = response.headers.get('last-modified')
+        else:
+            self.stats['errors'] += 1
+            state.failures += 1
+            return self._backoff_interval(state.failures)
+
+        self.stats['updated'] += 1
+        events = detect_changes(course_code, state.snapshot, new, self.fields)
+        state.snapshot = new
+        if events:
+            await self._emit(events)
+        return self._next_interval()
+
+    async def _poll_and_reschedule(self, state, limit):
+        try:
+            interval = await self._poll(state)
+        except Exception as e:
+            logger.error(f"Unexpected error polling {state.code}: {e}")
+            interval = self._backoff_interval(1)
+        finally:
+            self._in_flight -= 1
+            limit.release()
+        # 轮询期间被 unwatch（或 unwatch 后重新 watch）时不再续排，新的 watch 有自己的调度项
+        if self._current(state.code, state.generation) is not None and not self._stopping:
+            self._schedule(state, time.monotonic() + interval)
+
+    async def run(self, duration=None):
+        """
+        运行轮询循环，直到 stop() 或经过 duration 秒
+
+        Returns:
+            dict: 运行统计
+        """
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        limit = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        deadline = time.monotonic() + duration if duration is not None else None
+
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+
+                if not self._heap or self._heap[0][0] > now:
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - now) if timeout is not None else deadline - now
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, course_code, generation = heapq.heappop(self._heap)
+                state = self._current(course_code, generation)
+                if state is None:
+                    continue
+
+                await limit.acquire()
+                self._in_flight += 1
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+                task = asyncio.ensure_future(self._poll_and_reschedule(state, limit))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            self._stopping = True
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return dict(self.stats)
+
+    def stop(self):
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def close(self):
+        self.stop()
+        await self.client.close()
+
+
+def load_watchlist_from_db(limit=None, db_path=None, semester=None):
+    """从课程数据库读取课程代码作为监控列表"""
+    from config import DATABASE_PATH
+    from database import CourseDatabase
+
+    db = CourseDatabase(db_path or DATABASE_PATH, semester=semester, enable_cache=False)
+    try:
+        codes = [course['code'] for course in db.iter_catalog_courses() if course['code']]
+    finally:
+        db.close()
+    return codes[:limit] if limit else codes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="课程余量监控")
+    parser.add_argument('--endpoint', default=MONITOR_ENDPOINT, help="余量接口地址")
+    parser.add_argument('--watch', default='', help="监控的课程代码，逗号分隔")
+    parser.add_argument('--watch-file', default=None, help="监控列表文件（每行一个课程代码）")
+    parser.add_argument('--from-db', type=int, default=None, metavar='N',
+                        help="监控课程数据库中的前N门课程")
+    parser.add_argument('--interval', type=float, default=MONITOR_POLL_INTERVAL, help="轮询间隔（秒）")
+    parser.add_argument('--concurrency', type=int, default=MONITOR_CONCURRENCY, help="并发请求数上限")
+    parser.add_argument('--rate', type=float, default=MONITOR_RATE_LIMIT, help="请求速率上限（次/秒）")
+    parser.add_argument('--duration', type=float, default=None, help="运行时长（秒），默认一直运行")
+    parser.add_argument('--store', default=None, metavar='DB', help="把变化事件写入事件存储（SQLite）")
+    parser.add_argument('--notify-log', default=None, metavar='PATH', help="把合并后的变化通知写入日志文件")
+    parser.add_argument('--webhook', default=None, metavar='URL', help="把合并后的变化通知 POST 到本地地址")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    watchlist = [code.strip() for code in args.watch.split(',') if code.strip()]
+    if args.watch_file:
+        with open(args.watch_file, 'r', encoding='utf-8') as f:
+            watchlist.extend(line.strip() for line in f if line.strip())
+    if args.from_db:
+        watchlist.extend(load_watchlist_from_db(args.from_db))
+    if not watchlist:
+        parser.error("监控列表为空")
+
+    engine = MonitorEngine(args.endpoint, watchlist, poll_interval=args.interval,
+                           concurrency=args.concurrency, rate_limit=args.rate)
+    engine.add_listener(lambda event: print(f"{time.strftime('%H:%M:%S')} {event.course_code} "
+                                            f"{event.field}: {event.old} -> {event.new}"))
+
+    store = None
+    if args.store:
+        from monitor.event_store import EventStore
+        store = EventStore(args.store)
+        engine.add_listener(store.append)
+
+    sinks = []
+    if args.notify_log or args.webhook:
+        from monitor.notifications import NotificationPipeline, LogFileSink, WebhookSink
+        if args.notify_log:
+            sinks.append(LogFileSink(args.notify_log))
+        if args.webhook:
+            sinks.append(WebhookSink(args.webhook))
+
+    async def prune_events():
+        """启动时和之后每隔 MONITOR_EVENT_PRUNE_INTERVAL 秒删除超过保留期的事件"""
+        while True:
+            try:
+                store.prune()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to prune event store: {e}")
+            await asyncio.sleep(MONITOR_EVENT_PRUNE_INTERVAL)
+
+    async def run():
+        pipeline = None
+        if sinks:
+            pipeline = await NotificationPipeline(sinks).start()
+            engine.add_listener(pipeline.consume)
+        prune_task = asyncio.ensure_future(prune_events()) if store is not None else None
+        try:
+            return await engine.run(args.duration)
+        finally:
+            if prune_task is not None:
+                prune_task.cancel()
+            await engine.close()
+            if pipeline is not None:
+                await pipeline.close()
+            if store is not None:
+                store.close()
+
+    print(f"监控 {len(engine.watchlist)} 门课程: {args.endpoint}")
+    try:
+        stats = asyncio.run(run())
+    except KeyboardInterrupt:
+        stats = engine.stats
+    print("统计: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+变化事件存储
+只追加的 SQLite 事件表（WAL 模式）：
+- 事件先进入内存缓冲，按条数或时间间隔批量写入，一次事务提交一批
+- 课程代码映射为整数ID，事件行只保存时间、课程ID、字段和新旧值
+- (课程ID, 时间) 和 时间 两个索引分别支持 "课程X的历史" 和 "T 之后的变化"，不扫描全表
+- prune() 按保留期删除旧事件，compact() 把保留期内较早的事件合并为每个（课程, 字段）一条净变化
+
+用法:
+    python -m monitor events --benchmark 200000   # 写入吞吐量、查询耗时和查询计划检查
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MONITOR_EVENT_DB, MONITOR_EVENT_RETENTION_DAYS
+from monitor.engine import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS event_courses (
+        id INTEGER PRIMARY KEY,
+        code TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        course_id INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        old_value,
+        new_value
+    );
+    CREATE INDEX IF NOT EXISTS idx_events_course_ts ON events(course_id, ts);
+    CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+'''
+
+_EVENT_COLUMNS = 'e.ts, c.code, e.field, e.old_value, e.new_value'
+
+
+def _encode_value(value):
+    """数字、字符串和None原样保存，其他值保存为JSON文本"""
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _as_event(event):
+    if isinstance(event, ChangeEvent):
+        return event
+    return ChangeEvent(event['course_code'], event['field'], event.get('old'), event.get('new'),
+                       event.get('timestamp'))
+
+
+class EventStore:
+    """
+    只追加的变化事件存储
+
+    可以直接注册为监控引擎的监听者: engine.add_listener(store.append)
+
+    Args:
+        db_path: 数据库文件路径（":memory:" 用于测试）
+        batch_size: 缓冲达到多少条时写入
+        flush_interval: 距上次写入超过多少秒时，下一次 append 触发写入
+    """
+
+    def __init__(self, db_path=MONITOR_EVENT_DB, batch_size=1000, flush_interval=1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._course_ids = dict(
+            (code, course_id) for course_id, code in self._conn.execute("SELECT id, code FROM event_courses")
+        )
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self.written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- 写入 ----
+
+    def _course_id(self, code):
+        course_id = self._course_ids.get(code)
+        if course_id is None:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO event_courses (code) VALUES (?)", (code,))
+            course_id = cursor.lastrowid if cursor.rowcount else self._conn.execute(
+                "SELECT id FROM event_courses WHERE code = ?", (code,)).fetchone()[0]
+            self._course_ids[code] = course_id
+        return course_id
+
+    def append(self, event):
+        """追加一个事件（ChangeEvent 或同结构的字典）"""
+        self._buffer.append(_as_event(event))
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def append_many(self, events):
+        for event in events:
+            self._buffer.append(_as_event(event))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """把缓冲中的事件在一个事务中写入"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return 0
+        events, self._buffer = self._buffer, []
+        with self._conn:
+            rows = [(event.timestamp, self._course_id(event.course_code), event.field,
+                     _encode_value(event.old), _encode_value(event.new)) for event in events]
+            self._conn.executemany(
+                "INSERT INTO events (ts, course_id, field, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        self.written += len(rows)
+        return len(rows)
+
+    # ---- 查询 ----
+
+    def _query(self, sql, params):
+        self.flush()
+        return [ChangeEvent(code, field, old, new, ts)
+                for ts, code, field, old, new in self._conn.execute(sql, params)]
+
+    def history(self, course_code, since=None, until=None, limit=None):
+        """课程的变化历史（按时间升序）"""
+        course_id = self._course_ids.get(course_code)
+        if course_id is None:
+            self.flush()
+            course_id = self._course_ids.get(course_code)
+            if course_id is None:
+                return []
+        sql = (f"SELECT {_EVENT_COLUMNS} FROM events e JOIN event_courses c ON c.id = e.course_id "
+               f"WHERE e.course_id = ? AND e.ts >= ? AND e.ts < ? ORDER BY e.ts")
+        params = [course_id, since if since is not None else float('-inf'),
+                  until if until is not None else float('inf')]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def changes_since(self, since, limit=None, fields=None):
+        """某个时间之后的所有变化（按时间升序），可按字段过滤"""
+        sql = (f"SELECT {_EVENT_COLUMNS} FROM events e JOIN event_courses c ON c.id = e.course_id "
+               f"WHERE e.ts > ?")
+        params = [since]
+        if fields:
+            sql += f" AND e.field IN ({','.join('?' for _ in fields)})"
+            params.extend(fields)
+        sql += " ORDER BY e.ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def count(self):
+        self.flush()
+        return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    # ---- 保留期与压缩 ----
+
+    def prune(self, older_than=None, retention_days=MONITOR_EVENT_RETENTION_DAYS):
+        """
+        删除早于 older_than（时间戳）的事件，默认按保留天数计算
+
+        Returns:
+            int: 删除的事件数
+        """
+        self.flush()
+        cutoff = older_than if older_than is not None else time.time() - retention_days * 86400
+        with self._conn:
+            deleted = self._conn.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} events older than {cutoff:.0f}")
+        return deleted
+
+    def compact(self, before, batch_size=1000):
+        """
+        把 before 之前的事件合并为每个（课程, 字段）一条净变化：
+        旧值取最早一条的旧值，新值和时间取最后一条；净变化为空（改回原值）的直接删除
+
+        逐门课程按 (课程ID, 时间) 索引读取，每次 fetchmany(batch_size) 条，
+        内存占用只与一门课程的字段数有关，与待合并的事件总数无关。整个压缩在一个事务中完成
+
+        Returns:
+            int: 减少的事件数
+        """
+        self.flush()
+        total = 0
+        remaining = 0
+        with self._conn:
+            course_ids = [row[0] for row in self._conn.execute("SELECT id FROM event_courses")]
+            for course_id in course_ids:
+                cursor = self._conn.execute(
+                    "SELECT field, old_value, new_value, ts FROM events "
+                    "WHERE course_id = ? AND ts < ? ORDER BY ts, id", (course_id, before)
+                )
+                merged = {}
+                count = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    for field, old, new, ts in rows:
+                        if field in merged:
+                            merged[field][1:3] = [new, ts]
+                        else:
+                            merged[field] = [old, new, ts]
+                cursor.close()
+                if count <= len(merged) and all(old != new for old, new, _ in merged.values()):
+                    # 每个字段只有一条且不是净零变化，无需改写
+                    total += count
+                    remaining += count
+                    continue
+
+                self._conn.execute("DELETE FROM events WHERE course_id = ? AND ts < ?", (course_id, before))
+                rows = [(ts, course_id, field, old, new)
+                        for field, (old, new, ts) in merged.items() if old != new]
+                self._conn.executemany(
+                    "INSERT INTO events (ts, course_id, field, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                total += count
+                remaining += len(rows)
+        if total:
+            logger.info(f"Compacted {total} events before {before:.0f} into {remaining}")
+        return total - remaining
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+# ---- 基准与查询计划检查 ----
+
+def run_benchmark(count, courses=3000, db_path=':memory:'):
+    """写入 count 个合成事件，测量吞吐量和查询耗时，并检查查询计划没有全表扫描"""
+    import random
+    from database.query_plan import explain_query_plan, find_plan_problems
+
+    rng = random.Random(0)
+    codes = [f"SIM{index:06d}" for index in range(1, courses + 1)]
+    start_ts = time.time() - count
+    store = EventStore(db_path, batch_size=2000)
+
+    start = time.perf_counter()
+    for index in range(count):
+        store.append(ChangeEvent(rng.choice(codes), 'enrolled', index, index + 1, start_ts + index))
+    store.flush()
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    history = store.history(codes[0])
+    history_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    recent = store.changes_since(start_ts + count - 1000)
+    since_ms = (time.perf_counter() - start) * 1000
+
+    problems = []
+    conn = store._conn
+    for sql in (
+        f"SELECT {_EVENT_COLUMNS} FROM events e JOIN event_courses c ON c.id = e.course_id "
+        f"WHERE e.course_id = 1 AND e.ts >= 0 AND e.ts < 1e12 ORDER BY e.ts",
+        f"SELECT {_EVENT_COLUMNS} FROM events e JOIN event_courses c ON c.id = e.course_id "
+        f"WHERE e.ts > 0 ORDER BY e.ts",
+        "SELECT field, old_value, new_value, ts FROM events WHERE course_id = 1 AND ts < 1e12 ORDER BY ts, id",
+    ):
+        problems.extend(find_plan_problems(explain_query_plan(conn, sql)))
+    store.close()
+
+    return {
+        'events': count,
+        'write_per_second': count / write_seconds if write_seconds > 0 else float('inf'),
+        'history_rows': len(history),
+        'history_ms': history_ms,
+        'since_rows': len(recent),
+        'since_ms': since_ms,
+        'plan_problems': problems,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="变化事件存储基准")
+    parser.add_argument('--benchmark', type=int, default=100000, metavar='N', help="写入的事件数")
+    parser.add_argument('--db', default=':memory:', help="数据库路径（默认内存）")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.benchmark, db_path=args.db)
+    print(f"写入 {result['events']} 个事件: {result['write_per_second']:.0f} 个/秒")
+    print(f"课程历史: {result['history_rows']} 条, {result['history_ms']:.2f} ms")
+    print(f"最近变化: {result['since_rows']} 条, {result['since_ms']:.2f} ms")
+    for problem in result['plan_problems']:
+        print(f"✗ {problem}")
+    if not result['plan_problems']:
+        print("✓ 查询计划检查通过")
+    return 1 if result['plan_problems'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""
+变化通知
+消费监控引擎的变化事件，合并、分批、限速后异步投递到各通知渠道：
+- 同一（课程, 字段）在去重窗口内只通知一次，窗口内的后续变化合并为一条（旧值取最早，新值取最新），
+  合并后改回原值的变化直接丢弃
+- 每个渠道有独立的待发送队列和令牌桶，被限速期间到达的事件继续合并，慢渠道不影响其他渠道
+- 渠道实现 async send(events) 即可接入：系统托盘消息、本地 HTTP POST、日志文件
+
+用法:
+    pipeline = NotificationPipeline([LogFileSink("notify.log"), WebhookSink("http://127.0.0.1:9000/hook")])
+    engine.add_listener(pipeline.consume)
+    await pipeline.start()
+    ...
+    await pipeline.close()
+
+    python -m monitor notify --events 50000    # 合成突发下的吞吐量和延迟
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+import logging
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (NOTIFY_DEDUPE_WINDOW, NOTIFY_BATCH_WINDOW, NOTIFY_MAX_BATCH,
+                    NOTIFY_RATE_LIMITS)
+from monitor.engine import ChangeEvent, TokenBucket
+from utils.async_http import AsyncHTTPClient
+
+logger = logging.getLogger(__name__)
+
+FIELD_LABELS = {
+    'enrolled': '已选人数',
+    'capacity': '容量',
+    'room': '教室',
+    'status': '状态',
+}
+
+# 渠道未配置限速时每秒最多发送的批次数
+DEFAULT_SINK_RATE = 1.0
+
+# 每个渠道保留的最近投递延迟样本数，延迟分位数按这些样本计算，长时间运行时内存不增长
+LATENCY_SAMPLES = 10000
+
+
+def format_event(event):
+    label = FIELD_LABELS.get(event.field, event.field)
+    return f"{event.course_code} {label}: {event.old} → {event.new}"
+
+
+def format_notification(events):
+    """格式化为 (标题, 正文)"""
+    courses = {event.course_code for event in events}
+    title = (f"课程 {next(iter(courses))} 有变化" if len(courses) == 1
+             else f"{len(courses)} 门课程有变化")
+    return title, '\n'.join(format_event(event) for event in events)
+
+
+def _merge(existing, incoming):
+    return ChangeEvent(incoming.course_code, incoming.field, existing.old, incoming.new,
+                       incoming.timestamp)
+
+
+# ---- 通知渠道 ----
+
+class LogFileSink:
+    """追加写入日志文件（每个事件一行JSON）"""
+
+    name = 'log'
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def _write(self, lines):
+        with open(self.file_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+
+    async def send(self, events):
+        lines = [json.dumps(event.to_dict(), ensure_ascii=False) + '\n' for event in events]
+        await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+
+
+class WebhookSink:
+    """POST JSON 到本地 HTTP 地址: {"title", "text", "events": [...]}"""
+
+    name = 'webhook'
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.client = AsyncHTTPClient(url, max_connections=2, timeout=timeout)
+
+    async def send(self, events):
+        title, text = format_notification(events)
+        response = await self.client.request('POST', '', payload={
+            'title': title,
+            'text': text,
+            'events': [event.to_dict() for event in events],
+        })
+        if response.status >= 400:
+            raise ConnectionError(f"Webhook 返回 {response.status}")
+
+    async def close(self):
+        await self.client.close()
+
+
+class TraySink:
+    """
+    系统托盘消息（QSystemTrayIcon.showMessage）
+
+    通知流水线通常运行在独立线程的事件循环中，这里通过信号把消息排队到托盘图标所在的界面线程。
+    必须在界面线程中创建
+    """
+
+    name = 'tray'
+
+    def __init__(self, tray_icon, duration_ms=5000):
+        from PyQt5.QtCore import QObject, pyqtSignal
+
+        class _TrayBridge(QObject):
+            message = pyqtSignal(str, str)
+
+        self._bridge = _TrayBridge()
+        self._bridge.message.connect(
+            lambda title, text: tray_icon.showMessage(title, text, tray_icon.Information, duration_ms))
+
+    async def send(self, events):
+        title, text = format_notification(events)
+        self._bridge.message.emit(title, text)
+
+
+class CallbackSink:
+    """调用普通函数或协程函数 callback(events)，用于测试和自定义渠道"""
+
+    def __init__(self, callback, name='callback'):
+        self.callback = callback
+        self.name = name
+
+    async def send(self, events):
+        result = self.callback(events)
+        if asyncio.iscoroutine(result):
+            await result
+
+
+# ---- 流水线 ----
+
+class _SinkWorker:
+    """一个渠道的待发送队列、限速和投递统计"""
+
+    def __init__(self, sink, rate, max_batch):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.bucket = TokenBucket(rate, burst=1)
+        self.pending = {}  # (课程, 字段) -> [事件, 最早到达时间]
+        self.ready = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.task = None
+        self.stats = {'notifications': 0, 'events': 0, 'failed': 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def put(self, items):
+        for key, (event, received) in items:
+            existing = self.pending.get(key)
+            if existing is None:
+                self.pending[key] = [event, received]
+            else:
+                existing[0] = _merge(existing[0], event)
+                existing[1] = min(existing[1], received)
+        if self.pending:
+            self.idle.clear()
+            self.ready.set()
+
+    async def run(self):
+        while True:
+            await self.ready.wait()
+            # 等待令牌期间到达的事件继续合并进同一批
+            await self.bucket.acquire()
+            keys = list(self.pending)[:self.max_batch]
+            batch = [self.pending.pop(key) for key in keys]
+            if not self.pending:
+                self.ready.clear()
+
+            events = [event for event, _ in batch if event.old != event.new]
+            if events:
+                try:
+                    await self.sink.send(events)
+                    now = time.monotonic()
+                    self.stats['notifications'] += 1
+                    self.stats['events'] += len(events)
+                    self.latencies.extend(now - received for _, received in batch)
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    logger.error(f"Notification sink {self.sink.name} failed: {e}")
+            if not self.pending:
+                self.idle.set()
+
+
+class NotificationPipeline:
+    """
+    变化事件 -> 去重合并 -> 分渠道限速批量投递
+
+    Args:
+        sinks: 通知渠道
+        dedupe_window: 同一（课程, 字段）两次通知的最短间隔（秒）
+        batch_window: 合并窗口，每隔多少秒把到期的事件分发给各渠道
+        max_batch: 一条通知最多包含的事件数
+        rate_limits: {渠道名: 每秒最多发送的通知数}
+    """
+
+    def __init__(self, sinks, dedupe_window=NOTIFY_DEDUPE_WINDOW, batch_window=NOTIFY_BATCH_WINDOW,
+                 max_batch=NOTIFY_MAX_BATCH, rate_limits=None):
+        self.dedupe_window = dedupe_window
+        self.batch_window = batch_window
+        rate_limits = dict(NOTIFY_RATE_LIMITS, **(rate_limits or {}))
+        self.workers = [_SinkWorker(sink, rate_limits.get(sink.name, DEFAULT_SINK_RATE), max_batch)
+                        for sink in sinks]
+        self._pending = {}
+        self._last_dispatch = {}
+        self._flusher = None
+        self.received = 0
+        self.dropped = 0
+
+    def consume(self, event):
+        """接收一个变化事件（可直接注册为监控引擎的监听者）"""
+        self.received += 1
+        key = (event.course_code, event.field)
+        existing = self._pending.get(key)
+        if existing is None:
+            self._pending[key] = [event, time.monotonic()]
+        else:
+            existing[0] = _merge(existing[0], event)
+
+    def _dispatch(self, force=False):
+        now = time.monotonic()
+        ready = []
+        for key, item in list(self._pending.items()):
+            if force or now - self._last_dispatch.get(key, float('-inf')) >= self.dedupe_window:
+                del self._pending[key]
+                if item[0].old == item[0].new:
+                    self.dropped += 1
+                    continue
+                ready.append((key, item))
+                self._last_dispatch[key] = now
+
+        if len(self._last_dispatch) > 4 * max(len(self._pending), 1024):
+            horizon = now - self.dedupe_window
+            self._last_dispatch = {key: at for key, at in self._last_dispatch.items() if at >= horizon}
+
+        if ready:
+            for worker in self.workers:
+                worker.put([(key, [event, received]) for key, (event, received) in ready])
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.batch_window)
+            self._dispatch()
+
+    async def start(self):
+        for worker in self.workers:
+            worker.task = asyncio.ensure_future(worker.run())
+        self._flusher = asyncio.ensure_future(self._flush_loop())
+        return self
+
+    async def close(self, drain=True, timeout=10.0):
+        """停止流水线；drain 为真时先把待发送的事件全部投递（忽略去重窗口，仍然遵守限速）"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+        if drain:
+            self._dispatch(force=True)
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(worker.idle.wait() for worker in self.workers)), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Notification pipeline closed with undelivered events")
+        for worker in self.workers:
+            if worker.task is not None:
+                worker.task.cancel()
+            close = getattr(worker.sink, 'close', None)
+            if close is not None:
+                await close()
+
+    def get_stats(self):
+        stats = {'received': self.received, 'dropped_net_zero': self.dropped, 'sinks': {}}
+        for worker in self.workers:
+            latencies = sorted(worker.latencies)
+            sink_stats = dict(worker.stats)
+            if latencies:
+                sink_stats['latency_p50'] = latencies[len(latencies) // 2]
+                sink_stats['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats['sinks'][worker.sink.name] = sink_stats
+        return stats
+
+
+# ---- 突发基准 ----
+
+async def run_burst_benchmark(events=50000, courses=500, burst_seconds=2.0, batch_window=0.2,
+                              dedupe_window=1.0):
+    """
+    在 burst_seconds 内注入 events 个变化事件，测量流水线的接收吞吐量、
+    合并后的通知条数和从事件到达到投递的延迟
+    """
+    import random
+
+    rng = random.Random(0)
+    delivered = {'fast': 0, 'slow': 0}
+
+    def fast(batch):
+        delivered['fast'] += len(batch)
+
+    async def slow(batch):
+        await asyncio.sleep(0.05)
+        delivered['slow'] += len(batch)
+
+    pipeline = NotificationPipeline(
+        [CallbackSink(fast, 'fast'), CallbackSink(slow, 'slow')],
+        dedupe_window=dedupe_window, batch_window=batch_window, max_batch=200,
+        rate_limits={'fast': 100.0, 'slow': 2.0},
+    )
+    await pipeline.start()
+
+    codes = [f"SIM{index:06d}" for index in range(1, courses + 1)]
+    values = {}
+    chunk = max(1, events // 100)
+    consume_seconds = 0.0
+    start = time.perf_counter()
+    for offset in range(0, events, chunk):
+        chunk_start = time.perf_counter()
+        for _ in range(min(chunk, events - offset)):
+            code = rng.choice(codes)
+            old = values.get(code, 50)
+            new = old + rng.choice([-1, 1])
+            values[code] = new
+            pipeline.consume(ChangeEvent(code, 'enrolled', old, new))
+        consume_seconds += time.perf_counter() - chunk_start
+        await asyncio.sleep(burst_seconds / 100)
+    await pipeline.close(drain=True, timeout=60)
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.get_stats()
+    stats.update({
+        'events': events,
+        'consume_per_second': events / consume_seconds if consume_seconds > 0 else float('inf'),
+        'elapsed': elapsed,
+    })
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="通知流水线突发基准")
+    parser.add_argument('--events', type=int, default=50000, help="注入的事件数")
+    parser.add_argument('--courses', type=int, default=500, help="涉及的课程数")
+    parser.add_argument('--burst', type=float, default=2.0, help="突发持续时间（秒）")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(run_burst_benchmark(args.events, args.courses, args.burst))
+    print(f"注入 {stats['events']} 个事件，接收 {stats['consume_per_second']:.0f} 个/秒，"
+          f"总耗时 {stats['elapsed']:.2f}s，合并后改回原值丢弃 {stats['dropped_net_zero']}")
+    print(f"  {'渠道':<8}{'通知数':>8}{'事件数':>10}{'失败':>6}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, sink in stats['sinks'].items():
+        print(f"  {name:<8}{sink['notifications']:>8}{sink['events']:>10}{sink['failed']:>6}"
+              f"{sink.get('latency_p50', 0) * 1000:>10.1f}{sink.get('latency_p95', 0) * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+本地余量接口模拟服务器
+模拟选课系统的 GET /enrollment/<课程代码> 接口，用于测试监控引擎：
+- 定时随机修改一部分课程的已选人数，偶尔调整教室或停开课程
+- 支持 ETag 条件请求（未变化时返回 304）
+- 可按比例注入 503（带 Retry-After）响应，检验退避逻辑
+- GET /stats 返回累计请求数和每门课程的请求次数分布，检验轮询是否过于频繁
+
+用法:
+    python -m monitor stub --port 8766 --courses 3000
+    python -m monitor stub --from-db --change-rate 0.02 --error-rate 0.01
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.async_http import AsyncHTTPServer, Response, HTTPError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8766
+_ROOMS = ['教一101', '教一204', '教二108', '学园一254', '学园二112', '学园三301', '阶梯教室1']
+
+
+class EnrollmentStub:
+    """
+    课程余量数据和接口处理函数
+
+    Args:
+        codes: 课程代码
+        change_rate: 每次 tick 中发生变化的课程比例
+        error_rate: 返回 503 的请求比例
+        retry_after: 503 响应的 Retry-After（秒）
+    """
+
+    def __init__(self, codes, change_rate=0.02, error_rate=0.0, retry_after=5, seed=None):
+        self._random = random.Random(seed)
+        self.change_rate = change_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.courses = {}
+        for code in codes:
+            capacity = self._random.choice([30, 40, 60, 80, 120, 200])
+            self.courses[code] = {
+                'code': code,
+                'capacity': capacity,
+                'enrolled': self._random.randint(0, capacity),
+                'room': self._random.choice(_ROOMS),
+                'status': 'open',
+                'version': 1,
+                'updated_at': time.time(),
+            }
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.per_course = Counter()
+        self.changes = 0
+
+    def tick(self):
+        """随机修改一批课程"""
+        codes = list(self.courses)
+        count = max(1, int(len(codes) * self.change_rate)) if codes and self.change_rate > 0 else 0
+        for code in self._random.sample(codes, min(count, len(codes))):
+            course = self.courses[code]
+            roll = self._random.random()
+            if roll < 0.9:
+                delta = self._random.choice([-2, -1, 1, 1, 2, 3])
+                course['enrolled'] = min(course['capacity'], max(0, course['enrolled'] + delta))
+            elif roll < 0.98:
+                course['room'] = self._random.choice(_ROOMS)
+            else:
+                course['status'] = 'cancelled' if course['status'] == 'open' else 'open'
+            course['version'] += 1
+            course['updated_at'] = time.time()
+            self.changes += 1
+
+    async def run_ticker(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.tick()
+
+    def enrollment(self, request):
+        code = request.path_params['tail']
+        self.requests += 1
+        self.per_course[code] += 1
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return Response(503, {'error': '服务繁忙'}, {'Retry-After': str(self.retry_after)})
+
+        course = self.courses.get(code)
+        if course is None:
+            raise HTTPError(404, f"课程不存在: {code}")
+
+        etag = f'"{course["version"]}"'
+        if request.headers.get('if-none-match') == etag:
+            self.not_modified += 1
+            return Response(304, None, {'ETag': etag})
+
+        payload = {key: value for key, value in course.items() if key != 'version'}
+        return Response(200, payload, {'ETag': etag})
+
+    def stats(self, request):
+        counts = sorted(self.per_course.values())
+        return {
+            'courses': len(self.courses),
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'errors': self.errors,
+            'changes': self.changes,
+            'max_requests_per_course': counts[-1] if counts else 0,
+            'median_requests_per_course': counts[len(counts) // 2] if counts else 0,
+        }
+
+    def build_server(self, host='127.0.0.1', port=DEFAULT_PORT):
+        server = AsyncHTTPServer(host, port)
+        server.route('GET', '/enrollment/', self.enrollment)
+        server.route('GET', '/stats', self.stats)
+        return server
+
+
+def synthetic_codes(count):
+    return [f"SIM{index:06d}" for index in range(1, count + 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地余量接口模拟服务器")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument('--courses', type=int, default=1000, help="模拟的课程数")
+    parser.add_argument('--from-db', action='store_true', help="使用课程数据库中的课程代码")
+    parser.add_argument('--change-rate', type=float, default=0.02, help="每次变化的课程比例")
+    parser.add_argument('--tick', type=float, default=1.0, help="数据变化间隔（秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 响应比例")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.from_db:
+        from monitor.engine import load_watchlist_from_db
+        codes = load_watchlist_from_db()
+    else:
+        codes = synthetic_codes(args.courses)
+
+    stub = EnrollmentStub(codes, change_rate=args.change_rate, error_rate=args.error_rate)
+    server = stub.build_server(args.host, args.port)
+
+    async def run():
+        await server.start()
+        ticker = asyncio.ensure_future(stub.run_ticker(args.tick))
+        try:
+            await server.serve_forever()
+        finally:
+            ticker.cancel()
+            await server.close()
+
+    print(f"余量模拟服务: http://{args.host}:{args.port}/enrollment/<课程代码> ({len(codes)} 门课程)")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+选课规划核心
+不依赖 PyQt5：课程目录快照、选课状态、增量冲突跟踪、统计和导出模型，
+图形界面与批量工具都基于这里构建
+"""
+
+from .schedule import parse_weeks, parse_slots, schedule_weeks, schedule_mask, course_mask
+from .conflicts import ConflictTracker
+from .catalog import DatabaseCatalog, SnapshotCatalog, CatalogIndex
+from .selection import Selection, custom_course_id, custom_course_index
+from .statistics import compute_statistics
+from .solver import solve
+
+from database.catalog_snapshot import CatalogSnapshot
+from export.export_model import ExportModel, ExportModelCache
+
+__all__ = [
+    'parse_weeks', 'parse_slots', 'schedule_weeks', 'schedule_mask', 'course_mask',
+    'ConflictTracker', 'DatabaseCatalog', 'SnapshotCatalog', 'CatalogIndex',
+    'Selection', 'custom_course_id', 'custom_course_index', 'compute_statistics', 'solve',
+    'CatalogSnapshot', 'ExportModel', 'ExportModelCache',
+]
@@ -0,0 +1,242 @@
+"""
+批量方案检查
+读取整个年级的选课方案（学号 -> 课程ID或课程代码），检查每个方案的时间冲突、
+总学分是否超过 MAX_CREDITS 以及目录中不存在的课程，输出检查报告。
+课程目录只读取一次并构建为 CatalogIndex（代码索引、学分、占用位图），
+方案分块后在进程池中并行检查，每个方案只做字典查找和整数按位与
+
+用法:
+    python -m planner.batch_check plans.jsonl -o report.csv [--workers N]
+    python -m planner.batch_check plans.csv -o report.jsonl --max-credits 25
+
+方案文件格式:
+    JSONL: 每行 {"student": "2025001", "courses": [12, "081M4001H", 301]}
+    CSV: 表头 student,courses，courses 用分号、顿号或空格分隔；
+         同一学号出现多行时合并（可以每行一门课程）
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH, MAX_CREDITS
+from database import CourseDatabase, CatalogSnapshot
+from planner.catalog import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+REPORT_HEADER = ['学号', '课程数', '总学分', '超出学分上限', '冲突数', '冲突课程', '不存在的课程']
+
+# 每个任务包含的方案数，进程间通信按块进行
+CHUNK_SIZE = 2000
+
+_COURSE_SEPARATOR = re.compile(r'[;；,，、\s]+')
+
+
+def _student_key(record):
+    for key in ('student', 'student_id', 'id', 'name'):
+        if key in record:
+            return str(record[key])
+    raise ValueError(f"方案缺少学号字段: {record}")
+
+
+def _course_tokens(value):
+    if isinstance(value, list):
+        return value
+    return [token for token in _COURSE_SEPARATOR.split(str(value or '')) if token]
+
+
+def load_plans(file_path):
+    """
+    读取方案文件（.jsonl 或 .csv）
+
+    Returns:
+        list: [(学号, [课程ID或课程代码, ...])]，按文件中首次出现的顺序
+    """
+    plans = {}
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                courses = row.get('courses', row.get('course', ''))
+                plans.setdefault(_student_key(row), []).extend(_course_tokens(courses))
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"第 {line_number} 行不是有效的JSON: {e}") from e
+                courses = record.get('courses', record.get('course_ids', []))
+                plans.setdefault(_student_key(record), []).extend(_course_tokens(courses))
+    return list(plans.items())
+
+
+def check_plan(index, student, tokens, max_credits=MAX_CREDITS):
+    """
+    检查单个方案
+
+    Returns:
+        dict: {'student', 'course_ids', 'credits', 'over_credits', 'conflicts', 'missing'}
+              conflicts 为冲突的课程ID对
+    """
+    course_ids = []
+    missing = []
+    for token in tokens:
+        course_id = index.resolve(token)
+        if course_id is None:
+            missing.append(str(token))
+        elif course_id not in course_ids:
+            course_ids.append(course_id)
+
+    masks = index.masks
+    conflicts = []
+    for position, first in enumerate(course_ids):
+        first_mask = masks[first]
+        if not first_mask:
+            continue
+        for second in course_ids[position + 1:]:
+            if first_mask & masks[second]:
+                conflicts.append((first, second))
+
+    credits = sum(index.credits[course_id] for course_id in course_ids)
+    return {
+        'student': student,
+        'course_ids': course_ids,
+        'credits': credits,
+        'over_credits': credits > max_credits,
+        'conflicts': conflicts,
+        'missing': missing,
+    }
+
+
+# ---- 工作进程 ----
+
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _check_chunk(plans, max_credits):
+    return [check_plan(_worker_index, student, tokens, max_credits) for student, tokens in plans]
+
+
+# ---- 主进程 ----
+
+def load_catalog_index(db_path=DATABASE_PATH, semester=None):
+    """从数据库构建课程目录索引"""
+    db = CourseDatabase(db_path, semester=semester, enable_cache=False)
+    try:
+        return CatalogIndex.from_snapshot(CatalogSnapshot.from_database(db))
+    finally:
+        db.close()
+
+
+def check_plans(plans, index, max_credits=MAX_CREDITS, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    检查多个方案
+
+    Args:
+        plans: [(学号, [课程ID或课程代码, ...])]
+        index: CatalogIndex
+        workers: 工作进程数，默认为CPU核数；为1或方案数不超过一块时在当前进程中执行
+
+    Returns:
+        list: 按输入顺序排列的 check_plan 结果
+    """
+    chunks = [plans[start:start + chunk_size] for start in range(0, len(plans), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+
+    if workers == 1:
+        return [check_plan(index, student, tokens, max_credits) for student, tokens in plans]
+
+    results = []
+    # 目录索引随初始化参数发送，每个工作进程只接收一次
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(index,)) as pool:
+        for chunk_results in pool.map(_check_chunk, chunks, [max_credits] * len(chunks)):
+            results.extend(chunk_results)
+    return results
+
+
+def _conflict_text(index, conflicts):
+    return '; '.join(f"{index.names[first]} × {index.names[second]}" for first, second in conflicts)
+
+
+def write_report(results, index, file_path):
+    """写出检查报告（.jsonl 为每行一个JSON，其余为CSV）"""
+    if file_path.lower().endswith('.jsonl'):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for result in results:
+                record = dict(result, conflicts=[list(pair) for pair in result['conflicts']])
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return
+
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(REPORT_HEADER)
+        for result in results:
+            writer.writerow([
+                result['student'],
+                len(result['course_ids']),
+                f"{result['credits']:g}",
+                '是' if result['over_credits'] else '',
+                len(result['conflicts']),
+                _conflict_text(index, result['conflicts']),
+                '、'.join(result['missing']),
+            ])
+
+
+def format_summary(results, elapsed, max_credits=MAX_CREDITS):
+    """格式化为文本汇总"""
+    total = len(results)
+    rate = total / elapsed if elapsed > 0 else float('inf')
+    with_conflicts = sum(1 for result in results if result['conflicts'])
+    over_credits = sum(1 for result in results if result['over_credits'])
+    with_missing = sum(1 for result in results if result['missing'])
+    return '\n'.join([
+        f"方案检查完成: {total} 个方案, 耗时 {elapsed:.2f}s ({rate:.0f} 方案/秒)",
+        f"  有时间冲突: {with_conflicts}",
+        f"  超过 {max_credits:g} 学分: {over_credits}",
+        f"  包含不存在的课程: {with_missing}",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量检查选课方案的时间冲突和学分")
+    parser.add_argument('plans', help="方案文件（.jsonl 或 .csv）")
+    parser.add_argument('-o', '--output', required=True, help="检查报告（.csv 或 .jsonl）")
+    parser.add_argument('--max-credits', type=float, default=MAX_CREDITS, help="学分上限")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--db', default=DATABASE_PATH, help="课程数据库路径")
+    parser.add_argument('--semester', default=None,
+                        help="学期课程库（见 config.SEMESTER_CATALOGS；默认直接使用 --db 指定的课程库）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    start = time.perf_counter()
+    plans = load_plans(args.plans)
+    index = load_catalog_index(args.db, args.semester)
+    results = check_plans(plans, index, args.max_credits, workers=args.workers)
+    write_report(results, index, args.output)
+    print(format_summary(results, time.perf_counter() - start, args.max_credits))
+    return 1 if any(result['conflicts'] or result['over_credits'] or result['missing']
+                    for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
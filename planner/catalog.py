@@ -0,0 +1,101 @@
+"""
+课程目录数据源
+Selection 只通过这里的接口读取课程信息和时间安排，
+图形界面使用数据库，批量工具使用内存快照
+"""
+
+import logging
+
+from .schedule import course_mask
+from .statistics import parse_number
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseCatalog:
+    """以 CourseDatabase 为数据源（查询结果由数据库的查询缓存复用）"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get_schedules(self, course_id):
+        """时间安排列表: [(day_of_week, time_slots, location, weeks, semester)]"""
+        return self.db.get_course_schedules(course_id)
+
+    def get_courses(self, course_ids):
+        """批量获取课程信息: {课程ID: (name, credits, hours, code)}"""
+        return {row[0]: row[1:] for row in self.db.get_courses_by_ids(list(course_ids))}
+
+
+class SnapshotCatalog:
+    """以 CatalogSnapshot 为数据源，不访问数据库"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def get_schedules(self, course_id):
+        course = self.snapshot.get(course_id)
+        if course is None:
+            return []
+        return [(schedule['day_of_week'], schedule['time_slots'], schedule['location'],
+                 schedule['weeks'], schedule['semester'])
+                for schedule in course['schedules']]
+
+    def get_courses(self, course_ids):
+        courses = {}
+        for course_id in course_ids:
+            course = self.snapshot.get(course_id)
+            if course is not None:
+                courses[course_id] = (course['name'], course['credits'], course['hours'], course['code'])
+        return courses
+
+
+class CatalogIndex:
+    """
+    整个目录的课程代码索引、学分和占用位图，一次性构建后只做字典查找。
+    可以被 pickle，批量检查时随进程池初始化参数分发给工作进程
+    """
+
+    def __init__(self, courses, semester=None):
+        """
+        Args:
+            courses: 课程数据（结构同 get_selected_courses_with_schedules 的元素）
+        """
+        self.semester = semester
+        self.names = {}
+        self.codes = {}
+        self.credits = {}
+        self.masks = {}
+        self._by_code = {}
+        for course in courses:
+            course_id = course['id']
+            self.names[course_id] = course['name']
+            self.codes[course_id] = course['code']
+            self.credits[course_id] = parse_number(course['credits'])
+            self.masks[course_id] = course_mask(
+                (schedule['day_of_week'], schedule['time_slots'], schedule['location'],
+                 schedule['weeks'], schedule['semester'])
+                for schedule in course['schedules']
+            )
+            if course['code']:
+                self._by_code.setdefault(str(course['code']).strip().upper(), course_id)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot, semester=snapshot.semester)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, course_id):
+        return course_id in self.names
+
+    def resolve(self, token):
+        """把课程ID或课程代码解析为课程ID，不存在时返回None"""
+        if isinstance(token, int):
+            return token if token in self.names else None
+        token = str(token).strip()
+        if token.isdigit() and int(token) in self.names:
+            return int(token)
+        return self._by_code.get(token.upper())
+
@@ -0,0 +1,69 @@
+"""
+增量时间冲突跟踪
+每门已选课程保存一个占用位图，添加课程时只与已选课程各做一次按位与，
+冲突的课程对随添加/移除增量维护，不需要每次重新两两比较全部时间安排
+"""
+
+
+class ConflictTracker:
+    """按课程ID维护占用位图和冲突课程对"""
+
+    def __init__(self):
+        self._masks = {}
+        self._pairs = set()
+
+    def __contains__(self, course_id):
+        return course_id in self._masks
+
+    def __len__(self):
+        return len(self._masks)
+
+    def conflicts_with(self, mask, exclude=None):
+        """与给定位图冲突的已选课程ID（按添加顺序）"""
+        if not mask:
+            return []
+        return [course_id for course_id, other in self._masks.items()
+                if course_id != exclude and mask & other]
+
+    def add(self, course_id, mask):
+        """
+        添加课程
+
+        Returns:
+            list: 与之冲突的已选课程ID
+        """
+        if course_id in self._masks:
+            self.remove(course_id)
+        conflicting = self.conflicts_with(mask)
+        for other in conflicting:
+            self._pairs.add((other, course_id))
+        self._masks[course_id] = mask
+        return conflicting
+
+    def remove(self, course_id):
+        """移除课程及其相关的冲突课程对"""
+        if self._masks.pop(course_id, None) is not None:
+            self._pairs = {pair for pair in self._pairs if course_id not in pair}
+
+    def clear(self):
+        self._masks.clear()
+        self._pairs.clear()
+
+    def mask(self, course_id):
+        return self._masks.get(course_id, 0)
+
+    def combined_mask(self):
+        """全部已选课程的占用位图"""
+        combined = 0
+        for mask in self._masks.values():
+            combined |= mask
+        return combined
+
+    def conflict_pairs(self):
+        """冲突的课程对 [(先添加的课程ID, 后添加的课程ID)]"""
+        order = {course_id: index for index, course_id in enumerate(self._masks)}
+        return sorted(self._pairs, key=lambda pair: (order[pair[0]], order[pair[1]]))
+
+    @property
+    def conflict_count(self):
+        return len(self._pairs)
@@ -0,0 +1,125 @@
+"""
+冲突判定一致性检查
+用 TimeConflictChecker 逐对比较同一天的时间安排（集合求交），与 CatalogIndex 的占用位图
+按位与的结果对照，两者必须给出相同的冲突课程对。位图的节次网格（SLOT_COUNT）小于课程库中
+实际出现的节次、周次解析不一致等问题都会在这里暴露
+
+用法:
+    python -m planner.parity_check [--db ucas_courses_new.db] [--semester 学期]
+"""
+
+import os
+import sys
+import time
+import argparse
+from itertools import combinations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH
+from database import CourseDatabase, CatalogSnapshot
+from planner.catalog import CatalogIndex
+from planner.schedule import SLOT_COUNT, parse_slots
+from utils import TimeConflictChecker
+
+# 报告中列出的不一致课程对数
+MAX_EXAMPLES = 10
+
+
+def _schedule_tuple(schedule):
+    return (schedule['day_of_week'], schedule['time_slots'], schedule['location'],
+            schedule['weeks'], schedule['semester'])
+
+
+def checker_conflicts(snapshot):
+    """TimeConflictChecker 判定的冲突课程对 {(较小ID, 较大ID)}，只比较同一天的时间安排"""
+    by_day = {}
+    for course in snapshot:
+        for schedule in course['schedules']:
+            by_day.setdefault(schedule['day_of_week'], []).append((course['id'], _schedule_tuple(schedule)))
+
+    pairs = set()
+    for entries in by_day.values():
+        for (id1, schedule1), (id2, schedule2) in combinations(entries, 2):
+            if id1 == id2:
+                continue
+            pair = (id1, id2) if id1 < id2 else (id2, id1)
+            if pair not in pairs and TimeConflictChecker.check_conflict(schedule1, schedule2):
+                pairs.add(pair)
+    return pairs
+
+
+def mask_conflicts(index):
+    """占用位图判定的冲突课程对"""
+    items = sorted((course_id, mask) for course_id, mask in index.masks.items() if mask)
+    pairs = set()
+    for position, (id1, mask1) in enumerate(items):
+        for id2, mask2 in items[position + 1:]:
+            if mask1 & mask2:
+                pairs.add((id1, id2))
+    return pairs
+
+
+def check_parity(snapshot):
+    """
+    对照两种冲突判定
+
+    Returns:
+        dict: checker/mask 冲突对数、只被一方判定为冲突的课程对、课程库中的最大节次
+    """
+    index = CatalogIndex.from_snapshot(snapshot)
+    expected = checker_conflicts(snapshot)
+    actual = mask_conflicts(index)
+    max_slot = max((slot for course in snapshot for schedule in course['schedules']
+                    for slot in parse_slots(schedule['time_slots'])), default=0)
+    return {
+        'courses': len(index),
+        'checker_pairs': len(expected),
+        'mask_pairs': len(actual),
+        'missed': sorted(expected - actual),
+        'extra': sorted(actual - expected),
+        'max_slot': max_slot,
+    }
+
+
+def _describe(snapshot, pair):
+    parts = []
+    for course_id in pair:
+        course = snapshot.get(course_id)
+        schedules = '; '.join(f"周{s['day_of_week']} {s['time_slots']}" for s in course['schedules'])
+        parts.append(f"{course_id} {course['name']}（{schedules}）")
+    return ' <-> '.join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对照 TimeConflictChecker 与占用位图的冲突判定")
+    parser.add_argument('--db', default=DATABASE_PATH, help="课程数据库路径")
+    parser.add_argument('--semester', default=None, help="学期课程库（默认使用 --db 指定的主课程库）")
+    args = parser.parse_args(argv)
+
+    db = CourseDatabase(args.db, semester=args.semester, enable_cache=False)
+    try:
+        snapshot = CatalogSnapshot.from_database(db)
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    result = check_parity(snapshot)
+    elapsed = time.perf_counter() - start
+
+    print(f"课程 {result['courses']} 门，最大节次 {result['max_slot']}（位图每天 {SLOT_COUNT} 节），"
+          f"用时 {elapsed:.2f}s")
+    print(f"冲突课程对: TimeConflictChecker {result['checker_pairs']}，占用位图 {result['mask_pairs']}")
+    for label, pairs in (('位图漏报', result['missed']), ('位图误报', result['extra'])):
+        if pairs:
+            print(f"{label} {len(pairs)} 对:")
+            for pair in pairs[:MAX_EXAMPLES]:
+                print(f"  {_describe(snapshot, pair)}")
+
+    ok = not result['missed'] and not result['extra'] and result['max_slot'] <= SLOT_COUNT
+    print("一致" if ok else "不一致")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
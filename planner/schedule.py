@@ -0,0 +1,166 @@
+"""
+时间安排解析与占用位图
+每条时间安排转换为一个整数位图，第 (周次-1)*BITS_PER_WEEK + (星期-1)*SLOT_COUNT + (节次-1)
+位表示该时段有课。两门课程冲突当且仅当位图按位与不为0，一次整数运算即可完成判断
+"""
+
+import os
+import re
+import sys
+import logging
+import functools
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TIME_SLOTS
+
+logger = logging.getLogger(__name__)
+
+# 每天的节次数与 TIME_SLOTS 一致：晚上的课程排到第12、13节（如 "10、11、12"、"12、13"），
+# 超出网格的节次无法放进位图，会导致冲突漏报。python -m planner.parity_check 检查课程库是否超出
+SLOT_COUNT = max(TIME_SLOTS)
+DAY_COUNT = 7
+BITS_PER_WEEK = SLOT_COUNT * DAY_COUNT
+
+# 时间安排未写周次时按整个教学期处理
+DEFAULT_TEACHING_WEEKS = 20
+
+_WEEK_TOKEN = re.compile(r'(\d+)\s*[-~～－—至]\s*(\d+)|(\d+)')
+
+
+def parse_weeks(weeks_str):
+    """
+    解析周次字符串，支持 "2、3、4"、"1-16"、"1-8,10-16" 等写法
+
+    Returns:
+        list: 升序、去重的周次列表
+    """
+    if not weeks_str:
+        return []
+    return list(_parse_weeks(str(weeks_str)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_weeks(text):
+    # 课程库中不同的周次字符串只有几百种，冲突检查和视图刷新反复解析同样的字符串
+    weeks = set()
+    for start, end, single in _WEEK_TOKEN.findall(text):
+        if single:
+            weeks.add(int(single))
+        else:
+            start, end = int(start), int(end)
+            if start > end:
+                start, end = end, start
+            weeks.update(range(start, end + 1))
+    return tuple(sorted(week for week in weeks if week > 0))
+
+
+def schedule_weeks(weeks_str):
+    """上课周次：未写周次时按整个教学期（1～DEFAULT_TEACHING_WEEKS周）处理"""
+    return parse_weeks(weeks_str) or list(range(1, DEFAULT_TEACHING_WEEKS + 1))
+
+
+def parse_slots(time_slots_str):
+    """
+    解析节次字符串（如 "1、2" 或 "7、8、9"），返回从首节到末节的节次列表；
+    自定义课程的 "HH:MM-HH:MM" 起止时间转换为与之重叠的节次
+
+    不按 SLOT_COUNT 截断，超出网格的节次由 occupancy_mask 记录警告
+    """
+    if not time_slots_str:
+        return []
+
+    if ':' in str(time_slots_str):
+        start_time, _, end_time = str(time_slots_str).partition('-')
+        return slots_for_time_range(start_time.strip(), end_time.strip())
+
+    numbers = re.findall(r'\d+', str(time_slots_str))
+    if not numbers:
+        return []
+    start, end = int(numbers[0]), int(numbers[-1])
+    return [slot for slot in range(start, end + 1) if slot >= 1]
+
+
+def _minutes(hhmm):
+    hour, minute = str(hhmm).split(':')[:2]
+    return int(hour) * 60 + int(minute)
+
+
+# 节次 -> (开始分钟, 结束分钟)
+_SLOT_MINUTES = {
+    slot: tuple(_minutes(part) for part in label.split('-'))
+    for slot, label in TIME_SLOTS.items()
+}
+
+
+def slots_for_time_range(start_time, end_time):
+    """把 "HH:MM" 起止时间转换为与之重叠的节次列表（用于自定义课程）"""
+    try:
+        start, end = _minutes(start_time), _minutes(end_time)
+    except (TypeError, ValueError):
+        return []
+    return [slot for slot, (slot_start, slot_end) in sorted(_SLOT_MINUTES.items())
+            if slot_start < end and start < slot_end]
+
+
+def occupancy_mask(day, slots, weeks):
+    """由星期、节次和周次构建占用位图"""
+    if not 1 <= day <= DAY_COUNT or not slots:
+        return 0
+
+    day_mask = 0
+    for slot in slots:
+        if slot > SLOT_COUNT:
+            # 放进位图会落到下一天的格子里，宁可漏掉这一节也不能误报
+            logger.warning(f"Slot {slot} exceeds SLOT_COUNT={SLOT_COUNT}, ignored in occupancy mask")
+            continue
+        day_mask |= 1 << ((day - 1) * SLOT_COUNT + slot - 1)
+
+    mask = 0
+    for week in weeks or range(1, DEFAULT_TEACHING_WEEKS + 1):
+        mask |= day_mask << ((week - 1) * BITS_PER_WEEK)
+    return mask
+
+
+def schedule_mask(schedule):
+    """
+    单条时间安排的占用位图
+
+    Args:
+        schedule: 数据库时间安排 (day_of_week, time_slots, location, weeks, semester)，
+                  或自定义课程的时间安排字典（weekday_num, start_time, end_time, weeks）
+    """
+    if isinstance(schedule, dict):
+        day = schedule.get('weekday_num')
+        slots = slots_for_time_range(schedule.get('start_time'), schedule.get('end_time'))
+        weeks = parse_weeks(schedule.get('weeks'))
+    else:
+        day, time_slots, _, weeks_str, _ = schedule
+        slots = parse_slots(time_slots)
+        weeks = parse_weeks(weeks_str)
+
+    try:
+        day = int(day)
+    except (TypeError, ValueError):
+        return 0
+    return occupancy_mask(day, slots, weeks)
+
+
+def course_mask(schedules):
+    """课程所有时间安排的占用位图"""
+    mask = 0
+    for schedule in schedules:
+        mask |= schedule_mask(schedule)
+    return mask
+
+
+def iter_occupied(mask):
+    """把占用位图展开为 (周次, 星期, 节次)"""
+    position = 0
+    while mask:
+        if mask & 1:
+            week, rest = divmod(position, BITS_PER_WEEK)
+            day, slot = divmod(rest, SLOT_COUNT)
+            yield week + 1, day + 1, slot + 1
+        mask >>= 1
+        position += 1
@@ -0,0 +1,149 @@
+"""
+选课状态
+已选课程、自定义课程和冲突跟踪集中在一个与界面无关的对象中，
+图形界面、批量工具和服务端共用同一套选课与冲突判断逻辑
+"""
+
+import logging
+
+from .schedule import course_mask
+from .conflicts import ConflictTracker
+
+logger = logging.getLogger(__name__)
+
+
+def custom_course_id(index):
+    """自定义课程ID约定为 -(下标+1)，与数据库课程ID区分"""
+    return -(index + 1)
+
+
+def custom_course_index(course_id):
+    """custom_course_id 的逆运算：自定义课程ID -> 在 custom_courses 中的下标"""
+    return -(course_id + 1)
+
+
+class Selection:
+    """
+    一个选课方案
+
+    Attributes:
+        catalog: 课程目录数据源（DatabaseCatalog 或 SnapshotCatalog）
+        items: 已选课程 [(课程ID, 课程名)]，按选课顺序
+        custom_courses: 自定义课程（自定义课程对话框的输出）
+    """
+
+    def __init__(self, catalog, custom_courses=None):
+        self.catalog = catalog
+        self.items = []
+        self.custom_courses = list(custom_courses or [])
+        self.tracker = ConflictTracker()
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, course_id):
+        return course_id in self.tracker
+
+    # ---- 课程数据 ----
+
+    def get_custom_course(self, course_id):
+        """根据ID获取自定义课程，不存在时返回None"""
+        if course_id >= 0:
+            return None
+        index = custom_course_index(course_id)
+        if 0 <= index < len(self.custom_courses):
+            return self.custom_courses[index]
+        return None
+
+    def get_schedules(self, course_id):
+        """课程的时间安排（自定义课程为字典，数据库课程为元组）"""
+        if course_id < 0:
+            custom_course = self.get_custom_course(course_id)
+            return custom_course.get('schedules', []) if custom_course else []
+        return self.catalog.get_schedules(course_id)
+
+    def get_mask(self, course_id):
+        """课程的占用位图，数据库课程的结果会被缓存"""
+        if course_id < 0:
+            return course_mask(self.get_schedules(course_id))
+        mask = self._masks.get(course_id)
+        if mask is None:
+            mask = self._masks[course_id] = course_mask(self.get_schedules(course_id))
+        return mask
+
+    def _name(self, course_id):
+        for selected_id, name in self.items:
+            if selected_id == course_id:
+                return name
+        return ''
+
+    # ---- 选课操作 ----
+
+    def check(self, course_id):
+        """
+        检查课程与已选课程的时间冲突（不修改选课）
+
+        Returns:
+            list: 冲突的已选课程 [(课程ID, 课程名)]
+        """
+        conflicting = self.tracker.conflicts_with(self.get_mask(course_id), exclude=course_id)
+        return [(other, self._name(other)) for other in conflicting]
+
+    def add(self, course_id, course_name):
+        """
+        添加课程，已选时不重复添加
+
+        Returns:
+            list: 冲突的已选课程 [(课程ID, 课程名)]
+        """
+        if course_id in self.tracker:
+            return []
+        conflicting = self.tracker.add(course_id, self.get_mask(course_id))
+        self.items.append((course_id, course_name))
+        return [(other, self._name(other)) for other in conflicting]
+
+    def remove(self, course_id):
+        self.tracker.remove(course_id)
+        self.items = [(cid, name) for cid, name in self.items if cid != course_id]
+
+    def clear(self):
+        self.items = []
+        self.tracker.clear()
+
+    def replace(self, items, custom_courses=None):
+        """整体替换已选课程（导入方案等），可同时替换自定义课程"""
+        if custom_courses is not None:
+            self.custom_courses = list(custom_courses)
+        self.clear()
+        for course_id, course_name in items:
+            self.add(course_id, course_name)
+
+    def add_custom_course(self, course):
+        """添加自定义课程，返回其课程ID"""
+        self.custom_courses.append(course)
+        return custom_course_id(len(self.custom_courses) - 1)
+
+    def set_catalog(self, catalog):
+        """切换课程目录（如切换学期），课程ID只在同一目录内有效，因此清空选课"""
+        self.catalog = catalog
+        self._masks.clear()
+        self.clear()
+
+    # ---- 查询 ----
+
+    def course_ids(self):
+        """已选的数据库课程ID"""
+        return [course_id for course_id, _ in self.items if course_id >= 0]
+
+    def conflict_pairs(self):
+        """冲突的课程对 [(课程名, 课程名)]"""
+        names = dict(self.items)
+        return [(names[first], names[second]) for first, second in self.tracker.conflict_pairs()]
+
+    @property
+    def conflict_count(self):
+        return self.tracker.conflict_count
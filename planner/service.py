@@ -0,0 +1,188 @@
+"""
+选课规划HTTP服务
+启动时把课程目录读入内存（CatalogSnapshot + CatalogIndex），之后所有请求都在同一个
+asyncio 事件循环中直接查内存，不为每个请求打开数据库连接。
+接口只依赖标准库，供选课高峰期的轻量网页前端使用
+
+用法:
+    python -m planner.service [--host 127.0.0.1] [--port 8765] [--db 数据库] [--semester 学期]
+
+接口:
+    GET  /api/health                        目录规模和已处理请求数
+    GET  /api/search?q=关键词&department=&limit=50
+    GET  /api/courses/<课程ID或课程代码>       课程详情（含时间安排）
+    POST /api/check  {"courses": [...], "max_credits": 30}
+    POST /api/solve  {"required": [...], "candidates": [...], "max_credits": 30}
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH, MAX_CREDITS
+from database import CourseDatabase, CatalogSnapshot
+from planner.catalog import CatalogIndex
+from planner.batch_check import check_plan
+from planner.solver import solve
+from utils.async_http import AsyncHTTPServer, HTTPError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_SEARCH_LIMIT = 500
+MAX_PLAN_COURSES = 100
+
+
+class PlanningService:
+    """内存中的课程目录和各接口的处理函数"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.index = CatalogIndex.from_snapshot(snapshot)
+        # 搜索用的小写文本，避免每次请求重复转换
+        self._search_keys = [
+            (course['id'], f"{course['name']}\n{course['code']}".lower(), str(course['hours'] or ''))
+            for course in snapshot
+        ]
+
+    @classmethod
+    def from_database(cls, db_path=DATABASE_PATH, semester=None):
+        db = CourseDatabase(db_path, semester=semester, enable_cache=False)
+        try:
+            return cls(CatalogSnapshot.from_database(db))
+        finally:
+            db.close()
+
+    def _summary(self, course_id):
+        course = self.snapshot.get(course_id)
+        return {
+            'id': course_id,
+            'name': course['name'],
+            'code': course['code'],
+            'credits': course['credits'],
+            'hours': course['hours'],
+        }
+
+    @staticmethod
+    def _body(request):
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HTTPError(400, "请求体应为JSON对象")
+        return body
+
+    def _course_list(self, body, key):
+        courses = body.get(key, [])
+        if not isinstance(courses, list):
+            raise HTTPError(400, f"{key} 应为课程ID或课程代码的列表")
+        if len(courses) > MAX_PLAN_COURSES:
+            raise HTTPError(400, f"{key} 最多 {MAX_PLAN_COURSES} 门课程")
+        return courses
+
+    @staticmethod
+    def _max_credits(body):
+        try:
+            return float(body.get('max_credits', MAX_CREDITS))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "max_credits 应为数字")
+
+    # ---- 接口 ----
+
+    def health(self, request):
+        return {'semester': self.snapshot.semester, 'courses': len(self.snapshot)}
+
+    def search(self, request):
+        keyword = request.query.get('q', '').strip().lower()
+        department = request.query.get('department', '').strip()
+        try:
+            limit = min(int(request.query.get('limit', 50)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            raise HTTPError(400, "limit 应为整数")
+
+        results = []
+        total = 0
+        for course_id, text, hours in self._search_keys:
+            if keyword and keyword not in text:
+                continue
+            if department and department not in hours:
+                continue
+            total += 1
+            if len(results) < limit:
+                results.append(self._summary(course_id))
+        return {'total': total, 'courses': results}
+
+    def course_detail(self, request):
+        course_id = self.index.resolve(request.path_params['tail'])
+        if course_id is None:
+            raise HTTPError(404, f"课程不存在: {request.path_params['tail']}")
+        detail = self._summary(course_id)
+        detail['schedules'] = self.snapshot.get(course_id)['schedules']
+        return detail
+
+    def check(self, request):
+        body = self._body(request)
+        result = check_plan(self.index, 'request', self._course_list(body, 'courses'),
+                            self._max_credits(body))
+        names = self.index.names
+        return {
+            'courses': [self._summary(course_id) for course_id in result['course_ids']],
+            'credits': result['credits'],
+            'over_credits': result['over_credits'],
+            'conflicts': [{'courses': [first, second], 'names': [names[first], names[second]]}
+                          for first, second in result['conflicts']],
+            'missing': result['missing'],
+        }
+
+    def solve(self, request):
+        body = self._body(request)
+        result = solve(self.index, self._course_list(body, 'required'),
+                       self._course_list(body, 'candidates'), self._max_credits(body))
+        return {
+            'courses': [self._summary(course_id) for course_id in result['selected']],
+            'credits': result['credits'],
+            'skipped': result['skipped'],
+        }
+
+    def build_server(self, host='127.0.0.1', port=DEFAULT_PORT):
+        server = AsyncHTTPServer(host, port)
+        server.route('GET', '/api/health',
+                     lambda request: dict(self.health(request), requests=server.request_count))
+        server.route('GET', '/api/search', self.search)
+        server.route('GET', '/api/courses/', self.course_detail)
+        server.route('POST', '/api/check', self.check)
+        server.route('POST', '/api/solve', self.solve)
+        return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选课规划HTTP服务")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument('--db', default=DATABASE_PATH, help="课程数据库路径")
+    parser.add_argument('--semester', default=None, help="学期（默认使用配置中的默认学期）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    service = PlanningService.from_database(args.db, args.semester)
+    server = service.build_server(args.host, args.port)
+    print(f"选课规划服务: http://{args.host}:{args.port}/api/health "
+          f"({len(service.snapshot)} 门课程, {service.snapshot.semester})")
+
+    async def run():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
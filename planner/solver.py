@@ -0,0 +1,59 @@
+"""
+选课求解
+按优先级贪心地选出一组无时间冲突、总学分不超过上限的课程：
+必选课程优先，其余候选课程按给定顺序依次尝试，与已选课程的占用位图不相交才加入
+"""
+
+from config import MAX_CREDITS
+
+
+def solve(index, required=(), candidates=(), max_credits=MAX_CREDITS):
+    """
+    求解无冲突的选课方案
+
+    Args:
+        index: CatalogIndex
+        required: 必选课程（课程ID或课程代码），按优先级排列
+        candidates: 候选课程，按优先级排列
+        max_credits: 学分上限
+
+    Returns:
+        dict: {
+            'selected': 选中的课程ID,
+            'credits': 总学分,
+            'skipped': [{'course': 原始输入, 'course_id', 'reason': 'missing'|'conflict'|'credits',
+                         'conflicts_with': 冲突的已选课程ID}],
+        }
+    """
+    selected = []
+    skipped = []
+    occupied = 0
+    credits = 0.0
+    masks = {}
+
+    for token in list(required) + list(candidates):
+        course_id = index.resolve(token)
+        if course_id is None:
+            skipped.append({'course': token, 'course_id': None, 'reason': 'missing'})
+            continue
+        if course_id in masks:
+            continue
+
+        mask = index.masks[course_id]
+        course_credits = index.credits[course_id]
+        if mask & occupied:
+            skipped.append({
+                'course': token, 'course_id': course_id, 'reason': 'conflict',
+                'conflicts_with': [other for other in selected if masks[other] & mask],
+            })
+            continue
+        if credits + course_credits > max_credits:
+            skipped.append({'course': token, 'course_id': course_id, 'reason': 'credits'})
+            continue
+
+        selected.append(course_id)
+        masks[course_id] = mask
+        occupied |= mask
+        credits += course_credits
+
+    return {'selected': selected, 'credits': credits, 'skipped': skipped}
@@ -0,0 +1,59 @@
+"""
+选课统计
+学分、学时用一次批量查询得到，冲突数和每天的占用节次直接来自冲突跟踪器的位图
+"""
+
+import re
+
+from .schedule import iter_occupied
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_number(value):
+    """从学分/学时字段中取出数值（如 "3.0"、"2学分"），无法解析时为0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ''))
+    return float(match.group()) if match else 0.0
+
+
+def compute_statistics(selection):
+    """
+    计算选课统计
+
+    Returns:
+        dict: {
+            'count': 已选课程数,
+            'credits': 总学分,
+            'hours': 总学时,
+            'conflicts': 冲突课程对数,
+            'day_load': {星期: 至少有一周上课的节次数},
+        }
+    """
+    credits = 0.0
+    hours = 0.0
+
+    courses = selection.catalog.get_courses(selection.course_ids()) if selection.course_ids() else {}
+    for course_id, _ in selection.items:
+        if course_id < 0:
+            custom_course = selection.get_custom_course(course_id) or {}
+            credits += parse_number(custom_course.get('credits'))
+            hours += parse_number(custom_course.get('hours'))
+        elif course_id in courses:
+            _, course_credits, course_hours, _ = courses[course_id]
+            credits += parse_number(course_credits)
+            hours += parse_number(course_hours)
+
+    occupied = {(day, slot) for _, day, slot in iter_occupied(selection.tracker.combined_mask())}
+    day_load = {day: 0 for day in range(1, 8)}
+    for day, _ in occupied:
+        day_load[day] += 1
+
+    return {
+        'count': len(selection.items),
+        'credits': credits,
+        'hours': hours,
+        'conflicts': selection.conflict_count,
+        'day_load': day_load,
+    }
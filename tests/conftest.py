@@ -0,0 +1,27 @@
+"""
+测试公共配置
+与各工具脚本一样把项目根目录加入 sys.path；需要课程库的测试以只读方式打开仓库自带的课程库
+"""
+
+import os
+import sys
+import sqlite3
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from config import DATABASE_PATH
+
+BUNDLED_DB = os.path.join(ROOT, DATABASE_PATH)
+
+
+@pytest.fixture(scope='session')
+def bundled_conn():
+    """仓库自带课程库的只读连接（不修改数据文件）"""
+    if not os.path.exists(BUNDLED_DB):
+        pytest.skip(f"{BUNDLED_DB} not found")
+    conn = sqlite3.connect(f"file:{BUNDLED_DB}?mode=ro", uri=True)
+    yield conn
+    conn.close()
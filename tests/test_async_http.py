@@ -0,0 +1,34 @@
+"""异步HTTP服务器：命令行退出时的关闭流程"""
+
+import asyncio
+
+from utils.async_http import AsyncHTTPClient, AsyncHTTPServer
+
+
+def test_close_after_serve_forever_ends_keep_alive_connections():
+    async def scenario():
+        server = AsyncHTTPServer(port=0)
+        server.route('GET', '/ping', lambda request: {'ok': True})
+        await server.start()
+
+        # 与命令行相同：serve_forever 被取消（Ctrl-C）后在 finally 中关闭服务器
+        async def run():
+            try:
+                await server.serve_forever()
+            finally:
+                await server.close()
+
+        serving = asyncio.ensure_future(run())
+        client = AsyncHTTPClient(f"http://127.0.0.1:{server.port}")
+        response = await client.get('/ping')
+        assert response.json() == {'ok': True}
+        # 客户端保留一个空闲的 keep-alive 连接
+        assert len(server._tasks) == 1
+
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        assert not server._tasks
+        assert not server._writers
+        await client.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
@@ -0,0 +1,79 @@
+"""变化事件存储：保留期删除和历史压缩"""
+
+import time
+
+import pytest
+
+from monitor.engine import ChangeEvent
+from monitor.event_store import EventStore
+
+
+@pytest.fixture
+def store():
+    with EventStore(':memory:', batch_size=100) as event_store:
+        yield event_store
+
+
+def events_of(store, course_code):
+    return [(event.field, event.old, event.new, event.timestamp) for event in store.history(course_code)]
+
+
+def test_prune_deletes_only_events_before_the_cutoff(store):
+    for ts in (100, 200, 300):
+        store.append(ChangeEvent('A', 'enrolled', ts, ts + 1, ts))
+    assert store.prune(older_than=200) == 1
+    assert [event.timestamp for event in store.history('A')] == [200, 300]
+    assert store.prune(older_than=200) == 0
+
+
+def test_prune_defaults_to_the_retention_period(store):
+    now = time.time()
+    store.append(ChangeEvent('A', 'enrolled', 1, 2, now - 3 * 86400))
+    store.append(ChangeEvent('A', 'enrolled', 2, 3, now - 3600))
+    assert store.prune(retention_days=1) == 1
+    assert store.count() == 1
+
+
+@pytest.mark.parametrize('batch_size', [1, 1000])
+def test_compact_merges_each_course_field_into_its_net_change(store, batch_size):
+    store.append_many([
+        ChangeEvent('A', 'enrolled', 10, 11, 1),
+        ChangeEvent('A', 'room', '101', '102', 2),
+        ChangeEvent('A', 'enrolled', 11, 12, 3),
+        ChangeEvent('A', 'enrolled', 12, 15, 4),
+        # 之后的事件不参与压缩
+        ChangeEvent('A', 'enrolled', 15, 16, 20),
+        ChangeEvent('B', 'status', 'open', 'full', 5),
+    ])
+
+    assert store.compact(before=10, batch_size=batch_size) == 2
+    assert events_of(store, 'A') == [
+        ('room', '101', '102', 2),
+        ('enrolled', 10, 15, 4),
+        ('enrolled', 15, 16, 20),
+    ]
+    assert events_of(store, 'B') == [('status', 'open', 'full', 5)]
+
+
+def test_compact_drops_changes_that_were_reverted(store):
+    store.append_many([
+        ChangeEvent('A', 'enrolled', 10, 11, 1),
+        ChangeEvent('A', 'enrolled', 11, 10, 2),
+        ChangeEvent('A', 'room', '101', '102', 3),
+    ])
+    assert store.compact(before=10) == 2
+    assert events_of(store, 'A') == [('room', '101', '102', 3)]
+
+
+def test_compact_is_idempotent(store):
+    store.append_many([ChangeEvent('A', 'enrolled', n, n + 1, n) for n in range(5)])
+    assert store.compact(before=10) == 4
+    assert store.compact(before=10) == 0
+    assert events_of(store, 'A') == [('enrolled', 0, 5, 4)]
+
+
+def test_compact_includes_buffered_events(store):
+    store.append(ChangeEvent('A', 'enrolled', 1, 2, 1))
+    store.append(ChangeEvent('A', 'enrolled', 2, 3, 2))
+    assert store.compact(before=10) == 1
+    assert store.count() == 1
@@ -0,0 +1,49 @@
+"""iCalendar 导出：周次压缩和节次覆盖"""
+
+import logging
+
+from config import TIME_SLOTS
+from export.ical import ICalendarBuilder, compress_weeks
+from planner.schedule import parse_slots
+
+
+def test_compress_weeks():
+    assert compress_weeks([1, 2, 3, 4]) == [(1, 4, 1, [])]
+    assert compress_weeks([1, 3, 5, 7]) == [(1, 4, 2, [])]
+    assert compress_weeks([1, 2, 4, 5]) == [(1, 5, 1, [3])]
+    assert compress_weeks([1, 2, 19, 20]) == [(1, 2, 1, []), (19, 2, 1, [])]
+    assert compress_weeks([]) == []
+
+
+def test_every_catalog_slot_has_a_time(bundled_conn):
+    rows = bundled_conn.execute("SELECT DISTINCT time_slots FROM course_schedules").fetchall()
+    slots = {slot for (text,) in rows for slot in parse_slots(text)}
+    assert slots - set(TIME_SLOTS) == set()
+
+
+def test_evening_slots_are_exported():
+    builder = ICalendarBuilder("2025-09-01", TIME_SLOTS)
+    assert builder.add_schedule("晚课", 3, [11, 12, 13], [1]) == 1
+    assert f"DTSTART;TZID=Asia/Shanghai:20250903T{TIME_SLOTS[11][:5].replace(':', '')}00" in builder.lines
+    assert f"DTEND;TZID=Asia/Shanghai:20250903T{TIME_SLOTS[13][-5:].replace(':', '')}00" in builder.lines
+    assert builder.unplaced == []
+
+
+def test_unknown_slot_is_reported_not_truncated(caplog):
+    builder = ICalendarBuilder("2025-09-01", {1: "08:00-08:50", 2: "09:00-09:50"})
+    with caplog.at_level(logging.WARNING, logger='export.ical'):
+        assert builder.add_schedule("课程", 1, [2, 3], [1, 2]) == 0
+    assert builder.lines == []
+    assert builder.unplaced == [("课程", 1, [2, 3])]
+    assert "Cannot place schedule" in caplog.text
+
+
+def test_write_uses_crlf(tmp_path):
+    builder = ICalendarBuilder("2025-09-01", TIME_SLOTS, calendar_name="测试")
+    builder.add_schedule("课程", 1, [1, 2], [1, 2, 3], location="教一楼101")
+    path = tmp_path / "plan.ics"
+    builder.write(path)
+    data = path.read_bytes()
+    assert data.startswith(b"BEGIN:VCALENDAR\r\n")
+    assert data.endswith(b"END:VCALENDAR\r\n")
+    assert b"RRULE:FREQ=WEEKLY;COUNT=3" in data
@@ -0,0 +1,81 @@
+"""余量监控引擎：unwatch 后重新 watch 同一课程时只保留一条轮询链"""
+
+import asyncio
+import json
+
+from monitor.engine import MonitorEngine
+from utils.async_http import ClientResponse
+
+# 足够长，运行期间每次 watch 只轮询一次
+POLL_INTERVAL = 60
+
+
+class FakeClient:
+    """按调用顺序返回已选人数 1, 2, 3...；on_get 在请求途中调用"""
+
+    def __init__(self, on_get=None):
+        self.paths = []
+        self.on_get = on_get
+
+    async def get(self, path, headers=None):
+        self.paths.append(path)
+        if self.on_get is not None:
+            self.on_get(len(self.paths))
+        await asyncio.sleep(0.01)
+        body = json.dumps({'enrolled': len(self.paths), 'capacity': 100}).encode('utf-8')
+        return ClientResponse(200, {}, body)
+
+    async def close(self):
+        pass
+
+
+def make_engine(client):
+    return MonitorEngine('http://stub', poll_interval=POLL_INTERVAL, rate_limit=0, client=client, seed=1)
+
+
+def scheduled(engine, course_code):
+    return [entry for entry in engine._heap if entry[2] == course_code]
+
+
+def test_rewatch_drops_the_stale_heap_entry():
+    client = FakeClient()
+    engine = make_engine(client)
+    engine.watch('A', delay=0)
+    engine.unwatch('A')
+    engine.watch('A', delay=0)
+    assert len(scheduled(engine, 'A')) == 2
+
+    asyncio.run(engine.run(duration=0.2))
+    assert client.paths == ['/enrollment/A']
+    assert len(scheduled(engine, 'A')) == 1
+
+
+def test_rewatch_during_a_poll_does_not_start_a_second_chain():
+    engine = None
+
+    def rewatch(calls):
+        if calls == 1:
+            engine.unwatch('A')
+            engine.watch('A', delay=0)
+
+    client = FakeClient(rewatch)
+    engine = make_engine(client)
+    engine.watch('A', delay=0)
+
+    asyncio.run(engine.run(duration=0.2))
+    # 旧轮询结束后不再续排，只有新的 watch 留在堆中
+    assert client.paths == ['/enrollment/A', '/enrollment/A']
+    assert len(scheduled(engine, 'A')) == 1
+    assert engine.snapshot('A')['enrolled'] == 2
+
+
+def test_unwatch_stops_polling():
+    client = FakeClient()
+    engine = make_engine(client)
+    engine.watch('A', delay=0)
+    engine.watch('B', delay=0)
+    engine.unwatch('A')
+
+    asyncio.run(engine.run(duration=0.2))
+    assert client.paths == ['/enrollment/B']
+    assert engine.watchlist == ['B']
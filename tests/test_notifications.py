@@ -0,0 +1,105 @@
+"""变化通知：去重窗口、合并和净零变化"""
+
+import asyncio
+
+from monitor.engine import ChangeEvent
+from monitor.notifications import CallbackSink, NotificationPipeline, _SinkWorker
+
+
+def make_pipeline(dedupe_window=60.0, batch_window=60.0):
+    """批次窗口很长，测试中手动调用 _dispatch 分发"""
+    batches = []
+    sink = CallbackSink(lambda events: batches.append([(e.course_code, e.field, e.old, e.new) for e in events]),
+                        'cb')
+    pipeline = NotificationPipeline([sink], dedupe_window=dedupe_window, batch_window=batch_window,
+                                    rate_limits={'cb': 1000.0})
+    return pipeline, batches
+
+
+async def settle(pipeline):
+    await asyncio.wait_for(asyncio.gather(*(worker.idle.wait() for worker in pipeline.workers)), 2)
+
+
+def test_changes_in_one_window_merge_into_one_notification():
+    async def scenario():
+        pipeline, batches = make_pipeline()
+        await pipeline.start()
+        pipeline.consume(ChangeEvent('A', 'enrolled', 10, 11))
+        pipeline.consume(ChangeEvent('B', 'room', '101', '102'))
+        pipeline.consume(ChangeEvent('A', 'enrolled', 11, 14))
+        pipeline._dispatch()
+        await settle(pipeline)
+        await pipeline.close()
+        return pipeline, batches
+
+    pipeline, batches = asyncio.run(scenario())
+    assert batches == [[('A', 'enrolled', 10, 14), ('B', 'room', '101', '102')]]
+    assert pipeline.received == 3
+
+
+def test_reverted_changes_are_dropped():
+    async def scenario():
+        pipeline, batches = make_pipeline()
+        await pipeline.start()
+        pipeline.consume(ChangeEvent('A', 'enrolled', 10, 11))
+        pipeline.consume(ChangeEvent('A', 'enrolled', 11, 10))
+        pipeline._dispatch()
+        await pipeline.close()
+        return pipeline, batches
+
+    pipeline, batches = asyncio.run(scenario())
+    assert batches == []
+    assert pipeline.dropped == 1
+
+
+def test_dedupe_window_holds_later_changes_until_it_expires():
+    async def scenario():
+        pipeline, batches = make_pipeline(dedupe_window=0.2)
+        await pipeline.start()
+        pipeline.consume(ChangeEvent('A', 'enrolled', 10, 11))
+        pipeline._dispatch()
+        await settle(pipeline)
+
+        # 窗口内的后续变化不单独通知，合并后在窗口结束时发出
+        pipeline.consume(ChangeEvent('A', 'enrolled', 11, 12))
+        pipeline.consume(ChangeEvent('A', 'enrolled', 12, 13))
+        pipeline._dispatch()
+        await settle(pipeline)
+        held = list(batches)
+
+        await asyncio.sleep(0.25)
+        pipeline._dispatch()
+        await settle(pipeline)
+        await pipeline.close()
+        return held, batches
+
+    held, batches = asyncio.run(scenario())
+    assert held == [[('A', 'enrolled', 10, 11)]]
+    assert batches == [[('A', 'enrolled', 10, 11)], [('A', 'enrolled', 11, 13)]]
+
+
+def test_close_drains_changes_held_by_the_dedupe_window():
+    async def scenario():
+        pipeline, batches = make_pipeline()
+        await pipeline.start()
+        pipeline.consume(ChangeEvent('A', 'enrolled', 10, 11))
+        pipeline._dispatch()
+        await settle(pipeline)
+        pipeline.consume(ChangeEvent('A', 'enrolled', 11, 12))
+        await pipeline.close()
+        return batches
+
+    assert asyncio.run(scenario()) == [[('A', 'enrolled', 10, 11)], [('A', 'enrolled', 11, 12)]]
+
+
+def test_sink_worker_merges_events_waiting_for_the_rate_limit():
+    async def scenario():
+        worker = _SinkWorker(CallbackSink(lambda events: None), rate=1000.0, max_batch=10)
+        key = ('A', 'enrolled')
+        worker.put([(key, [ChangeEvent('A', 'enrolled', 10, 11), 1.0])])
+        worker.put([(key, [ChangeEvent('A', 'enrolled', 11, 12), 0.5])])
+        return worker.pending[key]
+
+    event, received = asyncio.run(scenario())
+    assert (event.old, event.new) == (10, 12)
+    assert received == 0.5
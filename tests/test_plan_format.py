@@ -0,0 +1,117 @@
+"""选课方案文件：序列化往返、旧版本兼容和按当前目录恢复"""
+
+import json
+import os
+
+import pytest
+
+from database import CourseDatabase
+from export import plan_format
+from export.plan_format import PlanFormatError, dumps_plan, loads_plan, restore_plan
+from planner import custom_course_id, custom_course_index
+
+from conftest import BUNDLED_DB
+
+# 空值字段（code、hours 除外）在保存时省略，这里只用往返后结构不变的字段
+CUSTOM_COURSES = [
+    {
+        'name': '组会', 'code': '', 'credits': 1, 'hours': '',
+        'schedules': [{'weekday': '周二', 'weekday_num': 2, 'time_slots': '3-4',
+                       'location': '', 'weeks': '1-16'}],
+    },
+    {
+        'name': '助教', 'code': 'TA', 'credits': 2, 'hours': '32', 'teacher': '张老师',
+        'schedules': [{'weekday': '周五', 'weekday_num': 5, 'time_slots': '9-10',
+                       'location': '教一楼', 'weeks': ''}],
+    },
+]
+
+
+@pytest.fixture(scope='module')
+def db():
+    if not os.path.exists(BUNDLED_DB):
+        pytest.skip(f"{BUNDLED_DB} not found")
+    database = CourseDatabase(BUNDLED_DB, enable_cache=False)
+    yield database
+    database.close()
+
+
+def test_custom_course_id_helpers_are_inverse():
+    for index in range(5):
+        course_id = custom_course_id(index)
+        assert course_id < 0
+        assert custom_course_index(course_id) == index
+
+
+def test_round_trip_keeps_mixed_selection_order():
+    selected_ids = [12, custom_course_id(1), 57, custom_course_id(0), 301]
+    plan = loads_plan(dumps_plan(selected_ids, CUSTOM_COURSES, '2025秋季', 'abc'))
+
+    assert plan['version'] == plan_format.PLAN_FORMAT_VERSION
+    assert plan['semester'] == '2025秋季'
+    assert plan['catalog'] == 'abc'
+    assert plan['selected_ids'] == selected_ids
+    assert plan['course_ids'] == [12, 57, 301]
+    assert plan['custom_courses'] == CUSTOM_COURSES
+
+
+def test_empty_fields_are_omitted():
+    data = json.loads(dumps_plan([custom_course_id(0)], CUSTOM_COURSES[:1]))
+    assert data == {
+        'v': plan_format.PLAN_FORMAT_VERSION,
+        'ids': [-1],
+        'custom': [{'name': '组会', 'credits': 1,
+                    'schedules': [{'weekday_num': 2, 'time_slots': '3-4', 'weeks': '1-16'}]}],
+    }
+
+
+def test_version_1_puts_selected_custom_courses_last():
+    payload = json.dumps({'v': 1, 'ids': [12, 57], 'custom': [{'name': '组会'}, {'name': '助教'}],
+                          'csel': [1]})
+    plan = loads_plan(payload)
+    assert plan['selected_ids'] == [12, 57, custom_course_id(1)]
+
+
+def test_ids_of_missing_custom_courses_are_dropped():
+    plan = loads_plan(json.dumps({'v': 2, 'ids': [-1, 12, -3], 'custom': [{'name': '组会'}]}))
+    assert plan['selected_ids'] == [custom_course_id(0), 12]
+
+
+@pytest.mark.parametrize('payload', [
+    b'not json',
+    b'[1, 2]',
+    json.dumps({'v': plan_format.PLAN_FORMAT_VERSION + 1, 'ids': []}),
+    json.dumps({'v': 2, 'ids': ['x']}),
+])
+def test_invalid_payloads_raise(payload):
+    with pytest.raises(PlanFormatError):
+        loads_plan(payload)
+
+
+def test_restore_keeps_order_and_skips_missing_courses(db):
+    names = {row[0]: row[1] for row in db.get_courses_by_ids([1, 2, 3])}
+    missing = 10 ** 9
+    selected_ids = [3, custom_course_id(1), missing, 1, custom_course_id(0), 2, 3]
+    plan = loads_plan(dumps_plan(selected_ids, CUSTOM_COURSES, catalog_fingerprint=db.get_catalog_fingerprint()))
+
+    result = restore_plan(db, plan)
+    assert result['selected_courses'] == [
+        (3, names[3]), (custom_course_id(1), '助教'), (1, names[1]),
+        (custom_course_id(0), '组会'), (2, names[2]),
+    ]
+    assert result['missing_ids'] == [missing]
+    assert result['catalog_matches'] is True
+    assert result['custom_courses'] == CUSTOM_COURSES
+
+
+def test_restore_reports_changed_catalog(db):
+    plan = loads_plan(dumps_plan([1], catalog_fingerprint='other'))
+    assert restore_plan(db, plan)['catalog_matches'] is False
+
+
+def test_save_and_load_file(tmp_path):
+    file_path = tmp_path / f"plan{plan_format.PLAN_FILE_SUFFIX}"
+    selected_ids = [custom_course_id(0), 42]
+    size = plan_format.save_plan(file_path, selected_ids, CUSTOM_COURSES[:1], '2025秋季')
+    assert size == file_path.stat().st_size
+    assert plan_format.load_plan(file_path)['selected_ids'] == selected_ids
@@ -0,0 +1,66 @@
+"""查询结果缓存：命中时共享只读结果、内存估算和淘汰"""
+
+import os
+import sys
+
+import pytest
+
+from database import CourseDatabase, QueryCache
+from database.query_cache import SIZE_SAMPLE, _estimate_size
+
+from conftest import BUNDLED_DB
+
+
+def test_hit_returns_the_cached_object_without_copying():
+    cache = QueryCache()
+    stored = cache.put('k', [(1, 'a'), (2, 'b')])
+    assert stored == ((1, 'a'), (2, 'b'))
+
+    hit, value = cache.get('k')
+    assert hit
+    assert value is stored
+    assert cache.get('k')[1] is stored
+
+
+def test_nested_lists_become_tuples():
+    stored = QueryCache().put('k', [{'id': 1, 'schedules': [{'day_of_week': 1}]}])
+    assert isinstance(stored, tuple)
+    assert isinstance(stored[0]['schedules'], tuple)
+
+
+def test_size_estimate_covers_every_short_row():
+    rows = [(1, 'a'), (2, 'x' * 1000)]
+    assert _estimate_size(rows) >= sys.getsizeof('x' * 1000)
+
+
+def test_size_estimate_samples_long_results():
+    short = [(i, 'a') for i in range(SIZE_SAMPLE * 10)]
+    # 第一行很短、其余很长：只看第一行会严重低估
+    long = [(0, 'a')] + [(i, 'x' * 200) for i in range(1, SIZE_SAMPLE * 10)]
+    estimate = _estimate_size(long)
+    assert estimate > _estimate_size(short) + 150 * len(long)
+    assert estimate < _estimate_size(short) + 250 * len(long)
+
+
+def test_entries_are_evicted_over_the_memory_limit():
+    row = (1, 'x' * 100)
+    cache = QueryCache(max_bytes=_estimate_size((row,)) * 2 + 10)
+    for key in range(3):
+        cache.put(key, [row])
+    assert cache.get(0) == (False, None)
+    assert cache.get(2)[0]
+    assert cache.evictions == 1
+
+
+def test_cached_database_returns_the_same_tuple_on_miss_and_hit():
+    if not os.path.exists(BUNDLED_DB):
+        pytest.skip(f"{BUNDLED_DB} not found")
+    db = CourseDatabase(BUNDLED_DB)
+    try:
+        first = db.get_all_courses()
+        second = db.get_all_courses()
+        assert isinstance(first, tuple)
+        assert second is first
+        assert db.cache.hits == 1
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+"""CourseDatabase 的查询计划和课程库迁移"""
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from database import CourseDatabase
+from database.course_db import CATALOG_SCHEMA_VERSION, get_catalog_version, migrate_catalog
+from database.query_plan import (COVERING_SCANS, QUERY_PLAN_CASES, check_query_plans,
+                                 find_plan_problems, find_unregistered_methods, migrated_catalog)
+
+from conftest import BUNDLED_DB
+
+
+@pytest.fixture
+def catalog_copy(tmp_path):
+    """仓库自带课程库的可写副本"""
+    if not os.path.exists(BUNDLED_DB):
+        pytest.skip(f"{BUNDLED_DB} not found")
+    path = tmp_path / os.path.basename(BUNDLED_DB)
+    shutil.copyfile(BUNDLED_DB, path)
+    return str(path)
+
+
+@pytest.fixture
+def migrated_db(catalog_copy):
+    conn = sqlite3.connect(catalog_copy)
+    migrate_catalog(conn)
+    conn.close()
+    db = CourseDatabase(catalog_copy, enable_cache=False)
+    yield db
+    db.close()
+
+
+def test_migrated_catalog_passes(migrated_db):
+    assert check_query_plans(migrated_db) == []
+
+
+def test_unmigrated_catalog_fails(catalog_copy):
+    db = CourseDatabase(catalog_copy, enable_cache=False)
+    try:
+        failures = check_query_plans(db)
+    finally:
+        db.close()
+    assert failures, "没有覆盖索引时整体扫描会回表，检查应当失败"
+
+
+def test_every_query_method_is_registered():
+    assert find_unregistered_methods() == []
+
+
+def test_allow_list_is_limited_to_whole_table_queries():
+    registered = {name for name, _ in QUERY_PLAN_CASES}
+    for method, (indexes, reason) in COVERING_SCANS.items():
+        assert method in registered
+        assert indexes and reason
+    for method in ('get_course_schedules', 'get_courses_by_ids', 'get_selected_courses_with_schedules'):
+        assert method not in COVERING_SCANS
+
+
+@pytest.mark.parametrize('plan, allowed, expected', [
+    (['SEARCH c USING INTEGER PRIMARY KEY (rowid=?)'], (), 0),
+    (['SEARCH cs USING COVERING INDEX idx_course_schedules_cover (course_id=?)'], (), 0),
+    (['SCAN c USING COVERING INDEX idx_courses_name_cover'], {'idx_courses_name_cover'}, 0),
+    (['SCAN c USING COVERING INDEX idx_courses_name_cover'], (), 1),
+    (['SCAN c USING INDEX idx_courses_name'], {'idx_courses_name'}, 1),
+    (['SCAN c'], {'idx_courses_name_cover'}, 1),
+    (['SEARCH c USING INDEX idx_courses_code (course_code=?)', 'USE TEMP B-TREE FOR ORDER BY'], (), 1),
+    (['SCAN CONSTANT ROW'], (), 0),
+])
+def test_find_plan_problems(plan, allowed, expected):
+    assert len(find_plan_problems(plan, allowed)) == expected
+
+
+def _file_state(path):
+    with open(path, 'rb') as f:
+        return os.path.getsize(path), f.read()
+
+
+def test_opening_a_catalog_does_not_write(catalog_copy):
+    before = _file_state(catalog_copy)
+    db = CourseDatabase(catalog_copy)
+    db.get_all_courses()
+    db.get_course_schedules(1)
+    db.close()
+    assert _file_state(catalog_copy) == before
+
+
+def test_migrate_catalog_is_one_time(catalog_copy):
+    conn = sqlite3.connect(catalog_copy)
+    try:
+        assert get_catalog_version(conn) == 0
+        assert migrate_catalog(conn) is True
+        assert get_catalog_version(conn) == CATALOG_SCHEMA_VERSION
+        assert migrate_catalog(conn) is False
+        indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+    assert {'idx_courses_name_cover', 'idx_course_schedules_cover'} <= indexes
+    assert 'idx_courses_name' not in indexes
+
+
+def test_plan_check_leaves_bundled_catalog_untouched(catalog_copy):
+    before = _file_state(catalog_copy)
+    with migrated_catalog(catalog_copy) as checked_path:
+        assert checked_path != catalog_copy
+    assert _file_state(catalog_copy) == before
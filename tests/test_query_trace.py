@@ -0,0 +1,53 @@
+"""SQL调用追踪：traced_action 的操作栈"""
+
+import threading
+
+import pytest
+
+from database import current_actions, traced_action
+from database import query_trace
+
+
+class Window:
+    db = None
+
+    def __init__(self):
+        self.seen = []
+
+    @traced_action('outer')
+    def outer(self):
+        self.seen.append(current_actions())
+        self.inner()
+
+    @traced_action('inner')
+    def inner(self):
+        self.seen.append(current_actions())
+
+    @traced_action('failing')
+    def failing(self):
+        raise RuntimeError("boom")
+
+
+def test_nested_actions_are_reported_outermost_first():
+    window = Window()
+    window.outer()
+    assert window.seen == [['outer'], ['outer', 'inner']]
+    assert current_actions() == []
+
+
+def test_finished_threads_leave_no_entry():
+    window = Window()
+    threads = [threading.Thread(target=window.outer) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(window.seen) == 40
+    assert threading.get_ident() not in query_trace._active_actions
+    assert not any(thread.ident in query_trace._active_actions for thread in threads)
+
+
+def test_stack_is_pruned_when_an_action_raises():
+    with pytest.raises(RuntimeError):
+        Window().failing()
+    assert threading.get_ident() not in query_trace._active_actions
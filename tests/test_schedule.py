@@ -0,0 +1,83 @@
+"""planner.schedule 的节次、周次解析和占用位图"""
+
+import pytest
+
+from config import TIME_SLOTS
+from planner.schedule import (SLOT_COUNT, BITS_PER_WEEK, DEFAULT_TEACHING_WEEKS, parse_weeks,
+                              parse_slots, schedule_weeks, schedule_mask, iter_occupied)
+from utils import TimeConflictChecker
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2、3、4', [2, 3, 4]),
+    ('1-16', list(range(1, 17))),
+    ('1-8,10-16', [*range(1, 9), *range(10, 17)]),
+    ('16-1', list(range(1, 17))),
+    ('3、1、3', [1, 3]),
+    ('1～3、5', [1, 2, 3, 5]),
+    ('0、1', [1]),
+    ('', []),
+    (None, []),
+])
+def test_parse_weeks(text, expected):
+    assert parse_weeks(text) == expected
+
+
+def test_parse_weeks_returns_a_fresh_list():
+    weeks = parse_weeks('1-3')
+    weeks.append(99)
+    assert parse_weeks('1-3') == [1, 2, 3]
+
+
+def test_schedule_weeks_defaults_to_whole_term():
+    assert schedule_weeks('') == list(range(1, DEFAULT_TEACHING_WEEKS + 1))
+    assert schedule_weeks('5') == [5]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1、2', [1, 2]),
+    ('7、8、9', [7, 8, 9]),
+    ('11、12、13', [11, 12, 13]),
+    ('3', [3]),
+    ('', []),
+    (None, []),
+    ('无', []),
+    ('08:00-09:50', [1, 2]),
+    ('22:10-23:10', [12, 13]),
+])
+def test_parse_slots(text, expected):
+    assert parse_slots(text) == expected
+
+
+def test_grid_covers_configured_slots():
+    assert SLOT_COUNT == max(TIME_SLOTS)
+    assert sorted(TIME_SLOTS) == list(range(1, SLOT_COUNT + 1))
+
+
+def test_catalog_slots_fit_in_grid(bundled_conn):
+    rows = bundled_conn.execute("SELECT DISTINCT time_slots FROM course_schedules").fetchall()
+    slots = {slot for (text,) in rows for slot in parse_slots(text)}
+    assert slots and max(slots) <= SLOT_COUNT
+
+
+def test_mask_round_trip():
+    mask = schedule_mask(('3', '12、13', '', '2、4', ''))
+    assert sorted(iter_occupied(mask)) == [(2, 3, 12), (2, 3, 13), (4, 3, 12), (4, 3, 13)]
+    assert mask.bit_length() <= 4 * BITS_PER_WEEK
+
+
+def test_evening_slots_do_not_spill_into_next_day():
+    late = ('1', '13', '', '1', '')
+    next_morning = ('2', '1', '', '1', '')
+    assert schedule_mask(late) & schedule_mask(next_morning) == 0
+
+
+@pytest.mark.parametrize('first, second', [
+    (('1', '11、12、13', '', '1-16', ''), ('1', '12、13', '', '16', '')),
+    (('2', '1、2', '', '1-8', ''), ('2', '2、3', '', '9-16', '')),
+    (('2', '1、2', '', '', ''), ('2', '2', '', '20', '')),
+    (('4', '5、6', '', '1、3、5', ''), ('5', '5、6', '', '1、3、5', '')),
+])
+def test_mask_agrees_with_checker(first, second):
+    by_mask = bool(schedule_mask(first) & schedule_mask(second))
+    assert by_mask == TimeConflictChecker.check_conflict(first, second)
@@ -0,0 +1,75 @@
+"""学期课程库：目录发现和学期开始日期"""
+
+import os
+import shutil
+
+import pytest
+
+import config
+from database import CourseDatabase
+from database.migrate_catalogs import main as migrate_main
+from export.schedule_exporter import ScheduleExporter
+
+from conftest import BUNDLED_DB
+
+
+@pytest.fixture
+def catalog_dir(tmp_path, monkeypatch):
+    """只包含一个 2026春季 学期库（没有配置开始日期）的学期库目录"""
+    if not os.path.exists(BUNDLED_DB):
+        pytest.skip(f"{BUNDLED_DB} not found")
+    directory = tmp_path / 'catalogs'
+    directory.mkdir()
+    shutil.copyfile(BUNDLED_DB, directory / '2026春季.db')
+    monkeypatch.setattr(config, 'SEMESTER_CATALOG_DIR', str(directory))
+    return directory
+
+
+def test_discovered_catalog_has_no_configured_start_date(catalog_dir):
+    catalogs = config.get_semester_catalogs()
+    assert catalogs['2026春季']['start_date'] is None
+    assert catalogs[config.DEFAULT_SEMESTER]['start_date'] == config.SEMESTER_START_DATE
+
+
+def test_unknown_start_date_is_not_borrowed(catalog_dir):
+    db = CourseDatabase(BUNDLED_DB, semester='2026春季')
+    try:
+        assert db.get_semester_start_date() is None
+        assert db.get_semester_start_date(config.DEFAULT_SEMESTER) == config.SEMESTER_START_DATE
+    finally:
+        db.close()
+
+
+def test_start_date_recorded_in_catalog(catalog_dir, capsys):
+    path = str(catalog_dir / '2026春季.db')
+    assert migrate_main(['--start-date', '2026-02-23', path]) == 0
+    capsys.readouterr()
+
+    db = CourseDatabase(BUNDLED_DB, semester=config.DEFAULT_SEMESTER)
+    try:
+        # 未挂载的学期库以只读方式读取
+        assert db.get_semester_start_date('2026春季') == '2026-02-23'
+        db.set_semester('2026春季')
+        assert db.get_semester_start_date() == '2026-02-23'
+    finally:
+        db.close()
+
+    # 没有选择学期时按 db_path 本身查找
+    db = CourseDatabase(path)
+    try:
+        assert db.get_semester_start_date() == '2026-02-23'
+    finally:
+        db.close()
+
+
+def test_start_date_requires_a_valid_date(catalog_dir):
+    with pytest.raises(SystemExit):
+        migrate_main(['--start-date', '2026-13-01', str(catalog_dir / '2026春季.db')])
+    with pytest.raises(SystemExit):
+        migrate_main(['--start-date', '2026-02-23'])
+
+
+def test_ics_export_refuses_unknown_start_date(tmp_path):
+    path = tmp_path / 'plan.ics'
+    assert ScheduleExporter().export_to_ics([], str(path), semester_start_date=None) is False
+    assert not path.exists()
@@ -0,0 +1,72 @@
+"""界面线程卡顿监视器：卡顿记录由后台线程写入日志文件"""
+
+import os
+import json
+import time
+import threading
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+QApplication = pytest.importorskip('PyQt5.QtWidgets').QApplication
+
+from database import traced_action
+from ui.stall_watchdog import StallWatchdog
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_gui_thread_does_not_write_the_stall_log(app, tmp_path, monkeypatch):
+    log_path = tmp_path / 'stalls.jsonl'
+    watchdog = StallWatchdog(threshold_ms=20, log_path=str(log_path))
+    writers = []
+    write_records = watchdog._write_records
+
+    def record_writer():
+        writers.append(threading.current_thread().name)
+        write_records()
+
+    monkeypatch.setattr(watchdog, '_write_records', record_writer)
+    watchdog.start()
+
+    class Window:
+        @traced_action('slow_slot')
+        def slow_slot(self):
+            time.sleep(0.2)
+
+    Window().slow_slot()
+    deadline = time.monotonic() + 2
+    while watchdog.stall_count == 0 and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    # 卡顿结束后的第一次心跳只把记录放入队列
+    assert watchdog.stall_count == 1
+    deadline = time.monotonic() + 2
+    while not log_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    watchdog.stop()
+
+    records = read_records(log_path)
+    assert len(records) == 1
+    assert records[0]['actions'] == ['slow_slot']
+    assert records[0]['duration_ms'] >= 150
+    assert writers and set(writers[:-1]) <= {'stall-watchdog'}
+
+
+def test_stop_writes_pending_records(app, tmp_path):
+    log_path = tmp_path / 'stalls.jsonl'
+    watchdog = StallWatchdog(threshold_ms=20, log_path=str(log_path))
+    watchdog._finish_stall({'started': time.monotonic(), 'actions': ['add_course'], 'stack': []}, 0.1)
+    assert not log_path.exists()
+
+    watchdog.stop()
+    assert read_records(log_path)[0]['actions'] == ['add_course']
@@ -0,0 +1,208 @@
+"""
+数据库工作线程
+在独立线程中执行 CourseDatabase 请求，结果通过Qt信号回到界面线程，
+避免慢速磁盘（如网络主目录）上的查询卡住窗口
+"""
+
+import sys
+import os
+import threading
+import itertools
+from collections import deque
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import CourseDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    """一个排队中的数据库请求"""
+
+    __slots__ = ('request_id', 'target', 'args', 'action')
+
+    def __init__(self, request_id, target, args, action):
+        self.request_id = request_id
+        self.target = target
+        self.args = args
+        self.action = action
+
+
+class DatabaseWorker(QThread):
+    """
+    数据库工作线程
+
+    工作线程持有程序唯一的 CourseDatabase 连接（在工作线程中打开，sqlite连接不能跨线程共享），
+    界面线程不访问数据库文件。请求按提交顺序执行。带相同coalesce_key的新请求会取消尚未送达的旧请求，
+    例如连续输入搜索词时只有最后一次搜索的结果会回调。
+
+    工作线程打开数据库失败时，已排队和之后提交的请求都以该错误失败（error_callback），
+    open_error 记录错误信息。
+    """
+
+    # (请求ID, 结果)
+    result_ready = pyqtSignal(int, object)
+    # (请求ID, 错误信息)
+    request_failed = pyqtSignal(int, str)
+
+    def __init__(self, db_path, semester=None, tracer=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.semester = semester
+        self.tracer = tracer  # 工作线程连接专用的SQL追踪器（可选）
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._running = True
+        self._ids = itertools.count(1)
+        self.open_error = None  # 工作线程打开数据库失败时的错误信息
+
+        # 以下状态只在界面线程中访问
+        self._callbacks = {}  # 请求ID -> (callback, error_callback)
+        self._coalesced = {}  # coalesce_key -> 请求ID
+        self._cancelled = set()
+
+        # 信号在工作线程发出，由本对象（位于界面线程）的槽接收，Qt自动使用队列连接
+        self.result_ready.connect(self._on_result_ready)
+        self.request_failed.connect(self._on_request_failed)
+
+    def submit(self, target, *args, callback=None, error_callback=None, coalesce_key=None,
+               action=None):
+        """
+        提交请求
+
+        Args:
+            target: CourseDatabase的方法名，或签名为 func(db, *args) 的可调用对象
+            callback: 成功时在界面线程调用 callback(result)
+            error_callback: 失败时在界面线程调用 error_callback(message)
+            coalesce_key: 合并键，同键的旧请求会被取消
+            action: 启用SQL追踪时，该请求的语句归属的操作名
+
+        Returns:
+            int: 请求ID，可用于 cancel()
+        """
+        request_id = next(self._ids)
+
+        if coalesce_key is not None:
+            previous = self._coalesced.get(coalesce_key)
+            if previous is not None:
+                self.cancel(previous)
+            self._coalesced[coalesce_key] = request_id
+
+        self._callbacks[request_id] = (callback, error_callback)
+        with self._condition:
+            if self.open_error is None:
+                self._queue.append(_Request(request_id, target, args, action or 'worker'))
+                self._condition.notify()
+                return request_id
+        # 数据库无法打开，不再接受请求；与正常结果一样在下一轮事件循环中回调
+        message = self.open_error
+        QTimer.singleShot(0, lambda: self._on_request_failed(request_id, message))
+        return request_id
+
+    def pending_count(self):
+        """已提交但结果（或错误）尚未回调的请求数，只在界面线程中调用"""
+        return len(self._callbacks)
+
+    def cancel(self, request_id):
+        """取消请求：尚未执行的直接移出队列，执行中的丢弃其结果"""
+        if request_id not in self._callbacks:
+            return
+        with self._condition:
+            for request in self._queue:
+                if request.request_id == request_id:
+                    self._queue.remove(request)
+                    break
+            else:
+                self._cancelled.add(request_id)
+        self._forget(request_id)
+
+    def set_semester(self, semester, error_callback=None):
+        """切换工作线程连接的学期（ATTACH学期库），排在之后的请求都在新学期上执行"""
+        self.semester = semester
+        return self.submit(lambda db: db.set_semester(semester), error_callback=error_callback,
+                           coalesce_key='semester', action='semester_change')
+
+    def stop(self):
+        """停止工作线程并等待其退出"""
+        with self._condition:
+            self._running = False
+            self._queue.clear()
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        db = self._open_database()
+        if db is None:
+            return
+        try:
+            while True:
+                with self._condition:
+                    while self._running and not self._queue:
+                        self._condition.wait()
+                    if not self._running:
+                        break
+                    request = self._queue.popleft()
+
+                try:
+                    with db.trace_action(request.action):
+                        if callable(request.target):
+                            result = request.target(db, *request.args)
+                        else:
+                            result = getattr(db, request.target)(*request.args)
+                except Exception as e:
+                    logger.error(f"Database request {request.request_id} failed: {e}")
+                    self.request_failed.emit(request.request_id, str(e))
+                else:
+                    self.result_ready.emit(request.request_id, result)
+        finally:
+            db.close()
+
+    def _open_database(self):
+        """打开工作线程的连接；失败时让已排队的请求失败，之后的请求由 submit 直接拒绝"""
+        db = None
+        try:
+            db = CourseDatabase(self.db_path, semester=self.semester)
+            if self.tracer is not None:
+                db.enable_tracing(self.tracer)
+            # 连接是惰性创建的，这里确认数据库确实可读
+            db.get_data_version()
+            return db
+        except Exception as e:
+            logger.error(f"Database worker failed to open {self.db_path}: {e}")
+            if db is not None:
+                db.close()
+            with self._condition:
+                self.open_error = str(e) or type(e).__name__
+                pending = list(self._queue)
+                self._queue.clear()
+            for request in pending:
+                self.request_failed.emit(request.request_id, self.open_error)
+            return None
+
+    def _forget(self, request_id):
+        self._callbacks.pop(request_id, None)
+        for key, pending_id in list(self._coalesced.items()):
+            if pending_id == request_id:
+                del self._coalesced[key]
+
+    def _take_callbacks(self, request_id):
+        if request_id in self._cancelled:
+            self._cancelled.discard(request_id)
+            return None
+        callbacks = self._callbacks.get(request_id)
+        self._forget(request_id)
+        return callbacks
+
+    def _on_result_ready(self, request_id, result):
+        callbacks = self._take_callbacks(request_id)
+        if callbacks and callbacks[0]:
+            callbacks[0](result)
+
+    def _on_request_failed(self, request_id, message):
+        callbacks = self._take_callbacks(request_id)
+        if callbacks and callbacks[1]:
+            callbacks[1](message)
@@ -9,7 +9,8 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                            QTableWidget, QTableWidgetItem, QPushButton,
                            QLineEdit, QLabel, QTextEdit, QSplitter,
                            QHeaderView, QMessageBox, QTabWidget, QGroupBox,
-                           QListWidget, QListWidgetItem, QFileDialog)
+                           QListWidget, QListWidgetItem, QFileDialog, QComboBox,
+                           QProgressBar)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor
 import logging
@@ -17,10 +18,14 @@ import logging
 # 导入模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import CourseDatabase
-from utils import TimeConflictChecker
+from config import (DATABASE_PATH, DEFAULT_SEMESTER, SQL_TRACE_ENABLED, SQL_TRACE_LOG,
+                    STALL_WATCHDOG_ENABLED, STALL_WATCHDOG_THRESHOLD_MS, STALL_WATCHDOG_LOG)
+from database import QueryTracer, traced_action
+from planner import Selection, SnapshotCatalog, CatalogSnapshot, compute_statistics, custom_course_id
 from widgets import MonthViewWidget, WeekViewWidget, DayViewWidget, StatisticsWidget, CustomCourseDialog
 from export import ScheduleExporter
+from export import plan_format
+from .db_worker import DatabaseWorker
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +33,68 @@ logger = logging.getLogger(__name__)
 class CourseSelectionMainWindow(QMainWindow):
     """课程选择主窗口"""
     
-    def __init__(self):
+    def __init__(self, startup_profiler=None, stall_threshold_ms=None):
         super().__init__()
-        self.db = CourseDatabase()
-        self.selected_courses = []
-        self.custom_courses = []  # 存储自定义课程
-        self.conflict_checker = TimeConflictChecker()
+        self.startup_profiler = startup_profiler
+        # 卡顿监视（可选）：stall_threshold_ms 未指定时按 config.STALL_WATCHDOG_* 决定是否启用
+        self.stall_watchdog = None
+        if stall_threshold_ms is None and STALL_WATCHDOG_ENABLED:
+            stall_threshold_ms = STALL_WATCHDOG_THRESHOLD_MS
+        if stall_threshold_ms:
+            from .stall_watchdog import StallWatchdog
+            self.stall_watchdog = StallWatchdog(stall_threshold_ms, STALL_WATCHDOG_LOG, parent=self).start()
+        # 数据库连接只在工作线程中打开和使用（包括学期库的ATTACH），界面线程不访问数据库文件:
+        # 课程列表、搜索、统计和导出提交给 db_worker，添加课程、冲突检查和视图刷新
+        # 使用工作线程加载的课程目录快照（每个学期加载一次）
+        self.semester = DEFAULT_SEMESTER
+        self.available_semesters = [DEFAULT_SEMESTER]
+        self.db_worker = DatabaseWorker(
+            DATABASE_PATH, semester=DEFAULT_SEMESTER,
+            tracer=QueryTracer(log_path=SQL_TRACE_LOG) if SQL_TRACE_ENABLED else None
+        )
+        self.db_worker.start()
+        self.all_courses = []  # 最近一次加载的完整课程目录
+        self.catalog_snapshot = None  # 当前学期的课程目录快照，加载完成前为None
+        self.semester_start_date = None  # 当前学期的开始日期，随快照一起加载
+        # 已选课程、自定义课程和冲突跟踪（与界面无关的选课核心）
+        self.catalog = SnapshotCatalog(CatalogSnapshot([], semester=self.semester))
+        self.selection = Selection(self.catalog)
         self.schedule_exporter = ScheduleExporter()
         
         self.init_ui()
+        
+        # 窗口外壳先显示，课程目录、时间安排快照和数据库统计在后台加载
+        self.show_loading("正在加载课程目录...")
         self.load_courses()
+        self.load_catalog_snapshot()
+        self.load_db_statistics()
+        self.db_worker.submit(
+            'get_available_semesters',
+            callback=self.on_semesters_loaded,
+            action='load_semesters'
+        )
+        if self.startup_profiler is not None:
+            QTimer.singleShot(0, lambda: self.startup_profiler.mark("first_event_loop_turn"))
+    
+    @property
+    def selected_courses(self):
+        """已选课程 [(课程ID, 课程名)]"""
+        return self.selection.items
+    
+    @property
+    def custom_courses(self):
+        """自定义课程"""
+        return self.selection.custom_courses
+    
+    def show_loading(self, message):
+        """在状态栏显示加载进度"""
+        self.statusBar().showMessage(message)
+        self.loading_bar.show()
+    
+    def hide_loading(self, message="就绪"):
+        """隐藏加载进度"""
+        self.loading_bar.hide()
+        self.statusBar().showMessage(message, 3000)
     
     def init_ui(self):
         """初始化UI"""
@@ -146,6 +203,13 @@ class CourseSelectionMainWindow(QMainWindow):
         
         # 设置分割器比例
         splitter.setSizes([450, 900, 450])
+        
+        # 状态栏加载进度（不确定进度的忙碌指示）
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)
+        self.loading_bar.setMaximumWidth(200)
+        self.loading_bar.hide()
+        self.statusBar().addPermanentWidget(self.loading_bar)
     
     def create_left_panel(self):
         """创建左侧面板"""
@@ -156,6 +220,17 @@ class CourseSelectionMainWindow(QMainWindow):
         search_group = QGroupBox("🔍 课程搜索")
         search_layout = QVBoxLayout()
         
+        # 学期选择
+        semester_layout = QHBoxLayout()
+        semester_layout.addWidget(QLabel("学期:"))
+        self.semester_combo = QComboBox()
+        # 学期列表（含 catalogs/ 目录中发现的学期库）由工作线程读取，见 on_semesters_loaded
+        self.semester_combo.addItems(self.available_semesters)
+        self.semester_combo.setCurrentText(self.semester)
+        self.semester_combo.currentTextChanged.connect(self.on_semester_changed)
+        semester_layout.addWidget(self.semester_combo, 1)
+        search_layout.addLayout(semester_layout)
+        
         # 搜索输入框
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("搜索课程名称或代码...")
@@ -249,38 +324,95 @@ class CourseSelectionMainWindow(QMainWindow):
         export_btn.clicked.connect(self.export_schedule)
         toolbar.addWidget(export_btn)
         
-        toolbar.addStretch()
-        layout.addLayout(toolbar)
+        export_catalog_btn = QPushButton("📚 导出全部课程")
+        export_catalog_btn.clicked.connect(self.export_catalog)
+        toolbar.addWidget(export_catalog_btn)
         
-        # 课程表视图选项卡
-        self.schedule_tabs = QTabWidget()
+        save_plan_btn = QPushButton("💾 保存方案")
+        save_plan_btn.clicked.connect(self.save_plan)
+        toolbar.addWidget(save_plan_btn)
         
-        # 月视图
-        self.month_view = MonthViewWidget()
-        self.month_view.set_database(self.db)
-        self.schedule_tabs.addTab(self.month_view, "📅 月视图")
+        load_plan_btn = QPushButton("📂 导入方案")
+        load_plan_btn.clicked.connect(self.load_plan)
+        toolbar.addWidget(load_plan_btn)
         
-        # 周视图
-        self.week_view = WeekViewWidget()
-        self.week_view.set_database(self.db)
-        self.schedule_tabs.addTab(self.week_view, "📊 周视图")
+        toolbar.addStretch()
+        layout.addLayout(toolbar)
         
-        # 日视图
-        self.day_view = DayViewWidget()
-        self.day_view.set_database(self.db)
-        self.schedule_tabs.addTab(self.day_view, "📋 日视图")
+        # 课程表视图选项卡：每个选项卡先放一个空容器，
+        # 视图在第一次切换到该选项卡时才创建
+        self.schedule_tabs = QTabWidget()
+        self.month_view = None
+        self.week_view = None
+        self.day_view = None
+        self._view_builders = [
+            ('month_view', self.create_month_view),
+            ('week_view', self.create_week_view),
+            ('day_view', self.create_day_view),
+        ]
+        self._view_containers = []
+        for title in ["📅 月视图", "📊 周视图", "📋 日视图"]:
+            container = QWidget()
+            container.setLayout(QVBoxLayout())
+            container.layout().setContentsMargins(0, 0, 0, 0)
+            self._view_containers.append(container)
+            self.schedule_tabs.addTab(container, title)
+        self.schedule_tabs.currentChanged.connect(self.ensure_view)
+        self.ensure_view(self.schedule_tabs.currentIndex())
         
         layout.addWidget(self.schedule_tabs)
         widget.setLayout(layout)
         return widget
     
+    def create_month_view(self):
+        """创建月视图"""
+        view = MonthViewWidget()
+        view.set_catalog(self.catalog)
+        if self.catalog_snapshot is not None:
+            view.set_semester_start_date(self.semester_start_date)
+        return view
+    
+    def create_week_view(self):
+        """创建周视图"""
+        view = WeekViewWidget()
+        view.set_catalog(self.catalog)
+        return view
+    
+    def create_day_view(self):
+        """创建日视图"""
+        view = DayViewWidget()
+        view.set_catalog(self.catalog)
+        return view
+    
+    def ensure_view(self, index):
+        """确保选项卡对应的视图已创建"""
+        if not 0 <= index < len(self._view_builders):
+            return
+        attr, builder = self._view_builders[index]
+        if getattr(self, attr) is not None:
+            return
+        
+        view = builder()
+        setattr(self, attr, view)
+        self._view_containers[index].layout().addWidget(view)
+        
+        # 新建的视图同步当前选课
+        if self.selected_courses or self.custom_courses:
+            view.set_custom_courses(self.custom_courses)
+            view.update_schedule(self.selected_courses)
+    
+    def get_built_views(self):
+        """返回已创建的课程表视图"""
+        views = [getattr(self, attr) for attr, _ in self._view_builders]
+        return [view for view in views if view is not None]
+    
     def create_right_panel(self):
         """创建右侧面板"""
         widget = QWidget()
         layout = QVBoxLayout()
         
         # 统计信息
-        self.statistics_widget = StatisticsWidget(self.db)
+        self.statistics_widget = StatisticsWidget()
         layout.addWidget(self.statistics_widget)
         
         # 已选课程列表
@@ -306,25 +438,144 @@ class CourseSelectionMainWindow(QMainWindow):
         widget.setLayout(layout)
         return widget
     
+    @traced_action('load_courses')
     def load_courses(self):
-        """加载课程数据"""
-        try:
-            courses = self.db.get_all_courses()
-            self.display_courses(courses)
-        except Exception as e:
-            logger.error(f"Failed to load courses: {e}")
-            QMessageBox.critical(self, "错误", f"加载课程数据失败: {e}")
+        """加载课程数据（在工作线程中查询）"""
+        self.db_worker.submit(
+            'get_all_courses',
+            callback=self.on_courses_loaded,
+            error_callback=self.on_load_failed,
+            coalesce_key='course_list',
+            action='load_courses'
+        )
+    
+    def on_courses_loaded(self, courses):
+        """课程目录加载完成"""
+        self.all_courses = courses
+        self.display_courses(courses)
+        self.hide_loading(f"已加载 {len(courses)} 门课程")
+        if self.startup_profiler is not None:
+            self.startup_profiler.finish("catalog_loaded")
+    
+    def on_load_failed(self, message):
+        """课程目录加载失败"""
+        self.hide_loading("课程目录加载失败")
+        QMessageBox.critical(self, "错误", f"加载课程数据失败: {message}")
+    
+    def load_catalog_snapshot(self):
+        """在工作线程中加载当前学期所有课程的时间安排（添加课程、冲突检查和视图刷新使用）"""
+        self.db_worker.submit(
+            self.run_load_catalog,
+            callback=self.on_catalog_snapshot_loaded,
+            error_callback=lambda message: logger.error(f"Failed to load catalog snapshot: {message}"),
+            coalesce_key='catalog_snapshot',
+            action='load_catalog'
+        )
+    
+    def run_load_catalog(self, db):
+        """读取课程目录快照和学期开始日期（在数据库工作线程中调用）"""
+        return CatalogSnapshot.from_database(db), db.get_semester_start_date()
     
-    def display_courses(self, courses):
-        """显示课程列表（包括数据库课程和自定义课程）"""
+    def on_catalog_snapshot_loaded(self, result):
+        """课程目录快照加载完成：之后的选课操作只访问内存"""
+        snapshot, start_date = result
+        if snapshot.semester != self.semester:
+            return  # 加载期间又切换了学期，等待新学期的快照
+        
+        self.catalog_snapshot = snapshot
+        self.catalog = SnapshotCatalog(snapshot)
+        # 快照加载前只可能选了自定义课程，换数据源后保留
+        items = list(self.selected_courses)
+        self.selection.set_catalog(self.catalog)
+        self.selection.replace(items)
+        for view in self.get_built_views():
+            view.set_catalog(self.catalog)
+        
+        # 学期开始日期未知（None）时月视图不显示课程，不沿用上一个学期的日期
+        self.semester_start_date = start_date
+        if self.month_view is not None:
+            self.month_view.set_semester_start_date(start_date)
+        if start_date is None:
+            logger.warning(f"Semester {snapshot.semester} has no start date")
+            self.statusBar().showMessage(f"{snapshot.semester} 没有记录学期开始日期，月视图和日历导出不可用", 5000)
+        self.update_all_views()
+    
+    def load_db_statistics(self):
+        """在工作线程中查询数据库统计"""
+        self.db_worker.submit(
+            'get_statistics',
+            callback=self.statistics_widget.display_db_stats,
+            coalesce_key='statistics',
+            action='load_statistics'
+        )
+    
+    def on_semesters_loaded(self, semesters):
+        """学期列表读取完成"""
+        self.available_semesters = semesters
+        self.semester_combo.blockSignals(True)
+        self.semester_combo.clear()
+        self.semester_combo.addItems(semesters)
+        self.semester_combo.setCurrentText(self.semester)
+        self.semester_combo.blockSignals(False)
+    
+    @traced_action('semester_change')
+    def on_semester_changed(self, semester):
+        """切换学期：工作线程挂载对应学期库，重置选课并重新加载课程目录"""
+        if not semester or semester == self.semester:
+            return
+        
+        previous = self.semester
+        self.db_worker.set_semester(
+            semester, error_callback=lambda message: self.on_semester_change_failed(semester, previous, message))
+        self.switch_semester(semester)
+    
+    def switch_semester(self, semester):
+        """界面切换到学期（数据库切换已提交给工作线程）"""
+        self.semester = semester
+        # 课程ID只在同一学期库内有效，切换学期后清空已选课程；快照加载完成前冲突检查没有数据
+        self.catalog_snapshot = None
+        self.semester_start_date = None
+        self.catalog = SnapshotCatalog(CatalogSnapshot([], semester=semester))
+        self.selection.set_catalog(self.catalog)
+        for view in self.get_built_views():
+            view.set_catalog(self.catalog)
+        self.update_selected_list()
+        
+        self.load_catalog_snapshot()
+        self.load_db_statistics()
+        self.update_all_views()
+        self.show_loading(f"正在加载 {semester} 课程目录...")
+        self.refresh_course_display()
+    
+    def on_semester_change_failed(self, semester, previous, message):
+        """工作线程挂载学期库失败：回到之前的学期"""
+        logger.error(f"Failed to switch semester to {semester}: {message}")
+        QMessageBox.critical(self, "错误", f"切换学期失败: {message}")
+        if semester != self.semester:
+            return  # 之后又切换到了其他学期
+        self.semester_combo.blockSignals(True)
+        self.semester_combo.setCurrentText(previous)
+        self.semester_combo.blockSignals(False)
+        self.db_worker.set_semester(previous)
+        self.switch_semester(previous)
+    
+    def display_courses(self, courses, custom_indices=None):
+        """
+        显示课程列表（包括数据库课程和自定义课程）
+        
+        Args:
+            custom_indices: 要显示的自定义课程下标，None 表示全部显示
+        """
         # 合并数据库课程和自定义课程
         all_courses = list(courses)
         
         # 添加自定义课程到列表
-        for custom_course in self.custom_courses:
+        for index, custom_course in enumerate(self.custom_courses):
+            if custom_indices is not None and index not in custom_indices:
+                continue
             # 自定义课程格式：(course_id, course_name, credits, hours, course_code)
-            # course_id 使用负数来区分自定义课程
-            custom_id = -(len(self.custom_courses) - self.custom_courses.index(custom_course))
+            # course_id 使用负数来区分自定义课程：第 i 个自定义课程的ID为 -(i+1)
+            custom_id = custom_course_id(index)
             course_data = (
                 custom_id,
                 custom_course.get('name', ''),
@@ -359,15 +610,35 @@ class CourseSelectionMainWindow(QMainWindow):
             # 存储课程ID
             self.course_table.item(row, 0).setData(Qt.UserRole, course_id)
     
+    @traced_action('search')
     def search_courses(self):
-        """搜索课程（包括自定义课程）"""
-        keyword = self.search_input.text().strip().lower()
+        """搜索课程（包括自定义课程），数据库查询在工作线程中执行"""
+        keyword = self.search_input.text().strip()
         department = self.department_input.text().strip()
         
+        # 连续输入时只保留最后一次搜索
+        self.db_worker.submit(
+            'search_courses', keyword, department,
+            callback=lambda courses: self.on_search_results(courses, keyword.lower()),
+            error_callback=self.on_search_failed,
+            coalesce_key='course_list',
+            action='search'
+        )
+    
+    def on_search_failed(self, message):
+        """搜索失败"""
+        self.hide_search_loading("搜索失败")
+        QMessageBox.warning(self, "警告", f"搜索失败: {message}")
+    
+    def hide_search_loading(self, message):
+        """搜索代替目录加载时（如切换学期时搜索框中有内容），由搜索结果结束加载进度"""
+        if self.loading_bar.isVisible():
+            self.hide_loading(message)
+    
+    def on_search_results(self, courses, keyword):
+        """显示搜索结果"""
+        self.hide_search_loading(f"找到 {len(courses)} 门课程")
         try:
-            # 搜索数据库课程
-            courses = self.db.search_courses(self.search_input.text().strip(), department)
-            
             # 如果有关键词搜索，还要搜索自定义课程
             if keyword:
                 filtered_courses = []
@@ -378,24 +649,20 @@ class CourseSelectionMainWindow(QMainWindow):
                         keyword in str(course_code).lower()):
                         filtered_courses.append(course)
                 
-                # 搜索自定义课程
-                custom_filtered = []
-                for custom_course in self.custom_courses:
+                # 搜索自定义课程（按下标筛选，保持课程ID不变）
+                custom_filtered = set()
+                for index, custom_course in enumerate(self.custom_courses):
                     name = str(custom_course.get('name', '')).lower()
                     code = str(custom_course.get('code', '')).lower()
                     if keyword in name or keyword in code:
-                        custom_filtered.append(custom_course)
+                        custom_filtered.add(index)
                 
-                # 临时替换自定义课程列表用于显示
-                original_custom = self.custom_courses[:]
-                self.custom_courses = custom_filtered
-                self.display_courses(filtered_courses)
-                self.custom_courses = original_custom
+                self.display_courses(filtered_courses, custom_filtered)
             else:
                 self.display_courses(courses)
                 
         except Exception as e:
-            logger.error(f"Failed to search courses: {e}")
+            logger.error(f"Failed to display search results: {e}")
             QMessageBox.warning(self, "警告", f"搜索失败: {e}")
     
     def clear_search(self):
@@ -404,6 +671,7 @@ class CourseSelectionMainWindow(QMainWindow):
         self.department_input.clear()
         self.load_courses()
     
+    @traced_action('add_course')
     def add_course(self):
         """添加课程到选课列表"""
         current_row = self.course_table.currentRow()
@@ -421,11 +689,15 @@ class CourseSelectionMainWindow(QMainWindow):
         course_id = course_id_item.data(Qt.UserRole)
         course_name = course_name_item.text()
         
+        # 冲突检查使用工作线程加载的时间安排快照，加载完成前不能添加数据库课程
+        if course_id >= 0 and self.catalog_snapshot is None:
+            QMessageBox.information(self, "提示", "课程时间安排正在加载，请稍候再试")
+            return
+        
         # 检查是否已选择
-        for selected_id, _ in self.selected_courses:
-            if selected_id == course_id:
-                QMessageBox.information(self, "提示", "该课程已在选课列表中")
-                return
+        if course_id in self.selection:
+            QMessageBox.information(self, "提示", "该课程已在选课列表中")
+            return
         
         # 检查时间冲突
         conflicts = self.check_time_conflicts(course_id)
@@ -438,12 +710,13 @@ class CourseSelectionMainWindow(QMainWindow):
                 return
         
         # 添加到选课列表
-        self.selected_courses.append((course_id, course_name))
+        self.selection.add(course_id, course_name)
         self.update_selected_list()
         self.update_all_views()
         
         QMessageBox.information(self, "成功", f"已添加课程: {course_name}")
     
+    @traced_action('remove_course')
     def remove_course(self):
         """从选课列表中移除课程"""
         current_item = self.selected_list.currentItem()
@@ -455,19 +728,20 @@ class CourseSelectionMainWindow(QMainWindow):
         course_id = current_item.data(Qt.UserRole)
         
         # 从列表中移除
-        self.selected_courses = [(cid, cname) for cid, cname in self.selected_courses if cid != course_id]
+        self.selection.remove(course_id)
         
         self.update_selected_list()
         self.update_all_views()
         
         QMessageBox.information(self, "成功", "课程已移除")
     
+    @traced_action('clear_courses')
     def clear_all_courses(self):
         """清空所有选课"""
         reply = QMessageBox.question(self, "确认", "确定要清空所有选课吗？",
                                    QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.selected_courses.clear()
+            self.selection.clear()
             self.update_selected_list()
             self.update_all_views()
     
@@ -480,73 +754,28 @@ class CourseSelectionMainWindow(QMainWindow):
             item.setData(Qt.UserRole, course_id)
             self.selected_list.addItem(item)
     
+    @traced_action('update_views')
     def update_all_views(self):
         """更新所有视图"""
-        # 传递自定义课程数据给视图组件
-        self.month_view.set_custom_courses(self.custom_courses)
-        self.week_view.set_custom_courses(self.custom_courses)
-        self.day_view.set_custom_courses(self.custom_courses)
-        
-        # 更新课程表视图
-        self.month_view.update_schedule(self.selected_courses)
-        self.week_view.update_schedule(self.selected_courses)
-        self.day_view.update_schedule(self.selected_courses)
-        
-        # 更新统计信息
-        conflicts_count = len(self.get_all_conflicts())
-        self.statistics_widget.update_selection_stats(self.selected_courses, conflicts_count)
+        # 更新已创建的课程表视图（未创建的视图在首次显示时同步）
+        for view in self.get_built_views():
+            view.set_custom_courses(self.custom_courses)
+            view.update_schedule(self.selected_courses)
+        
+        # 更新统计信息（冲突数和学分由选课核心增量计算）
+        stats = compute_statistics(self.selection)
+        self.statistics_widget.update_selection_stats(self.selected_courses, stats['conflicts'],
+                                                      total_credits=stats['credits'])
     
     def check_time_conflicts(self, new_course_id):
-        """检查时间冲突"""
-        conflicts = []
-        
-        # 获取新课程的时间安排
-        if new_course_id < 0:
-            # 自定义课程
-            new_schedules = self.get_custom_course_schedules(new_course_id)
-        else:
-            # 数据库课程
-            new_schedules = self.db.get_course_schedules(new_course_id)
-        
-        # 获取已选课程的时间安排
-        for course_id, course_name in self.selected_courses:
-            if course_id < 0:
-                # 自定义课程
-                existing_schedules = self.get_custom_course_schedules(course_id)
-            else:
-                # 数据库课程
-                existing_schedules = self.db.get_course_schedules(course_id)
-            
-            for new_schedule in new_schedules:
-                for existing_schedule in existing_schedules:
-                    if self.conflict_checker.check_conflict(new_schedule, existing_schedule):
-                        conflicts.append(f"与 {course_name} 的时间冲突")
-        
-        return conflicts
+        """检查新课程与已选课程的时间冲突"""
+        return [f"与 {course_name} 的时间冲突" for _, course_name in self.selection.check(new_course_id)]
     
     def get_all_conflicts(self):
-        """获取所有时间冲突"""
-        conflicts = []
-        
-        for i, (course_id1, course_name1) in enumerate(self.selected_courses):
-            if course_id1 < 0:
-                schedules1 = self.get_custom_course_schedules(course_id1)
-            else:
-                schedules1 = self.db.get_course_schedules(course_id1)
-            
-            for j, (course_id2, course_name2) in enumerate(self.selected_courses[i+1:], i+1):
-                if course_id2 < 0:
-                    schedules2 = self.get_custom_course_schedules(course_id2)
-                else:
-                    schedules2 = self.db.get_course_schedules(course_id2)
-                
-                for schedule1 in schedules1:
-                    for schedule2 in schedules2:
-                        if self.conflict_checker.check_conflict(schedule1, schedule2):
-                            conflicts.append((course_name1, course_name2))
-        
-        return conflicts
+        """获取所有时间冲突的课程对"""
+        return self.selection.conflict_pairs()
     
+    @traced_action('export')
     def export_schedule(self):
         """导出课程表"""
         if not self.selected_courses:
@@ -557,45 +786,208 @@ class CourseSelectionMainWindow(QMainWindow):
         file_path, file_type = QFileDialog.getSaveFileName(
             self, "导出课程表",
             f"我的课程表_{self.get_current_timestamp()}.csv",
-            "CSV文件 (*.csv);;Excel文件 (*.xlsx);;PDF文件 (*.pdf);;JSON文件 (*.json)"
+            "CSV文件 (*.csv);;Excel文件 (*.xlsx);;PDF文件 (*.pdf);;JSON文件 (*.json);;iCalendar日历 (*.ics);;HTML网页 (*.html)"
         )
         
         if not file_path:
             return
         
-        try:
-            # 获取课程数据
-            course_ids = [course_id for course_id, _ in self.selected_courses]
-            courses_data = self.db.get_selected_courses_with_schedules(course_ids)
-            
-            # 根据文件类型导出
-            success = False
-            if file_path.endswith('.csv'):
-                success = self.schedule_exporter.export_to_csv(courses_data, file_path)
-            elif file_path.endswith('.xlsx'):
-                success = self.schedule_exporter.export_to_excel(courses_data, file_path)
-            elif file_path.endswith('.pdf'):
-                success = self.schedule_exporter.export_to_pdf(courses_data, file_path)
-            elif file_path.endswith('.json'):
-                success = self.schedule_exporter.export_to_json(courses_data, file_path)
-            else:
-                # 默认导出为CSV
-                success = self.schedule_exporter.export_to_csv(courses_data, file_path)
-            
-            if success:
-                QMessageBox.information(self, "成功", f"课程表已导出到: {file_path}")
+        if file_path.endswith('.ics') and self.catalog_snapshot is not None and not self.semester_start_date:
+            QMessageBox.warning(self, "无法导出日历",
+                                f"{self.semester} 没有记录学期开始日期，无法确定每个教学周的日期。\n"
+                                f"请在 config.py 的 SEMESTER_CATALOGS 中配置 start_date，或执行\n"
+                                f"python -m database.migrate_catalogs --start-date YYYY-MM-DD <课程库>")
+            return
+        
+        # 数据收集和文件写入都在工作线程中执行
+        course_ids = [course_id for course_id, _ in self.selected_courses]
+        self.db_worker.submit(
+            self.run_export, course_ids, file_path,
+            callback=lambda success: self.on_export_finished(success, file_path),
+            error_callback=self.on_export_failed,
+            action='export'
+        )
+    
+    def run_export(self, db, course_ids, file_path):
+        """执行导出（在数据库工作线程中调用）"""
+        # 导出模型按选课结果缓存，同一选课再导出为其他格式时不重复查询和构建网格
+        model = self.schedule_exporter.get_export_model(db, course_ids)
+        
+        # 根据文件类型导出
+        if file_path.endswith('.csv'):
+            return self.schedule_exporter.export_to_csv(model, file_path)
+        elif file_path.endswith('.xlsx'):
+            return self.schedule_exporter.export_to_excel(model, file_path)
+        elif file_path.endswith('.pdf'):
+            return self.schedule_exporter.export_to_pdf(model, file_path)
+        elif file_path.endswith('.json'):
+            return self.schedule_exporter.export_to_json(model, file_path)
+        elif file_path.endswith('.ics'):
+            return self.schedule_exporter.export_to_ics(
+                model, file_path, semester_start_date=db.get_semester_start_date())
+        elif file_path.endswith('.html'):
+            return self.schedule_exporter.export_to_html(model, file_path)
+        else:
+            # 默认导出为CSV
+            return self.schedule_exporter.export_to_csv(model, file_path)
+    
+    @traced_action('export_catalog')
+    def export_catalog(self):
+        """导出当前学期的整个课程目录（流式写出CSV/Excel）"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出全部课程",
+            f"课程目录_{self.semester or ''}_{self.get_current_timestamp()}.csv",
+            "CSV文件 (*.csv);;Excel文件 (*.xlsx)"
+        )
+        
+        if not file_path:
+            return
+        
+        if file_path.lower().endswith('.xlsx'):
+            export_func = self.schedule_exporter.export_catalog_to_excel
+        else:
+            export_func = self.schedule_exporter.export_catalog_to_csv
+        
+        self.show_loading("正在导出课程目录...")
+        self.db_worker.submit(
+            export_func, file_path,
+            callback=lambda success: self.on_catalog_export_finished(success, file_path),
+            error_callback=self.on_catalog_export_failed,
+            action='export_catalog'
+        )
+    
+    def on_catalog_export_finished(self, success, file_path):
+        """课程目录导出完成"""
+        self.hide_loading()
+        self.on_export_finished(success, file_path)
+    
+    def on_catalog_export_failed(self, message):
+        """课程目录导出出错"""
+        self.hide_loading()
+        self.on_export_failed(message)
+    
+    @traced_action('save_plan')
+    def save_plan(self):
+        """保存当前选课为方案文件（紧凑格式，可分享和恢复）"""
+        if not self.selected_courses and not self.custom_courses:
+            QMessageBox.information(self, "提示", "没有可保存的选课")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "保存选课方案",
+            f"选课方案_{self.get_current_timestamp()}{plan_format.PLAN_FILE_SUFFIX}",
+            f"选课方案 (*{plan_format.PLAN_FILE_SUFFIX})"
+        )
+        
+        if not file_path:
+            return
+        
+        # 数据库课程和自定义课程按选课顺序保存在同一个列表中
+        selected_ids = [course_id for course_id, _ in self.selected_courses]
+        self.db_worker.submit(
+            self.run_save_plan, file_path, selected_ids, list(self.custom_courses), self.semester,
+            callback=lambda size: self.on_plan_saved(size, file_path),
+            error_callback=self.on_export_failed,
+            action='save_plan'
+        )
+    
+    def run_save_plan(self, db, file_path, selected_ids, custom_courses, semester):
+        """写出方案文件（在数据库工作线程中调用）"""
+        return plan_format.save_plan(file_path, selected_ids, custom_courses, semester,
+                                     db.get_catalog_fingerprint())
+    
+    def on_plan_saved(self, size, file_path):
+        """方案保存完成"""
+        self.statusBar().showMessage(f"方案已保存: {file_path} ({size} 字节)", 5000)
+    
+    @traced_action('load_plan')
+    def load_plan(self):
+        """导入方案文件，替换当前选课"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "导入选课方案", "",
+            f"选课方案 (*{plan_format.PLAN_FILE_SUFFIX});;JSON文件 (*.json)"
+        )
+        
+        if not file_path:
+            return
+        
+        # 读取方案文件也在工作线程中执行
+        self.show_loading("正在导入方案...")
+        self.db_worker.submit(
+            lambda db: plan_format.load_plan(file_path),
+            callback=self.on_plan_read,
+            error_callback=self.on_plan_load_failed,
+            action='load_plan'
+        )
+    
+    def on_plan_read(self, plan):
+        """方案文件读取完成，切换到方案所属学期后校验课程"""
+        # 课程ID只在同一学期库内有效，先切换到方案所属学期（切换请求排在校验之前执行）
+        semester = plan['semester']
+        if semester and semester != self.semester:
+            if semester in self.available_semesters:
+                self.semester_combo.setCurrentText(semester)
             else:
-                QMessageBox.warning(self, "失败", "导出失败，请检查文件格式和权限")
-                
-        except Exception as e:
-            logger.error(f"Export failed: {e}")
-            QMessageBox.critical(self, "错误", f"导出失败: {e}")
+                QMessageBox.warning(self, "警告", f"方案属于学期 {semester}，当前没有该学期的课程库，将按当前学期校验")
+        
+        self.show_loading("正在导入方案...")
+        self.db_worker.submit(
+            plan_format.restore_plan, plan,
+            callback=self.on_plan_restored,
+            error_callback=self.on_plan_load_failed,
+            action='load_plan'
+        )
+    
+    def on_plan_restored(self, result):
+        """方案校验完成，应用到当前选课"""
+        self.hide_loading()
+        self.selection.replace(result['selected_courses'], result['custom_courses'])
+        self.update_selected_list()
+        self.update_all_views()
+        self.refresh_course_display()
+        
+        warnings = []
+        if result['catalog_matches'] is False:
+            warnings.append("方案保存时的课程目录与当前目录不同，课程可能已调整")
+        if result['missing_ids']:
+            warnings.append(f"{len(result['missing_ids'])} 门课程在当前目录中不存在，已跳过")
+        if warnings:
+            QMessageBox.warning(self, "导入方案", "\n".join(warnings))
+        else:
+            self.statusBar().showMessage(f"已导入方案: {len(self.selected_courses)} 门课程", 5000)
+    
+    def on_plan_load_failed(self, message):
+        """方案导入出错"""
+        self.hide_loading()
+        QMessageBox.critical(self, "错误", f"导入方案失败: {message}")
+    
+    def on_export_finished(self, success, file_path):
+        """导出完成"""
+        if success:
+            QMessageBox.information(self, "成功", f"课程表已导出到: {file_path}")
+        else:
+            QMessageBox.warning(self, "失败", "导出失败，请检查文件格式和权限")
+    
+    def on_export_failed(self, message):
+        """导出出错"""
+        QMessageBox.critical(self, "错误", f"导出失败: {message}")
+    
+    def closeEvent(self, event):
+        """关闭窗口时停止工作线程和卡顿监视，并输出SQL追踪统计"""
+        self.db_worker.stop()
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+        if self.db_worker.tracer is not None:
+            print("数据库工作线程:")
+            self.db_worker.tracer.print_summary()
+        super().closeEvent(event)
     
     def get_current_timestamp(self):
         """获取当前时间戳"""
         from datetime import datetime
         return datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    @traced_action('add_custom_course')
     def show_custom_course_dialog(self):
         """显示自定义课程对话框"""
         dialog = CustomCourseDialog(self)
@@ -609,7 +1001,7 @@ class CourseSelectionMainWindow(QMainWindow):
                 return
             
             # 添加到自定义课程列表
-            self.custom_courses.append(course_data)
+            self.selection.add_custom_course(course_data)
             
             # 刷新课程列表显示
             self.refresh_course_display()
@@ -621,14 +1013,10 @@ class CourseSelectionMainWindow(QMainWindow):
         if not code:
             return False
         
-        # 检查数据库中的课程
-        try:
-            courses = self.db.get_all_courses()
-            for course in courses:
-                if course[4] == code:  # course_code
-                    return True
-        except:
-            pass
+        # 检查数据库中的课程（使用已加载的课程目录，不访问数据库）
+        for course in self.all_courses:
+            if course[4] == code:  # course_code
+                return True
         
         # 检查自定义课程
         for custom_course in self.custom_courses:
@@ -644,33 +1032,3 @@ class CourseSelectionMainWindow(QMainWindow):
             self.search_courses()
         else:
             self.load_courses()
-    
-    def get_custom_course_by_id(self, course_id):
-        """根据ID获取自定义课程"""
-        if course_id >= 0:
-            return None
-        
-        index = -(course_id + 1)
-        if 0 <= index < len(self.custom_courses):
-            return self.custom_courses[index]
-        return None
-    
-    def get_custom_course_schedules(self, course_id):
-        """获取自定义课程的时间安排"""
-        custom_course = self.get_custom_course_by_id(course_id)
-        if not custom_course:
-            return []
-        
-        schedules = []
-        for schedule in custom_course.get('schedules', []):
-            # 转换为数据库格式的时间安排
-            schedule_data = {
-                'weekday': schedule.get('weekday'),
-                'start_time': schedule.get('start_time'),
-                'end_time': schedule.get('end_time'),
-                'location': schedule.get('location', ''),
-                'weeks': schedule.get('weeks', '1-16')
-            }
-            schedules.append(schedule_data)
-        
-        return schedules
@@ -0,0 +1,136 @@
+"""
+事件循环卡顿监视器
+界面线程的定时器定期记录心跳，后台线程检查心跳间隔；超过阈值时用 sys._current_frames
+抓取界面线程当前的Python调用栈，连同正在执行的界面操作（traced_action）一起记录日志，
+用于在实际使用中定位造成卡顿的槽函数（add_course、update_all_views、on_week_changed 等）
+
+开销：每个心跳只是一次时间戳赋值，后台线程每半个阈值醒来一次，只有发生卡顿时才抓取调用栈，
+卡顿记录也由后台线程写入文件，可以在正式环境中常开。启用方式见 config.py 的 STALL_WATCHDOG_*，或 python main.py --stall-watchdog 50
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+import traceback
+import logging
+from collections import Counter
+
+from PyQt5.QtCore import QObject, QTimer
+
+from database import current_actions
+
+logger = logging.getLogger(__name__)
+
+# 日志中保留的调用栈帧数（最内层）
+STACK_LIMIT = 25
+
+
+class StallWatchdog(QObject):
+    """
+    界面线程卡顿监视器，必须在界面线程中创建
+
+    Args:
+        threshold_ms: 超过多少毫秒没有心跳视为卡顿
+        log_path: 可选，每次卡顿追加一行JSON（时间、时长、操作、调用栈）
+    """
+
+    def __init__(self, threshold_ms=50, log_path=None, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stall = None  # 当前卡顿: {'started', 'actions', 'stack'}
+        self._stop = threading.Event()
+        self._thread = None
+        self._records = queue.SimpleQueue()  # 等待后台线程写入 log_path 的卡顿记录
+        self.stall_count = 0
+        self.max_stall = 0.0
+        self.stalls_by_action = Counter()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(threshold_ms / 2)))
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(f"Stall watchdog started (threshold {self.threshold * 1000:.0f}ms)")
+        return self
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self._write_records()
+        if self.stall_count:
+            summary = ', '.join(f"{action}={count}" for action, count in self.stalls_by_action.most_common())
+            logger.info(f"Stall watchdog: {self.stall_count} stalls, longest {self.max_stall * 1000:.0f}ms ({summary})")
+
+    def _beat(self):
+        """界面线程心跳；卡顿结束后的第一次心跳记录卡顿总时长"""
+        now = time.monotonic()
+        stall = self._stall
+        if stall is not None:
+            self._stall = None
+            self._finish_stall(stall, now - stall['started'])
+        self._last_beat = now
+
+    def _watch(self):
+        """后台线程：心跳超时时抓取界面线程的调用栈"""
+        interval = self.threshold / 2
+        while not self._stop.wait(interval):
+            self._write_records()
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat
+            if lag <= self.threshold or self._stall is not None:
+                continue
+            frame = sys._current_frames().get(self._gui_thread_id)
+            stack = traceback.format_stack(frame, limit=STACK_LIMIT) if frame is not None else []
+            del frame
+            actions = current_actions(self._gui_thread_id)
+            if self._last_beat != last_beat:
+                # 抓取调用栈期间卡顿已经结束
+                continue
+            self._stall = {'started': last_beat, 'actions': actions, 'stack': stack}
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms during "
+                           f"{' > '.join(actions) or 'unknown action'}:\n{''.join(stack).rstrip()}")
+
+    def _finish_stall(self, stall, duration):
+        action = stall['actions'][0] if stall['actions'] else '(unknown)'
+        self.stall_count += 1
+        self.max_stall = max(self.max_stall, duration)
+        self.stalls_by_action[action] += 1
+        logger.warning(f"Event loop stall ended after {duration * 1000:.0f}ms ({action})")
+        if self.log_path:
+            # 界面线程只把记录放入队列，文件由后台线程写入
+            self._records.put({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'duration_ms': round(duration * 1000, 1),
+                'actions': stall['actions'],
+                'stack': [line.rstrip() for line in stall['stack']],
+            })
+
+    def _write_records(self):
+        """把队列中的卡顿记录追加到 log_path（后台线程中调用，stop 时写入剩余记录）"""
+        records = []
+        while True:
+            try:
+                records.append(self._records.get_nowait())
+            except queue.Empty:
+                break
+        if not records:
+            return
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to write stall log {self.log_path}: {e}")
@@ -0,0 +1,364 @@
+"""
+最小的 asyncio HTTP/1.1 服务器和客户端
+只依赖标准库：服务器支持 GET/POST、JSON 请求体、keep-alive 和按路径前缀的路由，
+足够为局域网内的轻量前端提供 JSON 接口；客户端带连接池，用于轮询等大量小请求
+"""
+
+import json
+import asyncio
+import logging
+from urllib.parse import urlsplit, parse_qs, unquote
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_HEADER_LINES = 100
+
+_STATUS_TEXT = {
+    200: 'OK', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    """处理函数抛出后返回对应状态码和 {"error": message}"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """解析后的请求"""
+
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        self.headers = headers
+        self.body = body
+        parts = urlsplit(target)
+        self.path = unquote(parts.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.path_params = {}
+
+    def json(self):
+        """请求体解析为JSON，格式错误时返回400"""
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError as e:
+            raise HTTPError(400, f"请求体不是有效的JSON: {e}") from e
+
+
+class Response:
+    """处理函数需要自定义状态码或响应头（如 ETag、Retry-After）时返回此对象"""
+
+    def __init__(self, status=200, payload=None, headers=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+
+def encode_response(status, payload, keep_alive=True, extra_headers=None):
+    """把状态码和可JSON序列化的数据编码为完整的HTTP响应"""
+    body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = [
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'Unknown')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Access-Control-Allow-Origin: *",
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers: Content-Type",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    headers.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+
+class AsyncHTTPServer:
+    """
+    JSON 接口服务器
+
+    路由为 (方法, 路径)，路径以 "/" 结尾的路由匹配该前缀，剩余部分放在 request.path_params['tail']。
+    处理函数接收 Request，返回可JSON序列化的数据或 Response，可以是普通函数或协程函数
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765):
+        self.host = host
+        self.port = port
+        self._routes = {}
+        self._prefix_routes = []
+        self._server = None
+        self._writers = set()
+        self._tasks = set()  # 处理中的连接任务
+        self.request_count = 0
+
+    def route(self, method, path, handler):
+        if path.endswith('/') and path != '/':
+            self._prefix_routes.append((method.upper(), path, handler))
+            self._prefix_routes.sort(key=lambda item: len(item[1]), reverse=True)
+        else:
+            self._routes[(method.upper(), path)] = handler
+
+    def _resolve(self, request):
+        handler = self._routes.get((request.method, request.path))
+        if handler is not None:
+            return handler
+        for method, prefix, handler in self._prefix_routes:
+            if request.path.startswith(prefix) and len(request.path) > len(prefix):
+                if method != request.method:
+                    raise HTTPError(405, f"不支持的方法: {request.method}")
+                request.path_params['tail'] = request.path[len(prefix):]
+                return handler
+        if any(path == request.path for _, path in self._routes):
+            raise HTTPError(405, f"不支持的方法: {request.method}")
+        raise HTTPError(404, f"未找到: {request.path}")
+
+    async def _dispatch(self, request):
+        try:
+            handler = self._resolve(request)
+            result = handler(request)
+            if asyncio.iscoroutine(result):
+                result = await result
+            if isinstance(result, Response):
+                return result
+            return Response(200, result)
+        except HTTPError as e:
+            return Response(e.status, {'error': e.message})
+        except Exception as e:
+            logger.exception(f"Request {request.method} {request.path} failed: {e}")
+            return Response(500, {'error': '服务器内部错误'})
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "无效的请求行")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "请求头过多")
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, "无效的 Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "请求体过大")
+        body = await reader.readexactly(length) if length else b''
+
+        request = Request(method.upper(), target, headers, body)
+        request.keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+        return request
+
+    async def _handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    writer.write(encode_response(e.status, {'error': e.message}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                self.request_count += 1
+                if request.method == 'OPTIONS':
+                    response = Response(204)
+                else:
+                    response = await self._dispatch(request)
+                writer.write(encode_response(response.status, response.payload, request.keep_alive,
+                                             response.headers))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # 客户端断开
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._tasks.discard(task)
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP server listening on http://{self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # 关闭空闲的 keep-alive 连接，否则 wait_closed 会一直等待
+            for writer in list(self._writers):
+                writer.close()
+            # 等连接任务读到EOF后自行结束，避免它们在事件循环关闭时才被取消
+            if self._tasks:
+                await asyncio.wait(list(self._tasks), timeout=1.0)
+            await self._server.wait_closed()
+
+
+# ---- 客户端 ----
+
+class ClientResponse:
+    """客户端收到的响应"""
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class _ClientConnection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    def close(self):
+        self.writer.close()
+
+
+async def _read_chunked(reader):
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+        if size == 0:
+            # 跳过 trailer
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
+
+
+class AsyncHTTPClient:
+    """
+    带连接池的 HTTP/1.1 客户端（只支持 http://）
+
+    同一时间最多 max_connections 个请求在途，空闲连接保持 keep-alive 复用，
+    连接被服务器关闭时自动重连一次
+    """
+
+    def __init__(self, base_url, max_connections=16, timeout=10.0, headers=None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', ''):
+            raise ValueError(f"只支持 http:// 地址: {base_url}")
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.default_headers = dict(headers or {})
+        self._limit = asyncio.Semaphore(max_connections)
+        self._idle = []
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        return _ClientConnection(reader, writer)
+
+    async def _exchange(self, connection, method, path, headers, body):
+        lines = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        connection.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("连接已被服务器关闭")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = await _read_chunked(reader)
+        elif 'content-length' in response_headers:
+            length = int(response_headers['content-length'])
+            data = await reader.readexactly(length) if length else b''
+        elif status in (204, 304):
+            data = b''
+        else:
+            data = await reader.read()
+            connection.reusable = False
+        if response_headers.get('connection', '').lower() == 'close':
+            connection.reusable = False
+        return ClientResponse(status, response_headers, data)
+
+    async def request(self, method, path, headers=None, payload=None):
+        """
+        发送请求
+
+        Args:
+            path: 相对于 base_url 的路径（含查询字符串）
+            payload: 可JSON序列化的请求体
+
+        Returns:
+            ClientResponse
+        """
+        body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        all_headers = dict(self.default_headers)
+        if payload is not None:
+            all_headers['Content-Type'] = 'application/json'
+        all_headers.update(headers or {})
+
+        async with self._limit:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._connect()
+                try:
+                    response = await asyncio.wait_for(
+                        self._exchange(connection, method.upper(), path, all_headers, body), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    connection.close()
+                    # 复用的空闲连接可能已被服务器关闭，换新连接重试一次
+                    if reused and attempt == 0:
+                        continue
+                    raise ConnectionError(f"{method} {path} 失败: {e}") from e
+                except BaseException:
+                    connection.close()
+                    raise
+
+                if connection.reusable:
+                    self._idle.append(connection)
+                else:
+                    connection.close()
+                return response
+
+    async def get(self, path, headers=None):
+        return await self.request('GET', path, headers)
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
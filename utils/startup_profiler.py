@@ -0,0 +1,45 @@
+"""
+启动耗时分析工具
+记录启动过程各阶段的耗时，用于 main.py --profile-startup
+"""
+
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """启动阶段计时器"""
+
+    def __init__(self, start_time=None):
+        """
+        Args:
+            start_time: 计时起点（time.perf_counter()的值），默认为创建时刻
+        """
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self._last = self.start_time
+        self.phases = []  # (阶段名, 本阶段耗时, 自启动起的累计耗时)
+        self.finished = False
+
+    def mark(self, phase):
+        """标记一个阶段结束"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - self.start_time))
+        self._last = now
+
+    def format_report(self):
+        """格式化为阶段耗时表"""
+        lines = ["启动耗时分析:", f"  {'阶段':<24}{'耗时 ms':>10}{'累计 ms':>10}"]
+        for phase, duration, elapsed in self.phases:
+            lines.append(f"  {phase:<24}{duration * 1000:>10.1f}{elapsed * 1000:>10.1f}")
+        return '\n'.join(lines)
+
+    def finish(self, phase=None):
+        """标记最后一个阶段并打印报告（只打印一次）"""
+        if self.finished:
+            return
+        if phase:
+            self.mark(phase)
+        self.finished = True
+        print(self.format_report())
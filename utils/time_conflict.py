@@ -1,9 +1,11 @@
 """
 时间冲突检查工具
 用于检查课程时间安排是否存在冲突
+
+节次和周次的解析委托给 planner.schedule，与占用位图、周视图和导出使用同一套规则；
+planner 在方法内导入，避免 utils 包（启动计时器也在其中）被导入时加载整个规划核心
 """
 
-import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,30 +16,15 @@ class TimeConflictChecker:
     
     @staticmethod
     def parse_time_slots(time_slots_str):
-        """解析时间段字符串，返回时间段列表"""
-        if not time_slots_str:
-            return []
-        
-        numbers = re.findall(r'\d+', time_slots_str)
-        time_slots = []
-        
-        if len(numbers) >= 2:
-            start = int(numbers[0])
-            end = int(numbers[-1])
-            time_slots = list(range(start, end + 1))
-        elif len(numbers) == 1:
-            time_slots = [int(numbers[0])]
-        
-        return time_slots
+        """解析时间段字符串，返回时间段列表（见 planner.schedule.parse_slots）"""
+        from planner.schedule import parse_slots
+        return parse_slots(time_slots_str)
     
     @staticmethod
     def parse_weeks(weeks_str):
-        """解析周次字符串，返回周次列表"""
-        if not weeks_str:
-            return []
-        
-        numbers = re.findall(r'\d+', weeks_str)
-        return [int(n) for n in numbers]
+        """解析周次字符串，返回周次列表；未写周次时为整个教学期（见 planner.schedule.schedule_weeks）"""
+        from planner.schedule import schedule_weeks
+        return schedule_weeks(weeks_str)
     
     @staticmethod
     def check_conflict(schedule1, schedule2):
@@ -45,7 +32,7 @@ class TimeConflictChecker:
         day1, time1, _, weeks1, _ = schedule1
         day2, time2, _, weeks2, _ = schedule2
         
-        if day1 != day2:
+        if str(day1).strip() != str(day2).strip():
             return False
         
         slots1 = TimeConflictChecker.parse_time_slots(time1)
@@ -82,12 +69,8 @@ class TimeConflictChecker:
     @staticmethod
     def format_time_slot(time_slot):
         """格式化时间段显示"""
-        time_map = {
-            1: "08:00-08:50", 2: "09:00-09:50", 3: "10:10-11:00", 4: "11:10-12:00",
-            5: "14:00-14:50", 6: "15:00-15:50", 7: "16:10-17:00", 8: "17:10-18:00",
-            9: "19:00-19:50", 10: "20:00-20:50", 11: "21:00-21:50"
-        }
-        return time_map.get(time_slot, f"第{time_slot}节")
+        from config import TIME_SLOTS
+        return TIME_SLOTS.get(time_slot, f"第{time_slot}节")
     
     @staticmethod
     def format_day_of_week(day):
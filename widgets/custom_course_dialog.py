@@ -431,10 +431,15 @@ class CustomCourseDialog(QDialog):
         """确认添加课程"""
         course_data = self.collect_course_data()
         if course_data:
+            self.course_data = course_data
             # 发送信号
             self.course_added.emit(course_data)
             self.accept()
     
+    def get_course_data(self):
+        """获取确认添加的课程数据（对话框接受后调用）"""
+        return self.course_data
+    
     def reset_form(self):
         """重置表单"""
         # 清空基本信息
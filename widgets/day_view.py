@@ -6,6 +6,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 import logging
 
+from planner.catalog import DatabaseCatalog
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,12 +18,16 @@ class DayViewWidget(QWidget):
         super().__init__()
         self.selected_courses = []
         self.custom_courses = []  # 存储自定义课程数据
-        self.db = None
+        self.catalog = None  # 课程目录数据源（planner.catalog），提供数据库课程的时间安排
         self.init_ui()
     
+    def set_catalog(self, catalog):
+        """设置课程目录数据源（主窗口使用工作线程加载的内存快照，不访问数据库）"""
+        self.catalog = catalog
+    
     def set_database(self, db):
-        """设置数据库连接"""
-        self.db = db
+        """以数据库连接为数据源（独立使用组件时）"""
+        self.set_catalog(DatabaseCatalog(db))
     
     def set_custom_courses(self, custom_courses):
         """设置自定义课程数据"""
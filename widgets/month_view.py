@@ -9,6 +9,10 @@ from PyQt5.QtCore import QDate, Qt
 from PyQt5.QtGui import QFont
 import logging
 
+from database import traced_action
+from planner.catalog import DatabaseCatalog
+from planner.schedule import schedule_weeks
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +23,7 @@ class MonthViewWidget(QWidget):
         super().__init__()
         self.selected_courses = []
         self.custom_courses = []  # 存储自定义课程数据
-        self.db = None
+        self.catalog = None  # 课程目录数据源（planner.catalog），提供数据库课程的时间安排
         self.current_month = 9  # 当前月份
         self.current_year = 2025  # 当前年份
         self.semester_start_date = QDate(2025, 9, 1)  # 学期开始日期
@@ -46,7 +50,7 @@ class MonthViewWidget(QWidget):
             # 转换为数据库格式的时间安排
             # (weekday, time_slots, location, weeks, semester)
             schedule_data = (
-                schedule.get('weekday'),
+                schedule.get('weekday_num'),
                 f"{schedule.get('start_time')}-{schedule.get('end_time')}",
                 schedule.get('location', ''),
                 schedule.get('weeks', '1-16'),
@@ -56,9 +60,35 @@ class MonthViewWidget(QWidget):
         
         return schedules
     
+    def set_catalog(self, catalog):
+        """设置课程目录数据源（主窗口使用工作线程加载的内存快照，不访问数据库）"""
+        self.catalog = catalog
+    
     def set_database(self, db):
-        """设置数据库连接"""
-        self.db = db
+        """以数据库连接为数据源（独立使用组件时）"""
+        self.set_catalog(DatabaseCatalog(db))
+    
+    def set_semester_start_date(self, start_date):
+        """设置学期开始日期（"YYYY-MM-DD"），并跳转到学期开始的月份；None 表示学期开始日期未知"""
+        if start_date is None:
+            # 不知道教学周对应的日期，不在月历上显示课程（不沿用其他学期的日期）
+            self.semester_start_date = None
+            if hasattr(self, 'month_label'):
+                self.update_month_label()
+                self.update_calendar()
+            return
+        
+        date = QDate.fromString(start_date, "yyyy-MM-dd")
+        if not date.isValid():
+            logger.warning(f"Invalid semester start date: {start_date}")
+            return
+        
+        self.semester_start_date = date
+        self.current_year = date.year()
+        self.current_month = date.month()
+        if hasattr(self, 'month_label'):
+            self.update_month_label()
+            self.update_calendar()
     
     def set_custom_courses(self, custom_courses):
         """设置自定义课程数据"""
@@ -147,8 +177,12 @@ class MonthViewWidget(QWidget):
         """更新月份标签"""
         month_names = ['', '一月', '二月', '三月', '四月', '五月', '六月',
                       '七月', '八月', '九月', '十月', '十一月', '十二月']
-        self.month_label.setText(f"{self.current_year}年 {month_names[self.current_month]}")
+        text = f"{self.current_year}年 {month_names[self.current_month]}"
+        if self.semester_start_date is None:
+            text += "（学期开始日期未知）"
+        self.month_label.setText(text)
     
+    @traced_action('month_change')
     def prev_month(self):
         """上一月"""
         if self.current_month > 1:
@@ -159,6 +193,7 @@ class MonthViewWidget(QWidget):
         self.update_month_label()
         self.update_calendar()
     
+    @traced_action('month_change')
     def next_month(self):
         """下一月"""
         if self.current_month < 12:
@@ -169,6 +204,7 @@ class MonthViewWidget(QWidget):
         self.update_month_label()
         self.update_calendar()
     
+    @traced_action('month_change')
     def go_to_current_month(self):
         """回到当前月"""
         current_date = QDate.currentDate()
@@ -236,7 +272,7 @@ class MonthViewWidget(QWidget):
         current_date = QDate(self.current_year, self.current_month, day)
         week_number = self.get_week_number(current_date)
         
-        if week_number > 0 and self.db:
+        if week_number > 0 and self.catalog:
             # 显示这一天的课程
             courses_text = self.get_courses_for_day(current_date.dayOfWeek(), week_number)
             if courses_text:
@@ -259,7 +295,9 @@ class MonthViewWidget(QWidget):
         return widget
     
     def get_week_number(self, date):
-        """计算日期对应的学期周次"""
+        """计算日期对应的学期周次，学期开始日期未知时为0"""
+        if self.semester_start_date is None:
+            return 0
         days_diff = self.semester_start_date.daysTo(date)
         if days_diff < 0:
             return 0
@@ -267,7 +305,7 @@ class MonthViewWidget(QWidget):
     
     def get_courses_for_day(self, day_of_week, week_number):
         """获取指定日期的课程（包括自定义课程）"""
-        if not self.db:
+        if not self.catalog:
             return ""
         
         courses_text = ""
@@ -280,7 +318,7 @@ class MonthViewWidget(QWidget):
                     schedules = self.get_custom_course_schedules(course_id)
                 else:
                     # 数据库课程
-                    schedules = self.db.get_course_schedules(course_id)
+                    schedules = self.catalog.get_schedules(course_id)
                 
                 for schedule in schedules:
                     sched_day, time_slots, location, weeks, semester = schedule
@@ -289,8 +327,8 @@ class MonthViewWidget(QWidget):
                     if str(sched_day) != str(day_of_week):
                         continue
                     
-                    # 检查周次是否匹配 (简化版本)
-                    if weeks and str(week_number) in str(weeks):
+                    # 检查周次是否匹配（与周视图、冲突检查相同的周次解析）
+                    if week_number in schedule_weeks(weeks):
                         # 添加课程信息
                         if courses_text:
                             courses_text += "\n"
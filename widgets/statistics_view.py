@@ -104,42 +104,46 @@ class StatisticsWidget(QWidget):
             return
         
         try:
-            stats = self.db.get_statistics()
-            self.total_courses_label.setText(f"课程总数: {stats['total_courses']}")
-            self.hours_label.setText(f"学时数量: {stats['hours']}")
-            self.schedules_label.setText(f"时间安排: {stats['schedules']}")
+            self.display_db_stats(self.db.get_statistics())
         except Exception as e:
             logger.error(f"Failed to update database statistics: {e}")
     
-    def update_selection_stats(self, selected_courses, conflicts_count=0):
-        """更新选课统计"""
-        self.selected_courses = selected_courses
+    def display_db_stats(self, stats):
+        """显示数据库统计信息（可由后台查询结果直接调用）"""
+        self.total_courses_label.setText(f"课程总数: {stats['total_courses']}")
+        self.hours_label.setText(f"学时数量: {stats['hours']}")
+        self.schedules_label.setText(f"时间安排: {stats['schedules']}")
+    
+    def update_selection_stats(self, selected_courses, conflicts_count=0, total_credits=None):
+        """
+        更新选课统计
         
-        if not self.db:
-            return
+        Args:
+            total_credits: 已算好的总学分（如 planner.compute_statistics 的结果），
+                           为None时按课程ID批量查询数据库计算
+        """
+        self.selected_courses = selected_courses
         
-        # 计算总学分
-        total_credits = 0
-        try:
-            for course_id, _ in selected_courses:
-                courses = self.db.get_all_courses()
-                for course in courses:
-                    if course[0] == course_id:
-                        credits_str = course[2] or "0"  # credits是第2列
-                        credits_match = re.search(r'\d+', str(credits_str))
-                        if credits_match:
-                            total_credits += int(credits_match.group())
-                        break
-        except Exception as e:
-            logger.error(f"Failed to calculate credits: {e}")
+        if total_credits is None:
+            if not self.db:
+                return
+            total_credits = 0
+            try:
+                course_ids = [course_id for course_id, _ in selected_courses if course_id >= 0]
+                for course in self.db.get_courses_by_ids(course_ids):
+                    credits_match = re.search(r'\d+(?:\.\d+)?', str(course[2] or "0"))  # credits是第2列
+                    if credits_match:
+                        total_credits += float(credits_match.group())
+            except Exception as e:
+                logger.error(f"Failed to calculate credits: {e}")
         
         # 更新标签
         self.selected_count_label.setText(f"已选课程: {len(selected_courses)}")
-        self.total_credits_label.setText(f"总学分: {total_credits}")
+        self.total_credits_label.setText(f"总学分: {total_credits:g}")
         self.conflict_count_label.setText(f"时间冲突: {conflicts_count}")
         
         # 更新进度条
-        self.credits_progress.setValue(min(total_credits, 30))
+        self.credits_progress.setValue(min(int(total_credits), 30))
         
         # 根据冲突数量设置颜色
         if conflicts_count > 0:
@@ -1,6 +1,6 @@
 """
 周视图组件
-显示传统的7天×11节课的周课程表
+显示传统的7天×SLOT_COUNT节课的周课程表（节次和周次按 planner.schedule 解析）
 """
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
@@ -10,6 +10,11 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QColor
 import logging
 
+from config import TIME_SLOTS
+from database import traced_action
+from planner.catalog import DatabaseCatalog
+from planner.schedule import SLOT_COUNT, parse_slots, schedule_weeks
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,15 +25,11 @@ class WeekViewWidget(QWidget):
         super().__init__()
         self.selected_courses = []
         self.custom_courses = []  # 存储自定义课程数据
-        self.db = None
+        self.catalog = None  # 课程目录数据源（planner.catalog），提供数据库课程的时间安排
         self.current_week = 1  # 当前显示的周次
         
         # 时间节次映射
-        self.time_slots = {
-            1: "08:00-08:50", 2: "09:00-09:50", 3: "10:10-11:00", 4: "11:10-12:00",
-            5: "14:00-14:50", 6: "15:00-15:50", 7: "16:10-17:00", 8: "17:10-18:00",
-            9: "19:00-19:50", 10: "20:00-20:50", 11: "21:00-21:50"
-        }
+        self.time_slots = TIME_SLOTS
         
         # 星期映射
         self.weekdays = {
@@ -59,7 +60,7 @@ class WeekViewWidget(QWidget):
             # 转换为数据库格式的时间安排
             # (weekday, time_slots, location, weeks, semester)
             schedule_data = (
-                schedule.get('weekday'),
+                schedule.get('weekday_num'),
                 f"{schedule.get('start_time')}-{schedule.get('end_time')}",
                 schedule.get('location', ''),
                 schedule.get('weeks', '1-16'),
@@ -69,9 +70,13 @@ class WeekViewWidget(QWidget):
         
         return schedules
     
+    def set_catalog(self, catalog):
+        """设置课程目录数据源（主窗口使用工作线程加载的内存快照，不访问数据库）"""
+        self.catalog = catalog
+    
     def set_database(self, db):
-        """设置数据库连接"""
-        self.db = db
+        """以数据库连接为数据源（独立使用组件时）"""
+        self.set_catalog(DatabaseCatalog(db))
     
     def set_custom_courses(self, custom_courses):
         """设置自定义课程数据"""
@@ -157,14 +162,14 @@ class WeekViewWidget(QWidget):
     
     def create_schedule_table(self):
         """创建课程表格"""
-        table = QTableWidget(11, 8)  # 11节课 × 8列（时间+7天）
+        table = QTableWidget(SLOT_COUNT, 8)  # SLOT_COUNT节课 × 8列（时间+7天）
         
         # 设置表头
         headers = ['时间'] + [self.weekdays[i] for i in range(1, 8)]
         table.setHorizontalHeaderLabels(headers)
         
         # 设置第一列（时间列）
-        for i in range(11):
+        for i in range(SLOT_COUNT):
             time_slot = i + 1
             time_text = f"第{time_slot}节\n{self.time_slots.get(time_slot, '')}"
             item = QTableWidgetItem(time_text)
@@ -185,7 +190,7 @@ class WeekViewWidget(QWidget):
             header.resizeSection(i, 150)  # 星期列
         
         # 设置行高
-        for i in range(11):
+        for i in range(SLOT_COUNT):
             table.setRowHeight(i, 60)
         
         # 美化样式
@@ -253,6 +258,7 @@ class WeekViewWidget(QWidget):
         frame.setLayout(layout)
         return frame
     
+    @traced_action('week_change')
     def on_week_changed(self, week):
         """周次改变回调"""
         self.current_week = week
@@ -276,11 +282,11 @@ class WeekViewWidget(QWidget):
     
     def update_schedule_display(self):
         """更新课程表格显示"""
-        if not self.db:
+        if not self.catalog:
             return
         
         # 清空课程表格（保留时间列）
-        for row in range(11):
+        for row in range(SLOT_COUNT):
             for col in range(1, 8):
                 self.schedule_table.setItem(row, col, QTableWidgetItem(""))
         
@@ -300,7 +306,7 @@ class WeekViewWidget(QWidget):
                     schedules = self.get_custom_course_schedules(course_id)
                 else:
                     # 数据库课程
-                    schedules = self.db.get_course_schedules(course_id)
+                    schedules = self.catalog.get_schedules(course_id)
                 
                 for schedule in schedules:
                     day_of_week, time_slots_str, location, weeks, semester = schedule
@@ -310,7 +316,7 @@ class WeekViewWidget(QWidget):
                         continue
                     
                     # 解析时间段
-                    time_slots = self.parse_time_slots(time_slots_str)
+                    time_slots = [slot for slot in self.parse_time_slots(time_slots_str) if slot <= SLOT_COUNT]
                     
                     if not time_slots or not (1 <= int(day_of_week) <= 7):
                         continue
@@ -321,7 +327,7 @@ class WeekViewWidget(QWidget):
                     is_conflict = False
                     day_of_week = int(day_of_week)  # 确保是整数
                     for time_slot in time_slots:
-                        if 1 <= time_slot <= 11:
+                        if 1 <= time_slot <= SLOT_COUNT:
                             grid_key = (day_of_week, time_slot)
                             if grid_key in course_grid:
                                 is_conflict = True
@@ -380,44 +386,9 @@ class WeekViewWidget(QWidget):
         self.schedule_table.setItem(row, day_col, item)
     
     def parse_time_slots(self, time_slots_str):
-        """解析时间段字符串"""
-        if not time_slots_str:
-            return []
-        
-        try:
-            import re
-            numbers = re.findall(r'\d+', str(time_slots_str))
-            if len(numbers) >= 2:
-                start = int(numbers[0])
-                end = int(numbers[-1])
-                return list(range(start, end + 1))
-            elif len(numbers) == 1:
-                return [int(numbers[0])]
-        except:
-            pass
-        
-        return []
+        """解析时间段字符串（与冲突检查、导出相同的规则）"""
+        return parse_slots(time_slots_str)
     
     def is_course_in_week(self, weeks_str, target_week):
-        """检查课程是否在指定周次"""
-        if not weeks_str:
-            return True  # 如果没有周次信息，默认显示
-        
-        try:
-            # 简化的周次检查，实际项目中可能需要更复杂的解析
-            weeks_str = str(weeks_str)
-            if str(target_week) in weeks_str:
-                return True
-            
-            # 尝试解析范围，如"1-16周"
-            import re
-            range_match = re.search(r'(\d+)-(\d+)', weeks_str)
-            if range_match:
-                start_week = int(range_match.group(1))
-                end_week = int(range_match.group(2))
-                return start_week <= target_week <= end_week
-            
-        except:
-            pass
-        
-        return False
+        """检查课程是否在指定周次，未写周次时整个教学期都有课"""
+        return target_week in schedule_weeks(weeks_str)